@@ -0,0 +1,78 @@
+"""
+قياس أداء البحث في أسماء المنتجات على كتالوج كبير
+
+الاستخدام (من مجلد المشروع):
+    python -m benchmarks.bench_product_search --products 100000
+"""
+import argparse
+import random
+import time
+from models.product_search import ProductSearchIndex, normalize_arabic
+
+
+# كلمات لتكوين أسماء منتجات عربية متنوعة (بعضها بالهمزات والتاء المربوطة)
+WORDS = [
+    "أرز", "سكر", "شاي", "قهوة", "زيت", "مكرونة", "عدس", "فول", "دقيق", "ملح",
+    "إسفنج", "صابون", "شامبو", "معجون", "أسنان", "مناديل", "عصير", "مياه", "لبن", "جبنة",
+    "زبدة", "بيض", "تونة", "سردين", "صلصة", "كاتشب", "مايونيز", "خل", "بسكويت", "شوكولاتة",
+    "حلاوة", "مربى", "عسل", "بن", "نسكافيه", "كاكاو", "ذرة", "شوفان", "فشار", "لوبيا",
+]
+BRANDS = ["الضحى", "العروسة", "الأمل", "المراعي", "جهينة", "إيديتا", "فريسكا", "الوادي", "حياة", "دومتي"]
+SIZES = ["250 جم", "500 جم", "1 كجم", "2 كجم", "1 لتر", "كرتونة", "عبوة", "صغير", "كبير", "عائلي"]
+
+QUERIES = ["شاي", "قهوه", "اسفنج", "العروسه", "جبنة دومتي", "كجم", "زيت الوا", "ش", "مكرونه ايديتا", "غير موجود"]
+
+
+def build_names(count, seed=42):
+    """توليد أسماء منتجات فريدة"""
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < count:
+        names.add(f"{rng.choice(WORDS)} {rng.choice(BRANDS)} {rng.choice(SIZES)} {rng.randint(1, 999)}")
+    return list(names)
+
+
+def timed(fn, repeat):
+    """أفضل زمن تنفيذ بالميلي ثانية"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="قياس أداء فهرس البحث في المنتجات")
+    parser.add_argument("--products", type=int, default=100000)
+    parser.add_argument("--limit", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    names = build_names(args.products)
+
+    started = time.perf_counter()
+    index = ProductSearchIndex()
+    index.build(enumerate(names, 1))
+    print(f"بناء الفهرس لـ {args.products:,} منتج: {time.perf_counter() - started:.2f} ث")
+
+    # البحث القديم: مرور خطي على كل الأسماء
+    lowered = [name.lower() for name in names]
+
+    print(f"\nالأزمنة بالميلي ثانية (أفضل من {args.repeat} محاولات، الحد {args.limit} نتيجة):")
+    print(f"  {'النص':<16} {'النتائج':>8} {'الخطي':>10} {'الفهرس':>10} {'الفهرس (حد)':>12}")
+    for query in QUERIES:
+        linear = timed(lambda: [name for name in lowered if query.lower() in name], args.repeat)
+        full = timed(lambda: index.search(query), args.repeat)
+        limited = timed(lambda: index.search(query, args.limit), args.repeat)
+        count = len(index.search(query))
+        print(f"  {query:<16} {count:>8,} {linear:>10.3f} {full:>10.3f} {limited:>12.3f}")
+
+    # التأكد من أن التوحيد لا يفقد نتائج البحث الخطي بعد التوحيد
+    for query in QUERIES:
+        expected = {i for i, name in enumerate(names, 1) if normalize_arabic(query) in normalize_arabic(name)}
+        assert set(index.search(query)) == expected, query
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+قياس سرعة إنشاء الإيصالات بالقالب المترجم (نص عادي و ESC/POS و HTML)
+
+الإيصالات بأحجام مختلفة وأسماء أصناف عربية طويلة وقصيرة، والهدف
+10,000 إيصال نصي في الثانية على الأقل
+
+الاستخدام (من مجلد المشروع):
+    python -m benchmarks.bench_receipts --receipts 20000 --items 1,5,20
+"""
+import argparse
+import random
+import sys
+import time
+from services.receipt_service import ReceiptService
+from tools.generate_store import product_names
+
+
+def build_invoices(count, items_count, seed=42):
+    """فواتير تجريبية بعدد أصناف ثابت من أسماء منتجات المولد"""
+    rng = random.Random(seed)
+    names = list(product_names(500, rng))
+    invoices = []
+    for i in range(count):
+        items = []
+        for _ in range(items_count):
+            quantity = rng.randint(1, 5)
+            price = round(rng.uniform(2, 400), 2)
+            items.append({"name": rng.choice(names), "quantity": quantity, "price": price,
+                          "item_total": round(price * quantity, 2)})
+        subtotal = round(sum(item["item_total"] for item in items), 2)
+        invoices.append({
+            "id": i + 1, "invoice_number": f"T1{i + 1:08d}", "barcode": f"#T1{i + 1:08d}",
+            "customer_name": rng.choice(("محمد", "فاطمة", "", "أحمد علي")), "customer_phone": "01001234567",
+            "created_at": "2026-01-15 12:30:00", "items": items,
+            "subtotal": subtotal, "discount": 0, "total": subtotal,
+        })
+    return invoices
+
+
+def rate(render, invoices):
+    """عدد الإيصالات في الثانية"""
+    started = time.perf_counter()
+    for invoice in invoices:
+        render(invoice)
+    return len(invoices) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="قياس سرعة إنشاء الإيصالات")
+    parser.add_argument("--receipts", type=int, default=20000, help="عدد الإيصالات لكل قياس")
+    parser.add_argument("--items", default="1,5,20", help="أعداد الأصناف في الإيصال مفصولة بفواصل")
+    parser.add_argument("--target", type=float, default=10000, help="أقل عدد إيصالات نصية في الثانية لـ 5 أصناف")
+    args = parser.parse_args()
+
+    formats = [
+        ("text", ReceiptService.render_text),
+        ("escpos", ReceiptService.render_escpos),
+        ("html", ReceiptService.render_html),
+    ]
+
+    failed = False
+    print(f"{'الأصناف':>8} " + " ".join(f"{name + ' /ث':>14}" for name, _ in formats))
+    for items_count in (int(count) for count in args.items.split(",") if count.strip()):
+        invoices = build_invoices(args.receipts, items_count)
+        # تشغيل أولي لترجمة القالب وملء ذاكرة عرض الأسماء
+        for _, render in formats:
+            render(invoices[0])
+
+        rates = [rate(render, invoices) for _, render in formats]
+        print(f"{items_count:>8} " + " ".join(f"{value:>14,.0f}" for value in rates))
+        if items_count == 5 and rates[0] < args.target:
+            failed = True
+
+    if failed:
+        print(f"الإيصال النصي بـ 5 أصناف أبطأ من الهدف ({args.target:,.0f} إيصال/ث)")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+قياس أداء تقارير المبيعات على قاعدة بيانات كبيرة
+
+الاستخدام (من مجلد المشروع):
+    python -m benchmarks.bench_sales_reports --invoices 1000000
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+from database.sales_aggregates import SalesAggregates
+from database.schema_migrations import SchemaMigrations
+from models.invoice_model import InvoiceModel
+
+
+# الاستعلامات القديمة (DATE(created_at) يمنع استخدام الفهرس)
+LEGACY_DAILY = """
+    SELECT i.*, u.username as user_name
+    FROM invoices i
+    LEFT JOIN users u ON i.user_id = u.id
+    WHERE DATE(i.created_at) = ?
+    ORDER BY i.created_at DESC
+"""
+LEGACY_RANGE = """
+    SELECT DATE(created_at) as date, COUNT(*) as invoices_count, SUM(total) as total_sales
+    FROM invoices
+    WHERE DATE(created_at) BETWEEN ? AND ?
+    GROUP BY DATE(created_at)
+    ORDER BY date DESC
+"""
+
+# الاستعلامات الجديدة (نطاق نصف مفتوح على created_at)
+INDEXED_DAILY = """
+    SELECT i.*, u.username as user_name
+    FROM invoices i
+    LEFT JOIN users u ON i.user_id = u.id
+    WHERE i.created_at >= ? AND i.created_at < ?
+    ORDER BY i.created_at DESC
+"""
+INDEXED_RANGE = """
+    SELECT substr(created_at, 1, 10) as date, COUNT(*) as invoices_count, SUM(total) as total_sales
+    FROM invoices
+    WHERE created_at >= ? AND created_at < ?
+    GROUP BY substr(created_at, 1, 10)
+    ORDER BY date DESC
+"""
+
+
+# أعمدة الفاتورة بأسمائها حتى لا تتأثر بأعمدة تضيفها الترحيلات (مثل invoice_number)
+INSERT_INVOICE = """
+    INSERT INTO invoices (id, customer_name, customer_phone, barcode, subtotal, discount, total, user_id, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def build_store(db_path, invoices, days, seed=42):
+    """إنشاء قاعدة بيانات بعدد كبير من الفواتير الموزعة على عدة أيام"""
+    success, result = SchemaMigrations.migrate(db_path)
+    if not success:
+        raise RuntimeError(result)
+
+    rng = random.Random(seed)
+    start = datetime(2023, 1, 1)
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA synchronous = OFF")
+
+    batch = []
+    for invoice_id in range(1, invoices + 1):
+        created_at = start + timedelta(seconds=rng.randrange(days * 86400))
+        total = round(rng.uniform(10, 5000), 2)
+        batch.append((invoice_id, "", "", None, total, 0, total, 1, created_at.strftime("%Y-%m-%d %H:%M:%S")))
+        if len(batch) == 50000:
+            conn.executemany(INSERT_INVOICE, batch)
+            batch.clear()
+    if batch:
+        conn.executemany(INSERT_INVOICE, batch)
+
+    SalesAggregates.rebuild(conn)
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+
+
+def timed(fn, repeat):
+    """أفضل زمن تنفيذ بالميلي ثانية"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def show_plan(conn, title, sql, params):
+    print(f"  {title}:")
+    for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params):
+        print(f"      {row[-1]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="قياس أداء تقارير المبيعات")
+    parser.add_argument("--invoices", type=int, default=1000000)
+    parser.add_argument("--days", type=int, default=3 * 365)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, "bench.db")
+
+        started = time.perf_counter()
+        build_store(db_path, args.invoices, args.days)
+        print(f"إنشاء {args.invoices:,} فاتورة: {time.perf_counter() - started:.1f} ث")
+
+        InvoiceModel.db_path = db_path
+        conn = sqlite3.connect(db_path)
+
+        day = "2024-06-15"
+        next_day = "2024-06-16"
+        month = ("2024-06-01", "2024-06-30")
+
+        print("\nخطط التنفيذ:")
+        show_plan(conn, "اليومي القديم", LEGACY_DAILY, (day,))
+        show_plan(conn, "اليومي المفهرس", INDEXED_DAILY, (day, next_day))
+        show_plan(conn, "الفترة القديم", LEGACY_RANGE, month)
+        show_plan(conn, "الفترة المفهرس", INDEXED_RANGE, ("2024-06-01", "2024-07-01"))
+
+        print("\nالأزمنة (أفضل من %d محاولات):" % args.repeat)
+        rows = [
+            ("اليومي القديم", lambda: conn.execute(LEGACY_DAILY, (day,)).fetchall()),
+            ("اليومي المفهرس", lambda: conn.execute(INDEXED_DAILY, (day, next_day)).fetchall()),
+            ("الفترة القديم (شهر)", lambda: conn.execute(LEGACY_RANGE, month).fetchall()),
+            ("الفترة المفهرس (شهر)", lambda: conn.execute(INDEXED_RANGE, ("2024-06-01", "2024-07-01")).fetchall()),
+            ("InvoiceModel.get_sales_by_date_range", lambda: InvoiceModel.get_sales_by_date_range(*month)),
+            ("InvoiceModel.get_sales_by_date_range (كل الأيام)", lambda: InvoiceModel.get_sales_by_date_range(None, None)),
+            ("InvoiceModel.get_daily_sales (الإجماليات)", lambda: InvoiceModel.get_daily_sales(day, summary_only=True)),
+        ]
+        for title, fn in rows:
+            print(f"  {title:<40} {timed(fn, args.repeat):>10.2f} ms")
+
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+قياس أداء طبقة الخدمات (السلة، البيع، الإيصالات، التقارير) بدون واجهة
+على متاجر تجريبية بأحجام مختلفة، مع حفظ النتائج ومقارنتها بنتائج سابقة
+
+نفس العمليات تقاس بـ pytest-benchmark في tests/test_bench_services.py،
+وهذا البرنامج للمقارنة السريعة بملف نتائج سابق
+
+الاستخدام (من مجلد المشروع):
+    python -m benchmarks.bench_services --sizes 1000,100000,1000000 --json results.json
+    python -m benchmarks.bench_services --sizes 1000 --baseline results.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from database.connection_manager import ConnectionManager
+from models.invoice_model import InvoiceModel
+from models.product_catalog import ProductCatalog
+from models.product_model import ProductModel
+from models.user_model import UserModel
+from services.cart_service import Cart, CartService
+from services.checkout_service import CheckoutService
+from services.invoice_number_service import InvoiceNumberService
+from services.receipt_service import ReceiptService
+from services.report_service import ReportService
+from tools.generate_store import StoreGenerator
+
+
+# تراجع الأداء بأكثر من هذه النسبة عن النتائج السابقة يعتبر فشلاً
+REGRESSION_THRESHOLD = 0.20
+
+# أحجام المتاجر التجريبية (عدد المنتجات)
+SIZES = (1000, 100000, 1000000)
+
+# العمليات المقاسة على كل متجر
+CASE_NAMES = (
+    "cart.add_20_items_and_totals",
+    "cart.wholesale_500_lines",
+    "checkout.single_item",
+    "receipt.render_text",
+    "report.invoice_details",
+    "report.day_invoices",
+    "report.day_summary",
+    "report.sales_by_day_month",
+    "report.sales_by_day_all",
+    "report.top_products",
+    "report.low_stock",
+    "catalog.load",
+    "catalog.search",
+)
+
+
+def build_store(db_path, size, seed=42):
+    """
+    إنشاء متجر تجريبي بعدد size من المنتجات وحوالي size فاتورة على مدى سنة
+
+    Returns:
+        int: عدد الفواتير
+    """
+    generator = StoreGenerator(db_path, seed)
+    try:
+        user_ids = generator.generate_users(5)
+        products = generator.generate_products(size)
+        return generator.generate_invoices(products, user_ids, 1, max(size // 365, 1), 5, 1.1, "2023-01-01")
+    finally:
+        generator.close()
+
+
+def throughput(fn, min_time=0.5, max_runs=100000):
+    """عدد مرات التنفيذ في الثانية (يكرر الدالة حتى يمر min_time على الأقل)"""
+    runs = 0
+    started = time.perf_counter()
+    elapsed = 0
+    while elapsed < min_time and runs < max_runs:
+        fn()
+        runs += 1
+        elapsed = time.perf_counter() - started
+    return runs / elapsed
+
+
+def use_database(db_path):
+    """توجيه النماذج والخدمات لقاعدة البيانات التجريبية"""
+    ConnectionManager.close_all()
+    for cls in (ProductModel, InvoiceModel, UserModel, CheckoutService, InvoiceNumberService):
+        cls.db_path = db_path
+    ProductCatalog._products = None
+
+
+def service_cases(db_path, size, invoices):
+    """
+    عمليات القياس على متجر تجريبي جاهز (مشتركة بين هذا البرنامج واختبارات pytest-benchmark)
+
+    Args:
+        db_path (str): مسار قاعدة البيانات التجريبية
+        size (int): عدد المنتجات
+        invoices (int): عدد الفواتير
+
+    Returns:
+        dict: اسم العملية -> دالة بدون معاملات (بترتيب CASE_NAMES)
+    """
+    use_database(db_path)
+    rng = random.Random(1)
+
+    success, invoice = InvoiceModel.get_invoice(invoices // 2 or 1)
+    if not success:
+        raise RuntimeError(invoice)
+    day = invoice["created_at"][:10]
+
+    cart_products = [{"id": i, "name": f"منتج {i}", "price": 10.5, "quantity": 1000} for i in range(1, 21)]
+
+    def cart_round():
+        items = []
+        for product in cart_products:
+            CartService.add_item(items, product, 2)
+        CartService.compute_totals(items, 5)
+
+    # سلة جملة كبيرة: كل إضافة أو تعديل يحدث الإجماليات بالفرق فقط
+    wholesale_products = [{"id": i, "name": f"منتج {i}", "price": 3.25, "quantity": 1000} for i in range(1, 501)]
+
+    def wholesale_cart_round():
+        cart = Cart()
+        for product in wholesale_products:
+            cart.add(product, 2)
+            cart.totals()
+        for product in wholesale_products[::5]:
+            cart.update(product["id"], 5)
+            cart.remove(product["id"] + 1)
+        cart.set_discount(5)
+
+    def checkout():
+        product_id = rng.randint(1, size)
+        item = {"product_id": product_id, "name": f"منتج {product_id}", "price": 1, "quantity": 1, "total": 1}
+        CheckoutService.checkout(1, "عميل", "0100", None, [item])
+
+    # زيادة المخزون حتى لا تفشل عمليات البيع لنفاد الكمية
+    with ConnectionManager.transaction(db_path) as conn:
+        conn.execute("UPDATE products SET quantity = quantity + 1000000")
+
+    cases = {
+        "cart.add_20_items_and_totals": cart_round,
+        "cart.wholesale_500_lines": wholesale_cart_round,
+        "checkout.single_item": checkout,
+        "receipt.render_text": lambda: ReceiptService.render_text(invoice),
+        "report.invoice_details": lambda: ReportService.invoice_details(rng.randint(1, invoices)),
+        "report.day_invoices": lambda: ReportService.day_invoices(day),
+        "report.day_summary": lambda: ReportService.day_summary(day),
+        "report.sales_by_day_month": lambda: ReportService.sales_by_day("2023-06-01", "2023-06-30"),
+        "report.sales_by_day_all": lambda: ReportService.sales_by_day(),
+        "report.top_products": lambda: ReportService.top_products(10),
+        "report.low_stock": lambda: ReportService.low_stock(5),
+        "catalog.load": lambda: ProductCatalog.load(force=True),
+        "catalog.search": lambda: ProductCatalog.search("شاي", limit=200),
+    }
+    assert tuple(cases) == CASE_NAMES
+    return cases
+
+
+def run_size(size, directory, min_time):
+    """تنفيذ كل القياسات على متجر بحجم size"""
+    db_path = os.path.join(directory, f"store_{size}.db")
+
+    started = time.perf_counter()
+    invoices = build_store(db_path, size)
+    print(f"\nمتجر بـ {size:,} منتج و {invoices:,} فاتورة ({time.perf_counter() - started:.1f} ث)")
+
+    results = {}
+    for name, fn in service_cases(db_path, size, invoices).items():
+        ops = throughput(fn, min_time)
+        results[name] = ops
+        print(f"  {name:<32} {ops:>14,.1f} عملية/ث")
+
+    ConnectionManager.close_all()
+    return results
+
+
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """مقارنة النتائج بنتائج سابقة وإرجاع قائمة التراجعات"""
+    regressions = []
+    for size, cases in results.items():
+        for name, ops in cases.items():
+            previous = baseline.get(size, {}).get(name)
+            if previous and ops < previous * (1 - threshold):
+                regressions.append(f"{size} {name}: {previous:,.1f} -> {ops:,.1f} عملية/ث")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="قياس أداء طبقة الخدمات")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in SIZES),
+                        help="أحجام المتاجر التجريبية مفصولة بفواصل")
+    parser.add_argument("--min-time", type=float, default=0.5,
+                        help="أقل مدة قياس لكل عملية بالثواني")
+    parser.add_argument("--json", help="حفظ النتائج في ملف JSON")
+    parser.add_argument("--baseline", help="ملف نتائج سابق للمقارنة")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="نسبة التراجع المسموح بها عن النتائج السابقة")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            results[str(size)] = run_size(size, directory, args.min_time)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\nتم حفظ النتائج في {args.json}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print("\nتراجع في الأداء:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("\nلا يوجد تراجع في الأداء")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+اختبار حمل لخادم HTTP/JSON على الجهاز المحلي
+
+يشغل الخادم في عملية منفصلة على متجر تجريبي (أو يستخدم خادماً يعمل بالفعل
+عبر --port مع --no-server)، ثم يفتح عدة اتصالات متزامنة ترسل خليطاً من
+طلبات القراءة وعمليات البيع، ويعرض عدد الطلبات في الثانية وأزمنة الاستجابة
+
+الاستخدام (من مجلد المشروع):
+    python -m benchmarks.load_api --clients 50 --duration 10 --write-ratio 0.1
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from tools.generate_store import StoreGenerator
+
+
+async def request(reader, writer, method, target, payload=None):
+    """إرسال طلب على اتصال مفتوح وقراءة الرد"""
+    body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+    writer.write(
+        f"{method} {target} HTTP/1.1\r\nHost: localhost\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+    )
+    await writer.drain()
+
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    length = 0
+    for line in head.split(b"\r\n"):
+        if line.lower().startswith(b"content-length:"):
+            length = int(line.split(b":", 1)[1])
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def client(host, port, client_id, products, duration, write_ratio, stats):
+    """عميل واحد يرسل الطلبات بالتتابع على اتصال واحد"""
+    rng = random.Random(client_id)
+    reader, writer = await asyncio.open_connection(host, port)
+    deadline = time.perf_counter() + duration
+
+    while time.perf_counter() < deadline:
+        if rng.random() < write_ratio:
+            kind = "checkout"
+            product_id = rng.randint(1, products)
+            args = ("POST", "/checkout", {
+                "user_id": 1, "customer_name": "", "customer_phone": "",
+                "items": [{"product_id": product_id, "name": "", "price": 1, "quantity": 1, "total": 1}]
+            })
+        else:
+            kind, target = rng.choice((
+                ("product", f"/products/{rng.randint(1, products)}"),
+                ("product", f"/products/{rng.randint(1, products)}"),
+                ("top", "/products/top?limit=10"),
+                ("daily", "/sales/daily?summary=1"),
+            ))
+            args = ("GET", target)
+
+        started = time.perf_counter()
+        status, _ = await request(reader, writer, *args)
+        stats.setdefault(kind, []).append(time.perf_counter() - started)
+        if status != 200:
+            stats["errors"] = stats.get("errors", 0) + 1
+
+    writer.close()
+
+
+async def run_load(host, port, clients, products, duration, write_ratio):
+    stats = {}
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        client(host, port, i, products, duration, write_ratio, stats) for i in range(clients)
+    ))
+    return stats, time.perf_counter() - started
+
+
+async def wait_for_server(host, port, timeout=30):
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="اختبار حمل خادم HTTP/JSON")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--clients", type=int, default=50, help="عدد الاتصالات المتزامنة")
+    parser.add_argument("--duration", type=float, default=10, help="مدة الاختبار بالثواني")
+    parser.add_argument("--write-ratio", type=float, default=0.1, help="نسبة عمليات البيع من الطلبات")
+    parser.add_argument("--products", type=int, default=5000, help="عدد المنتجات في المتجر التجريبي")
+    parser.add_argument("--no-server", action="store_true", help="استخدام خادم يعمل بالفعل على المنفذ")
+    args = parser.parse_args()
+
+    host = "127.0.0.1"
+    with tempfile.TemporaryDirectory() as directory:
+        server = None
+        if not args.no_server:
+            db_path = os.path.join(directory, "load.db")
+            generator = StoreGenerator(db_path)
+            try:
+                user_ids = generator.generate_users(5)
+                products = generator.generate_products(args.products)
+                generator.generate_invoices(products, user_ids, 0.25, 200, 5, 1.1)
+                # مخزون يكفي كل عمليات البيع في الاختبار
+                generator.conn.execute("UPDATE products SET quantity = 1000000")
+            finally:
+                generator.close()
+
+            server = subprocess.Popen(
+                [sys.executable, "-m", "api.server", "--host", host, "--port", str(args.port), "--db", db_path],
+                stdout=subprocess.DEVNULL
+            )
+
+        try:
+            asyncio.run(wait_for_server(host, args.port))
+            stats, elapsed = asyncio.run(
+                run_load(host, args.port, args.clients, args.products, args.duration, args.write_ratio)
+            )
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+    errors = stats.pop("errors", 0)
+    total = sum(len(latencies) for latencies in stats.values())
+    print(f"{args.clients} اتصال لمدة {elapsed:.1f} ث: {total:,} طلب ({total / elapsed:,.0f} طلب/ث)، أخطاء: {errors}")
+    print(f"  {'الطلب':<10} {'العدد':>8} {'طلب/ث':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for kind, latencies in sorted(stats.items()):
+        print(f"  {kind:<10} {len(latencies):>8,} {len(latencies) / elapsed:>8,.0f} "
+              f"{percentile(latencies, 0.5):>8.2f} {percentile(latencies, 0.95):>8.2f} {percentile(latencies, 0.99):>8.2f}")
+
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+اختبار ضغط البيع من عدة أجهزة (عمليات منفصلة) على نفس قاعدة البيانات
+
+كل جهاز يبيع منتجات عشوائية بكميات عشوائية من مخزون محدود حتى ينفد،
+ثم يتم التحقق من عدم بيع أي قطعة أكثر من المخزون الأصلي وقياس عدد
+عمليات البيع في الثانية مع زيادة عدد الأجهزة
+
+الاستخدام (من مجلد المشروع):
+    python -m benchmarks.stress_checkout --terminals 1,2,4,8 --products 20 --stock 2000
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from database.connection_manager import ConnectionManager
+from database.schema_migrations import SchemaMigrations
+from models.invoice_model import InvoiceModel
+from models.product_model import ProductModel
+from services.checkout_service import CheckoutService
+from services.invoice_number_service import InvoiceNumberService
+
+
+# الجهاز يتوقف بعد هذا العدد من محاولات البيع المتتالية الفاشلة لنفاد المخزون
+STOP_AFTER_FAILURES = 50
+
+
+def build_store(db_path, products, stock):
+    """إنشاء قاعدة بيانات بعدد من المنتجات لكل منها نفس المخزون"""
+    success, result = SchemaMigrations.migrate(db_path)
+    if not success:
+        raise RuntimeError(result)
+    ConnectionManager.close_all()
+
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.executemany(
+            "INSERT INTO products (id, name, price, quantity, sold) VALUES (?, ?, ?, ?, 0)",
+            [(i, f"منتج {i}", 10 + i, stock) for i in range(1, products + 1)]
+        )
+    conn.close()
+
+
+def terminal(db_path, terminal_id, products, duration, barrier, results):
+    """جهاز بيع واحد (يعمل في عملية منفصلة)"""
+    for cls in (ProductModel, InvoiceModel, CheckoutService, InvoiceNumberService):
+        cls.db_path = db_path
+    # كل جهازين يتشاركان بادئة واحدة حتى يختبر حجز الأرقام بين العمليات
+    InvoiceNumberService.terminal = f"T{(terminal_id + 1) // 2}"
+
+    rng = random.Random(terminal_id)
+    sold = stock_failures = errors = 0
+    consecutive_failures = 0
+    last_success = None
+
+    barrier.wait()
+    started = time.perf_counter()
+
+    while time.perf_counter() - started < duration and consecutive_failures < STOP_AFTER_FAILURES:
+        items = []
+        for product_id in rng.sample(range(1, products + 1), rng.randint(1, min(3, products))):
+            quantity = rng.randint(1, 3)
+            items.append({"product_id": product_id, "name": f"منتج {product_id}", "price": 10 + product_id,
+                          "quantity": quantity, "total": (10 + product_id) * quantity})
+
+        success, result = CheckoutService.checkout(terminal_id, "", "", None, items)
+        if success:
+            sold += 1
+            consecutive_failures = 0
+            last_success = time.perf_counter() - started
+        elif result.startswith("الكمية المتاحة"):
+            stock_failures += 1
+            consecutive_failures += 1
+        else:
+            errors += 1
+            print(f"جهاز {terminal_id}: {result}", file=sys.stderr)
+
+    ConnectionManager.close_all()
+    results.put((sold, stock_failures, errors, last_success))
+
+
+def verify(db_path, stock):
+    """
+    التحقق من المخزون بعد الاختبار
+
+    Returns:
+        list: رسائل المخالفات (فارغة إذا لم يتم بيع أكثر من المخزون)
+    """
+    conn = sqlite3.connect(db_path)
+    problems = []
+    rows = conn.execute("""
+        SELECT p.id, p.quantity, p.sold, COALESCE(SUM(ii.quantity), 0)
+        FROM products p
+        LEFT JOIN invoice_items ii ON ii.product_id = p.id
+        GROUP BY p.id
+    """).fetchall()
+    for product_id, quantity, sold, invoiced in rows:
+        if quantity < 0:
+            problems.append(f"المنتج {product_id}: المخزون سالب ({quantity})")
+        if invoiced > stock:
+            problems.append(f"المنتج {product_id}: بيع {invoiced} من مخزون {stock}")
+        if quantity + invoiced != stock or sold != invoiced:
+            problems.append(f"المنتج {product_id}: المخزون {quantity} والمباع {sold} لا يطابقان الفواتير ({invoiced})")
+
+    # أرقام الفواتير فريدة بالفهرس، ويجب ألا تبقى فاتورة بدون رقم
+    missing = conn.execute("SELECT COUNT(*) FROM invoices WHERE invoice_number IS NULL").fetchone()[0]
+    if missing:
+        problems.append(f"{missing} فاتورة بدون رقم")
+    conn.close()
+    return problems
+
+
+def run_round(directory, terminals, products, stock, duration):
+    """تشغيل جولة بعدد من الأجهزة على قاعدة بيانات جديدة"""
+    db_path = os.path.join(directory, f"stress_{terminals}.db")
+    build_store(db_path, products, stock)
+
+    # spawn: كل جهاز يبدأ بعملية نظيفة بدون اتصالات موروثة
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(terminals)
+    results = context.Queue()
+    processes = [
+        context.Process(target=terminal, args=(db_path, i + 1, products, duration, barrier, results))
+        for i in range(terminals)
+    ]
+    for process in processes:
+        process.start()
+
+    totals = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    sold = sum(result[0] for result in totals)
+    stock_failures = sum(result[1] for result in totals)
+    errors = sum(result[2] for result in totals)
+    elapsed = max((result[3] for result in totals if result[3]), default=0)
+    rate = sold / elapsed if elapsed else 0
+
+    return sold, stock_failures, errors, rate, verify(db_path, stock)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="اختبار ضغط البيع من عدة أجهزة")
+    parser.add_argument("--terminals", default="1,2,4,8", help="أعداد الأجهزة مفصولة بفواصل")
+    parser.add_argument("--products", type=int, default=20, help="عدد المنتجات")
+    parser.add_argument("--stock", type=int, default=2000, help="المخزون الأصلي لكل منتج")
+    parser.add_argument("--duration", type=float, default=30, help="أقصى مدة لكل جولة بالثواني")
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'الأجهزة':>8} {'عمليات البيع':>12} {'نفاد المخزون':>12} {'أخطاء':>6} {'بيع/ث':>10}  التحقق")
+    with tempfile.TemporaryDirectory() as directory:
+        for terminals in (int(count) for count in args.terminals.split(",") if count.strip()):
+            sold, stock_failures, errors, rate, problems = run_round(
+                directory, terminals, args.products, args.stock, args.duration
+            )
+            status = "سليم" if not problems else f"{len(problems)} مخالفة"
+            print(f"{terminals:>8} {sold:>12,} {stock_failures:>12,} {errors:>6} {rate:>10,.1f}  {status}")
+            for problem in problems[:10]:
+                print(f"         {problem}")
+            failed = failed or bool(problems) or errors > 0
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+import sqlite3
+import random
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from database.db_connection import create_backend
+
+
+class ConnectionManager:
+    """
+    مدير الاتصالات المشترك - يوفر اتصالاً واحداً بقاعدة البيانات لكل خيط (thread)
+    ويعيد استخدامه في جميع النماذج بدلاً من فتح اتصال جديد مع كل عملية
+
+    مسار قاعدة البيانات يحدد المحرك (database/db_connection.py): ملف SQLite
+    يبقى اتصاله مع الخيط، ورابط mysql:// يأخذ اتصالاً من المجموعة لكل معاملة
+    خارجية ويعيده بعدها
+    """
+
+    # إعدادات PRAGMA التي تطبق مرة واحدة عند فتح كل اتصال
+    pragmas = {
+        "journal_mode": "WAL",       # القراءة لا تنتظر الكتابة
+        "synchronous": "NORMAL",     # مزامنة أقل مع الحفاظ على السلامة في وضع WAL
+        "cache_size": -16000,        # حوالي 16 ميجابايت من ذاكرة التخزين المؤقت
+        "mmap_size": 134217728,      # 128 ميجابايت من الذاكرة المعنونة
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,        # انتظار قفل الكتابة حتى 5 ثوان قبل خطأ database is locked
+    }
+
+    # إعادة محاولة المعاملة كاملة إذا بقيت قاعدة البيانات مشغولة بعد busy_timeout
+    busy_retries = 5
+    busy_backoff = 0.05  # ثانية، تتضاعف مع كل محاولة
+
+    # الاتصالات الخاصة بكل خيط
+    _local = threading.local()
+
+    # جميع الاتصالات المفتوحة (لإغلاقها عند الخروج)
+    _all_connections = []
+    _lock = threading.Lock()
+
+    # محرك كل قاعدة بيانات: db_path -> SQLiteBackend/MySQLBackend
+    _backends = {}
+
+    # يزداد عند إغلاق جميع الاتصالات حتى تتجاهل الخيوط اتصالاتها القديمة
+    _generation = 0
+
+    @classmethod
+    def configure(cls, **pragmas):
+        """
+        تعديل إعدادات PRAGMA (تطبق على الاتصالات الجديدة فقط)
+
+        Args:
+            **pragmas: أسماء الإعدادات وقيمها، القيمة None تلغي الإعداد
+        """
+        for name, value in pragmas.items():
+            if value is None:
+                cls.pragmas.pop(name, None)
+            else:
+                cls.pragmas[name] = value
+
+    @classmethod
+    def _state(cls):
+        """الحصول على حالة الخيط الحالي (الاتصالات وعمق المعاملات)"""
+        state = cls._local
+        if getattr(state, "generation", None) != cls._generation:
+            state.connections = {}
+            state.depth = {}
+            state.pending = {}
+            state.generation = cls._generation
+        return state
+
+    @classmethod
+    def backend(cls, db_path):
+        """
+        محرك قاعدة البيانات (ينشأ مرة واحدة لكل مسار)
+
+        Args:
+            db_path (str): مسار ملف SQLite أو رابط mysql://
+
+        Returns:
+            SQLiteBackend/MySQLBackend: المحرك
+        """
+        backend = cls._backends.get(db_path)
+        if backend is None:
+            with cls._lock:
+                backend = cls._backends.get(db_path)
+                if backend is None:
+                    backend = create_backend(db_path, cls.pragmas)
+                    cls._backends[db_path] = backend
+        return backend
+
+    @classmethod
+    def _open(cls, db_path):
+        """فتح اتصال جديد من محرك قاعدة البيانات"""
+        backend = cls.backend(db_path)
+        conn = backend.connect()
+
+        # اتصالات المجموعة تعاد لها بعد كل معاملة فلا تسجل للإغلاق
+        if not backend.pooled:
+            with cls._lock:
+                cls._all_connections.append(conn)
+
+        return conn
+
+    @classmethod
+    def _release(cls, db_path, conn):
+        """إعادة اتصال المجموعة بعد انتهاء المعاملة الخارجية"""
+        backend = cls.backend(db_path)
+        if backend.pooled:
+            state = cls._state()
+            if state.connections.get(db_path) is conn:
+                del state.connections[db_path]
+            backend.release(conn)
+
+    @classmethod
+    def get_connection(cls, db_path):
+        """
+        الحصول على اتصال الخيط الحالي بقاعدة البيانات (يفتح مرة واحدة فقط)
+
+        Args:
+            db_path (str): مسار قاعدة البيانات
+
+        مع محرك MySQL يبقى الاتصال مع الخيط حتى نهاية المعاملة الخارجية التالية
+
+        Returns:
+            sqlite3.Connection: الاتصال المشترك للخيط الحالي
+        """
+        state = cls._state()
+        conn = state.connections.get(db_path)
+        if conn is None:
+            conn = cls._open(db_path)
+            state.connections[db_path] = conn
+            state.depth.setdefault(db_path, 0)
+            state.pending.setdefault(db_path, [])
+        return conn
+
+    @classmethod
+    def on_commit(cls, db_path, callback):
+        """
+        تسجيل دالة تنفذ بعد تأكيد (COMMIT) المعاملة الخارجية الحالية
+
+        تلغى الدالة إذا تم التراجع عن المعاملة أو عن الـ SAVEPOINT الذي سجلت فيه،
+        وتنفذ فوراً إذا لم تكن هناك معاملة مفتوحة
+
+        Args:
+            db_path (str): مسار قاعدة البيانات
+            callback (callable): دالة بدون معاملات
+        """
+        state = cls._state()
+        if state.depth.get(db_path, 0) == 0:
+            cls._run_callbacks([callback])
+        else:
+            state.pending[db_path].append(callback)
+
+    @classmethod
+    def _run_callbacks(cls, callbacks):
+        """تنفيذ دوال ما بعد التأكيد (البيانات محفوظة بالفعل فلا يلغيها خطأ في إحداها)"""
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                traceback.print_exc()
+
+    @classmethod
+    @contextmanager
+    def transaction(cls, db_path, immediate=False):
+        """
+        فتح معاملة على اتصال الخيط الحالي
+
+        المعاملة الخارجية تبدأ بـ BEGIN وتنتهي بـ COMMIT أو ROLLBACK عند حدوث خطأ،
+        أما المعاملات المتداخلة فتستخدم SAVEPOINT حتى تنضم للمعاملة الخارجية
+
+        Args:
+            db_path (str): مسار قاعدة البيانات
+            immediate (bool): حجز قفل الكتابة من بداية المعاملة
+
+        Yields:
+            sqlite3.Connection: الاتصال المستخدم داخل المعاملة
+        """
+        conn = cls.get_connection(db_path)
+        state = cls._state()
+        depth = state.depth[db_path]
+        pending = state.pending[db_path]
+        pending_count = len(pending)
+
+        if depth == 0:
+            try:
+                conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            except BaseException:
+                cls._release(db_path, conn)
+                raise
+        else:
+            conn.execute(f"SAVEPOINT sp_{depth}")
+
+        state.depth[db_path] = depth + 1
+        try:
+            yield conn
+        except BaseException:
+            state.depth[db_path] = depth
+            del pending[pending_count:]
+            if depth == 0:
+                try:
+                    if conn.in_transaction:
+                        conn.execute("ROLLBACK")
+                finally:
+                    cls._release(db_path, conn)
+            else:
+                conn.execute(f"ROLLBACK TO sp_{depth}")
+                conn.execute(f"RELEASE sp_{depth}")
+            raise
+        else:
+            state.depth[db_path] = depth
+            if depth == 0:
+                try:
+                    conn.execute("COMMIT")
+                except BaseException:
+                    del pending[:]
+                    if conn.in_transaction:
+                        conn.execute("ROLLBACK")
+                    raise
+                finally:
+                    cls._release(db_path, conn)
+                callbacks = pending[:]
+                del pending[:]
+                cls._run_callbacks(callbacks)
+            else:
+                conn.execute(f"RELEASE sp_{depth}")
+
+    @classmethod
+    def is_busy_error(cls, error):
+        """هل الخطأ بسبب انشغال قاعدة البيانات بكتابة من اتصال آخر"""
+        message = str(error).lower()
+        return isinstance(error, sqlite3.OperationalError) and ("locked" in message or "busy" in message)
+
+    @classmethod
+    def run_transaction(cls, db_path, fn, immediate=True, retries=None):
+        """
+        تنفيذ fn(conn) في معاملة وإعادتها كاملة إذا كانت قاعدة البيانات مشغولة
+
+        تعاد المحاولة فقط في المعاملة الخارجية (داخل معاملة أخرى يرفع الخطأ
+        لتعيدها المعاملة الخارجية)، مع انتظار يتضاعف وعشوائية حتى لا تتزامن
+        المحاولات من عدة أجهزة
+
+        Args:
+            db_path (str): مسار قاعدة البيانات
+            fn (callable): تستقبل الاتصال وتعيد نتيجة المعاملة
+            immediate (bool): حجز قفل الكتابة من بداية المعاملة
+            retries (int): عدد مرات إعادة المحاولة (busy_retries إذا كانت None)
+
+        Returns:
+            نتيجة fn
+        """
+        if retries is None:
+            retries = cls.busy_retries
+
+        attempt = 0
+        while True:
+            try:
+                with cls.transaction(db_path, immediate) as conn:
+                    return fn(conn)
+            except sqlite3.OperationalError as e:
+                if not cls.is_busy_error(e) or attempt >= retries or cls._state().depth.get(db_path, 0) > 0:
+                    raise
+                attempt += 1
+                time.sleep(cls.busy_backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+
+    @classmethod
+    def close_all(cls):
+        """إغلاق جميع الاتصالات المفتوحة (عند الخروج من البرنامج)"""
+        with cls._lock:
+            connections = cls._all_connections
+            cls._all_connections = []
+            cls._generation += 1
+
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+        # إغلاق مجموعات الاتصالات (اتصالاتها المستخدمة تغلق عند إعادتها)
+        for backend in list(cls._backends.values()):
+            backend.close()
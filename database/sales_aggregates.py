@@ -0,0 +1,179 @@
+class SalesAggregates:
+    """
+    جداول ملخص المبيعات - تحدث مع كل فاتورة داخل نفس المعاملة
+    فتقرأ التقارير صفاً لكل يوم بدلاً من جمع كل الفواتير وعناصرها
+
+    - daily_sales: إجماليات كل يوم
+    - product_daily_sales: الكمية والإيراد لكل منتج في كل يوم (بسعر البيع وقتها)
+    - product_sales: إجمالي الكمية والإيراد لكل منتج (لترتيب كل الأوقات بالفهرس مباشرة)
+    - cashier_daily_sales: إجماليات كل كاشير في كل يوم (0 للفواتير بدون مستخدم)
+    """
+
+    @classmethod
+    def create_tables(cls, conn):
+        """إنشاء جداول الملخص"""
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS daily_sales (
+                date TEXT PRIMARY KEY,
+                invoices_count INTEGER NOT NULL DEFAULT 0,
+                subtotal REAL NOT NULL DEFAULT 0,
+                discount REAL NOT NULL DEFAULT 0,
+                total_sales REAL NOT NULL DEFAULT 0,
+                items_sold INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID
+        ''')
+
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS product_daily_sales (
+                date TEXT NOT NULL,
+                product_id INTEGER NOT NULL,
+                quantity INTEGER NOT NULL DEFAULT 0,
+                revenue REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (date, product_id)
+            ) WITHOUT ROWID
+        ''')
+
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS product_sales (
+                product_id INTEGER PRIMARY KEY,
+                quantity INTEGER NOT NULL DEFAULT 0,
+                revenue REAL NOT NULL DEFAULT 0
+            )
+        ''')
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_product_sales_quantity ON product_sales(quantity DESC, product_id)")
+
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS cashier_daily_sales (
+                date TEXT NOT NULL,
+                user_id INTEGER NOT NULL,
+                invoices_count INTEGER NOT NULL DEFAULT 0,
+                total_sales REAL NOT NULL DEFAULT 0,
+                items_sold INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (date, user_id)
+            ) WITHOUT ROWID
+        ''')
+
+    @classmethod
+    def record_invoice(cls, conn, created_at, user_id, items, subtotal, discount, total):
+        """
+        إضافة فاتورة جديدة للملخص (يستدعى داخل معاملة إنشاء الفاتورة)
+
+        Args:
+            conn (sqlite3.Connection): اتصال المعاملة الحالية
+            created_at (str): تاريخ الفاتورة بصيغة YYYY-MM-DD HH:MM:SS
+            user_id (int): معرف الكاشير (None للفواتير المستوردة)
+            items (list): عناصر الفاتورة (product_id, quantity, total)
+            subtotal (float): الإجمالي قبل الخصم
+            discount (float): الخصم
+            total (float): الإجمالي بعد الخصم
+        """
+        date = created_at[:10]
+
+        # تجميع الكميات لكل منتج (قد يتكرر المنتج في الفاتورة)
+        products = {}
+        for item in items:
+            quantity, revenue = products.get(item["product_id"], (0, 0))
+            products[item["product_id"]] = (quantity + item["quantity"], revenue + item["total"])
+        items_sold = sum(quantity for quantity, _ in products.values())
+
+        conn.execute("""
+            INSERT INTO daily_sales (date, invoices_count, subtotal, discount, total_sales, items_sold)
+            VALUES (?, 1, ?, ?, ?, ?)
+            ON CONFLICT(date) DO UPDATE SET
+                invoices_count = invoices_count + 1,
+                subtotal = subtotal + excluded.subtotal,
+                discount = discount + excluded.discount,
+                total_sales = total_sales + excluded.total_sales,
+                items_sold = items_sold + excluded.items_sold
+        """, (date, subtotal, discount, total, items_sold))
+
+        conn.execute("""
+            INSERT INTO cashier_daily_sales (date, user_id, invoices_count, total_sales, items_sold)
+            VALUES (?, ?, 1, ?, ?)
+            ON CONFLICT(date, user_id) DO UPDATE SET
+                invoices_count = invoices_count + 1,
+                total_sales = total_sales + excluded.total_sales,
+                items_sold = items_sold + excluded.items_sold
+        """, (date, user_id or 0, total, items_sold))
+
+        conn.executemany("""
+            INSERT INTO product_daily_sales (date, product_id, quantity, revenue)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(date, product_id) DO UPDATE SET
+                quantity = quantity + excluded.quantity,
+                revenue = revenue + excluded.revenue
+        """, [(date, product_id, quantity, revenue) for product_id, (quantity, revenue) in products.items()])
+
+        conn.executemany("""
+            INSERT INTO product_sales (product_id, quantity, revenue)
+            VALUES (?, ?, ?)
+            ON CONFLICT(product_id) DO UPDATE SET
+                quantity = quantity + excluded.quantity,
+                revenue = revenue + excluded.revenue
+        """, [(product_id, quantity, revenue) for product_id, (quantity, revenue) in products.items()])
+
+    @classmethod
+    def rebuild(cls, conn):
+        """
+        إعادة حساب جداول الملخص بالكامل من الفواتير
+        (عند الترحيل أو بعد إدخال فواتير مباشرة بدون create_invoice)
+
+        Args:
+            conn (sqlite3.Connection): اتصال داخل معاملة
+        """
+        conn.execute("DELETE FROM daily_sales")
+        conn.execute("DELETE FROM product_daily_sales")
+        conn.execute("DELETE FROM product_sales")
+        conn.execute("DELETE FROM cashier_daily_sales")
+
+        # الكمية المباعة في كل فاتورة مرة واحدة ثم تجمع حسب اليوم والكاشير
+        conn.execute("""
+            CREATE TEMP TABLE invoice_totals (
+                id INTEGER PRIMARY KEY, date TEXT, user_id INTEGER,
+                subtotal REAL, discount REAL, total REAL, items_sold INTEGER
+            )
+        """)
+
+        try:
+            conn.execute("""
+                INSERT INTO invoice_totals
+                SELECT i.id, substr(i.created_at, 1, 10), COALESCE(i.user_id, 0),
+                       i.subtotal, i.discount, i.total, COALESCE(q.items_sold, 0)
+                FROM invoices i
+                LEFT JOIN (
+                    SELECT invoice_id, SUM(quantity) as items_sold
+                    FROM invoice_items
+                    GROUP BY invoice_id
+                ) q ON q.invoice_id = i.id
+            """)
+
+            conn.execute("""
+                INSERT INTO daily_sales (date, invoices_count, subtotal, discount, total_sales, items_sold)
+                SELECT date, COUNT(*), SUM(subtotal), SUM(discount), SUM(total), SUM(items_sold)
+                FROM invoice_totals
+                GROUP BY date
+            """)
+
+            conn.execute("""
+                INSERT INTO cashier_daily_sales (date, user_id, invoices_count, total_sales, items_sold)
+                SELECT date, user_id, COUNT(*), SUM(total), SUM(items_sold)
+                FROM invoice_totals
+                GROUP BY date, user_id
+            """)
+
+            conn.execute("""
+                INSERT INTO product_daily_sales (date, product_id, quantity, revenue)
+                SELECT t.date, ii.product_id, SUM(ii.quantity), SUM(ii.item_total)
+                FROM invoice_items ii
+                JOIN invoice_totals t ON t.id = ii.invoice_id
+                GROUP BY t.date, ii.product_id
+            """)
+
+            conn.execute("""
+                INSERT INTO product_sales (product_id, quantity, revenue)
+                SELECT product_id, SUM(quantity), SUM(revenue)
+                FROM product_daily_sales
+                GROUP BY product_id
+            """)
+        finally:
+            conn.execute("DROP TABLE temp.invoice_totals")
@@ -0,0 +1,245 @@
+import threading
+from database.connection_manager import ConnectionManager
+from database.db_connection import backend_of
+from database.sales_aggregates import SalesAggregates
+
+
+def _create_initial_tables(conn):
+    """الإصدار 1: الجداول الأساسية كما كانت تنشئها النماذج"""
+    # جدول المستخدمين
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password TEXT NOT NULL,
+            role TEXT NOT NULL
+        )
+    ''')
+
+    # جدول المنتجات
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS products (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE NOT NULL,
+            price REAL NOT NULL,
+            quantity INTEGER NOT NULL DEFAULT 0,
+            sold INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+
+    # جدول الفواتير
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS invoices (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            customer_name TEXT,
+            customer_phone TEXT,
+            barcode TEXT,
+            subtotal REAL NOT NULL,
+            discount REAL NOT NULL DEFAULT 0,
+            total REAL NOT NULL,
+            user_id INTEGER,
+            created_at TEXT NOT NULL,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    ''')
+
+    # جدول عناصر الفاتورة
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS invoice_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            invoice_id INTEGER NOT NULL,
+            product_id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            price REAL NOT NULL,
+            quantity INTEGER NOT NULL,
+            item_total REAL NOT NULL,
+            FOREIGN KEY (invoice_id) REFERENCES invoices(id),
+            FOREIGN KEY (product_id) REFERENCES products(id)
+        )
+    ''')
+
+    # إضافة المستخدمين الافتراضيين إذا كانت قاعدة البيانات فارغة
+    if conn.execute("SELECT COUNT(*) FROM users").fetchone()[0] == 0:
+        conn.executemany(
+            "INSERT INTO users (username, password, role) VALUES (?, ?, ?)",
+            [("admin", "admin", "admin"), ("user", "user", "worker")]
+        )
+
+
+def _add_sales_date_indexes(conn):
+    """الإصدار 2: توحيد صيغة created_at وفهارس تقارير المبيعات"""
+    # توحيد التاريخ بصيغة YYYY-MM-DD HH:MM:SS حتى تعمل المقارنات النصية مع الفهرس
+    # (قواعد MySQL تنشأ جديدة بهذه الصيغة فلا تحتاج التوحيد)
+    if backend_of(conn).name == "sqlite":
+        conn.execute("""
+            UPDATE invoices
+            SET created_at = strftime('%Y-%m-%d %H:%M:%S', created_at)
+            WHERE strftime('%Y-%m-%d %H:%M:%S', created_at) IS NOT NULL
+              AND created_at != strftime('%Y-%m-%d %H:%M:%S', created_at)
+        """)
+
+    # إضافة total للفهرس تجعل تقارير الفترات تقرأ من الفهرس فقط دون الرجوع للجدول
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_invoices_created_at ON invoices(created_at, total)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_invoice_items_invoice_id ON invoice_items(invoice_id)")
+
+
+def _add_sales_aggregates(conn):
+    """الإصدار 3: جداول ملخص المبيعات اليومية وحسابها من الفواتير الموجودة"""
+    SalesAggregates.create_tables(conn)
+    SalesAggregates.rebuild(conn)
+
+
+def _add_product_barcodes(conn):
+    """الإصدار 4: باركود المنتجات مع فهرس فريد للبحث بالماسح"""
+    columns = backend_of(conn).table_columns(conn, "products")
+    if "barcode" not in columns:
+        conn.execute("ALTER TABLE products ADD COLUMN barcode TEXT")
+
+    # القيم NULL لا تتعارض في الفهرس الفريد فالمنتجات بدون باركود مسموحة
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_products_barcode ON products(barcode)")
+
+
+def _add_invoice_numbers(conn):
+    """الإصدار 5: أرقام الفواتير لكل جهاز وفهرس البحث بباركود الفاتورة"""
+    # آخر رقم محجوز لكل بادئة (جهاز)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS invoice_sequences (
+            prefix TEXT PRIMARY KEY,
+            next_value INTEGER NOT NULL
+        ) WITHOUT ROWID
+    ''')
+
+    columns = backend_of(conn).table_columns(conn, "invoices")
+    if "invoice_number" not in columns:
+        conn.execute("ALTER TABLE invoices ADD COLUMN invoice_number TEXT")
+
+    # الفواتير القديمة بدون رقم (NULL) ولا تتعارض في الفهرس الفريد
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_invoices_number ON invoices(invoice_number)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_invoices_barcode ON invoices(barcode)")
+
+
+def _add_parked_carts(conn):
+    """الإصدار 6: السلال المعلقة لاستئنافها لاحقاً من أي جهاز"""
+    # المجموع وعدد الأصناف يحفظان مع السلة حتى تعرض القائمة بدون قراءة العناصر
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS parked_carts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            terminal TEXT NOT NULL,
+            user_id INTEGER,
+            items_count INTEGER NOT NULL DEFAULT 0,
+            subtotal REAL NOT NULL DEFAULT 0,
+            discount REAL NOT NULL DEFAULT 0,
+            parked_at TEXT NOT NULL,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    ''')
+
+    # عناصر السلة مرتبة بالسلة فتقرأ كلها بقراءة متصلة واحدة
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS parked_cart_items (
+            cart_id INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            product_id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            price REAL NOT NULL,
+            quantity INTEGER NOT NULL,
+            PRIMARY KEY (cart_id, position),
+            FOREIGN KEY (cart_id) REFERENCES parked_carts(id),
+            FOREIGN KEY (product_id) REFERENCES products(id)
+        ) WITHOUT ROWID
+    ''')
+
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_parked_carts_terminal ON parked_carts(terminal, parked_at)")
+
+
+class SchemaMigrations:
+    """
+    ترحيل مخطط قاعدة البيانات - ينفذ مرة واحدة عند بدء البرنامج
+    ويحفظ رقم الإصدار في PRAGMA user_version (جدول schema_version في MySQL)
+    """
+
+    # قائمة الترحيلات بالترتيب: (رقم الإصدار، الوصف، الدالة)
+    migrations = [
+        (1, "الجداول الأساسية", _create_initial_tables),
+        (2, "فهارس تقارير المبيعات", _add_sales_date_indexes),
+        (3, "جداول ملخص المبيعات", _add_sales_aggregates),
+        (4, "باركود المنتجات", _add_product_barcodes),
+        (5, "أرقام الفواتير", _add_invoice_numbers),
+        (6, "السلال المعلقة", _add_parked_carts),
+    ]
+
+    # قواعد البيانات التي تم ترحيلها في هذه العملية
+    _migrated = set()
+    _lock = threading.Lock()
+
+    @classmethod
+    def latest_version(cls):
+        """رقم أحدث إصدار للمخطط"""
+        return cls.migrations[-1][0]
+
+    @classmethod
+    def get_version(cls, db_path):
+        """
+        الحصول على إصدار المخطط المسجل في قاعدة البيانات
+
+        Args:
+            db_path (str): مسار قاعدة البيانات
+
+        Returns:
+            int: رقم الإصدار (0 لقاعدة بيانات جديدة)
+        """
+        with ConnectionManager.transaction(db_path) as conn:
+            return backend_of(conn).user_version(conn)
+
+    @classmethod
+    def migrate(cls, db_path):
+        """
+        تطبيق الترحيلات التي لم تطبق بعد على قاعدة البيانات
+
+        Args:
+            db_path (str): مسار قاعدة البيانات
+
+        Returns:
+            tuple: (success, result)
+                - success (bool): نجاح العملية
+                - result (int/str): إصدار المخطط الحالي أو رسالة الخطأ
+        """
+        try:
+            with cls._lock:
+                # قاعدة بيانات محدثة بالفعل: لا حاجة لحجز قفل الكتابة
+                if cls.get_version(db_path) >= cls.latest_version():
+                    cls._migrated.add(db_path)
+                    return True, cls.get_version(db_path)
+
+                # كل ترحيل في معاملة خاصة به مع حجز قفل الكتابة
+                # حتى لا تطبقه عمليتان في نفس الوقت
+                for version, description, apply in cls.migrations:
+                    with ConnectionManager.transaction(db_path, immediate=True) as conn:
+                        current = backend_of(conn).user_version(conn)
+                        if current >= version:
+                            continue
+                        apply(conn)
+                        backend_of(conn).set_user_version(conn, version)
+
+                cls._migrated.add(db_path)
+
+            return True, cls.get_version(db_path)
+
+        except Exception as e:
+            return False, f"خطأ في ترحيل قاعدة البيانات: {str(e)}"
+
+    @classmethod
+    def ensure(cls, db_path):
+        """
+        التأكد من ترحيل قاعدة البيانات (لا يفعل شيئاً بعد أول ترحيل ناجح)
+
+        Args:
+            db_path (str): مسار قاعدة البيانات
+        """
+        if db_path in cls._migrated:
+            return
+
+        success, result = cls.migrate(db_path)
+        if not success:
+            raise RuntimeError(result)
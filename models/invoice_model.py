@@ -1,6 +1,7 @@
-import sqlite3
-import os
-from datetime import datetime
+from datetime import datetime, timedelta
+from database.connection_manager import ConnectionManager
+from database.sales_aggregates import SalesAggregates
+from database.schema_migrations import SchemaMigrations
 
 class InvoiceModel:
     """
@@ -10,52 +11,29 @@ class InvoiceModel:
     # مسار قاعدة البيانات
     db_path = "data/store.db"
     
+    # عدد الفواتير في كل دفعة من iter_daily_sales وأقصى حد لصفحة page
+    batch_size = 500
+    max_page_size = 1000
+    
     @classmethod
     def _ensure_db_exists(cls):
-        """التأكد من وجود قاعدة البيانات وإنشاء الجداول إذا لم تكن موجودة"""
-        # التأكد من وجود مجلد البيانات
-        os.makedirs(os.path.dirname(cls.db_path), exist_ok=True)
-        
-        # إنشاء الاتصال بقاعدة البيانات
-        conn = sqlite3.connect(cls.db_path)
-        cursor = conn.cursor()
-        
-        # إنشاء جدول الفواتير إذا لم يكن موجوداً
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS invoices (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                customer_name TEXT,
-                customer_phone TEXT,
-                barcode TEXT,
-                subtotal REAL NOT NULL,
-                discount REAL NOT NULL DEFAULT 0,
-                total REAL NOT NULL,
-                user_id INTEGER,
-                created_at TEXT NOT NULL,
-                FOREIGN KEY (user_id) REFERENCES users(id)
-            )
-        ''')
-        
-        # إنشاء جدول عناصر الفاتورة إذا لم يكن موجوداً
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS invoice_items (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                invoice_id INTEGER NOT NULL,
-                product_id INTEGER NOT NULL,
-                name TEXT NOT NULL,
-                price REAL NOT NULL,
-                quantity INTEGER NOT NULL,
-                item_total REAL NOT NULL,
-                FOREIGN KEY (invoice_id) REFERENCES invoices(id),
-                FOREIGN KEY (product_id) REFERENCES products(id)
-            )
-        ''')
+        """التأكد من ترحيل قاعدة البيانات (الجداول تنشأ مرة واحدة عند بدء البرنامج)"""
+        SchemaMigrations.ensure(cls.db_path)
+    
+    @classmethod
+    def _day_start(cls, date, days=0):
+        """
+        تحويل تاريخ YYYY-MM-DD إلى حد نطاق نصي يقارن مباشرة مع created_at
         
-        conn.commit()
-        conn.close()
+        المقارنة created_at >= بداية اليوم AND created_at < بداية اليوم التالي
+        تستخدم الفهرس idx_invoices_created_at بدلاً من DATE(created_at) الذي يفحص الجدول كاملاً
+        """
+        day = datetime.strptime(date, "%Y-%m-%d") + timedelta(days=days)
+        return day.strftime("%Y-%m-%d")
     
     @classmethod
-    def create_invoice(cls, user_id, customer_name, customer_phone, barcode, items, subtotal, discount, total):
+    def create_invoice(cls, user_id, customer_name, customer_phone, barcode, items, subtotal, discount, total, created_at=None,
+                       invoice_number=None):
         """
         إنشاء فاتورة جديدة
         
@@ -68,6 +46,8 @@ class InvoiceModel:
             subtotal (float): إجمالي الفاتورة قبل الخصم
             discount (float): مقدار الخصم
             total (float): إجمالي الفاتورة بعد الخصم
+            created_at (str): تاريخ الإنشاء بصيغة YYYY-MM-DD HH:MM:SS (الوقت الحالي إذا كانت None)
+            invoice_number (str): رقم الفاتورة من InvoiceNumberService (None للفواتير المستوردة)
             
         Returns:
             tuple: (success, result)
@@ -79,37 +59,37 @@ class InvoiceModel:
             cls._ensure_db_exists()
             
             # الاتصال بقاعدة البيانات
-            conn = sqlite3.connect(cls.db_path)
-            cursor = conn.cursor()
-            
-            # تاريخ الإنشاء
-            created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            
-            # إنشاء الفاتورة
-            cursor.execute(
-                """INSERT INTO invoices 
-                   (customer_name, customer_phone, barcode, subtotal, discount, total, user_id, created_at) 
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-                (customer_name, customer_phone, barcode, subtotal, discount, total, user_id, created_at)
-            )
-            
-            # الحصول على معرف الفاتورة المنشأة
-            invoice_id = cursor.lastrowid
-            
-            # إضافة عناصر الفاتورة
-            for item in items:
+            with ConnectionManager.transaction(cls.db_path) as conn:
+                cursor = conn.cursor()
+                
+                # تاريخ الإنشاء
+                if created_at is None:
+                    created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                
+                # إنشاء الفاتورة
                 cursor.execute(
+                    """INSERT INTO invoices 
+                       (customer_name, customer_phone, barcode, subtotal, discount, total, user_id, created_at, invoice_number) 
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                    (customer_name, customer_phone, barcode, subtotal, discount, total, user_id, created_at, invoice_number)
+                )
+                
+                # الحصول على معرف الفاتورة المنشأة
+                invoice_id = cursor.lastrowid
+                
+                # إضافة عناصر الفاتورة دفعة واحدة
+                cursor.executemany(
                     """INSERT INTO invoice_items 
                        (invoice_id, product_id, name, price, quantity, item_total) 
                        VALUES (?, ?, ?, ?, ?, ?)""",
-                    (invoice_id, item["product_id"], item["name"], item["price"], 
-                     item["quantity"], item["total"])
+                    [(invoice_id, item["product_id"], item["name"], item["price"], 
+                      item["quantity"], item["total"]) for item in items]
                 )
-            
-            conn.commit()
-            conn.close()
-            
-            return True, invoice_id
+                
+                # تحديث ملخص المبيعات داخل نفس المعاملة
+                SalesAggregates.record_invoice(conn, created_at, user_id, items, subtotal, discount, total)
+                
+                return True, invoice_id
             
         except Exception as e:
             return False, f"خطأ في إنشاء الفاتورة: {str(e)}"
@@ -132,48 +112,78 @@ class InvoiceModel:
             cls._ensure_db_exists()
             
             # الاتصال بقاعدة البيانات
-            conn = sqlite3.connect(cls.db_path)
-            conn.row_factory = sqlite3.Row  # للحصول على النتائج كقاموس
-            cursor = conn.cursor()
-            
-            # الحصول على بيانات الفاتورة
-            cursor.execute("""
-                SELECT i.*, u.username as user_name
-                FROM invoices i
-                LEFT JOIN users u ON i.user_id = u.id
-                WHERE i.id = ?
-            """, (invoice_id,))
-            
-            invoice = cursor.fetchone()
+            with ConnectionManager.transaction(cls.db_path) as conn:
+                cursor = conn.cursor()
+                
+                # الحصول على بيانات الفاتورة
+                cursor.execute("""
+                    SELECT i.*, u.username as user_name
+                    FROM invoices i
+                    LEFT JOIN users u ON i.user_id = u.id
+                    WHERE i.id = ?
+                """, (invoice_id,))
+                
+                invoice = cursor.fetchone()
+                
+                if not invoice:
+                    return False, "الفاتورة غير موجودة"
+                
+                invoice_dict = dict(invoice)
+                
+                # الحصول على عناصر الفاتورة
+                cursor.execute("""
+                    SELECT * FROM invoice_items
+                    WHERE invoice_id = ?
+                """, (invoice_id,))
+                
+                items = [dict(row) for row in cursor.fetchall()]
+                invoice_dict["items"] = items
+                
+                return True, invoice_dict
             
-            if not invoice:
-                conn.close()
-                return False, "الفاتورة غير موجودة"
+        except Exception as e:
+            return False, f"خطأ في استرجاع بيانات الفاتورة: {str(e)}"
+    
+    @classmethod
+    def get_invoice_by_barcode(cls, barcode):
+        """
+        الحصول على تفاصيل فاتورة من الباركود المطبوع على الإيصال
+        
+        Args:
+            barcode (str): باركود الفاتورة
             
-            invoice_dict = dict(invoice)
+        Returns:
+            tuple: (success, result)
+                - success (bool): نجاح العملية
+                - result (dict/str): بيانات الفاتورة أو رسالة الخطأ
+        """
+        try:
+            # التأكد من وجود قاعدة البيانات
+            cls._ensure_db_exists()
             
-            # الحصول على عناصر الفاتورة
-            cursor.execute("""
-                SELECT * FROM invoice_items
-                WHERE invoice_id = ?
-            """, (invoice_id,))
+            # البحث بالفهرس idx_invoices_barcode (أحدث فاتورة إذا تكرر باركود قديم)
+            with ConnectionManager.transaction(cls.db_path) as conn:
+                row = conn.execute(
+                    "SELECT id FROM invoices WHERE barcode = ? ORDER BY id DESC LIMIT 1", (barcode,)
+                ).fetchone()
             
-            items = [dict(row) for row in cursor.fetchall()]
-            invoice_dict["items"] = items
+            if not row:
+                return False, "لا توجد فاتورة بهذا الباركود"
             
-            conn.close()
-            return True, invoice_dict
+            return cls.get_invoice(row["id"])
             
         except Exception as e:
-            return False, f"خطأ في استرجاع بيانات الفاتورة: {str(e)}"
+            return False, f"خطأ في البحث عن الفاتورة: {str(e)}"
     
     @classmethod
-    def get_daily_sales(cls, date=None):
+    def get_daily_sales(cls, date=None, summary_only=False, include_items=True):
         """
         الحصول على المبيعات اليومية
         
         Args:
             date (str): التاريخ المطلوب بصيغة YYYY-MM-DD (اليوم الحالي إذا كانت None)
+            summary_only (bool): الإجماليات فقط (بدون قائمة الفواتير)
+            include_items (bool): إرفاق عناصر كل فاتورة في المفتاح items
             
         Returns:
             tuple: (success, result)
@@ -188,51 +198,188 @@ class InvoiceModel:
             if date is None:
                 date = datetime.now().strftime("%Y-%m-%d")
             
+            day_range = (cls._day_start(date), cls._day_start(date, 1))
+            
             # الاتصال بقاعدة البيانات
-            conn = sqlite3.connect(cls.db_path)
-            conn.row_factory = sqlite3.Row  # للحصول على النتائج كقاموس
-            cursor = conn.cursor()
+            with ConnectionManager.transaction(cls.db_path) as conn:
+                cursor = conn.cursor()
+                
+                # الإجماليات من ملخص المبيعات اليومي (صف واحد)
+                cursor.execute("""
+                    SELECT invoices_count, total_sales, items_sold
+                    FROM daily_sales
+                    WHERE date = ?
+                """, (date,))
+                totals = cursor.fetchone()
+                
+                result = {
+                    "date": date,
+                    "total_sales": totals["total_sales"] if totals else 0,
+                    "total_invoices": totals["invoices_count"] if totals else 0,
+                    "total_items": totals["items_sold"] if totals else 0
+                }
+                
+                if summary_only:
+                    return True, result
+                
+                # الحصول على المبيعات اليومية
+                cursor.execute("""
+                    SELECT i.*, u.username as user_name
+                    FROM invoices i
+                    LEFT JOIN users u ON i.user_id = u.id
+                    WHERE i.created_at >= ? AND i.created_at < ?
+                    ORDER BY i.created_at DESC
+                """, day_range)
+                
+                invoices = [dict(row) for row in cursor.fetchall()]
+                
+                if include_items:
+                    # عناصر كل فواتير اليوم باستعلام واحد ثم توزيعها على الفواتير
+                    items_by_invoice = {invoice["id"]: [] for invoice in invoices}
+                    cursor.execute("""
+                        SELECT ii.*
+                        FROM invoices i
+                        JOIN invoice_items ii ON ii.invoice_id = i.id
+                        WHERE i.created_at >= ? AND i.created_at < ?
+                        ORDER BY ii.id
+                    """, day_range)
+                    
+                    for row in cursor.fetchall():
+                        items_by_invoice[row["invoice_id"]].append(dict(row))
+                    
+                    for invoice in invoices:
+                        invoice["items"] = items_by_invoice[invoice["id"]]
+                
+                result["invoices"] = invoices
+                
+                return True, result
             
-            # الحصول على المبيعات اليومية
-            cursor.execute("""
-                SELECT i.*, u.username as user_name
-                FROM invoices i
-                LEFT JOIN users u ON i.user_id = u.id
-                WHERE DATE(i.created_at) = ?
-                ORDER BY i.created_at DESC
-            """, (date,))
+        except Exception as e:
+            return False, f"خطأ في استرجاع المبيعات اليومية: {str(e)}"
+    
+    @classmethod
+    def _attach_items(cls, cursor, invoices):
+        """إرفاق عناصر الفواتير في المفتاح items باستعلام واحد لكل الفواتير"""
+        if not invoices:
+            return
+        
+        items_by_invoice = {invoice["id"]: [] for invoice in invoices}
+        cursor.execute(
+            f"""SELECT * FROM invoice_items
+                WHERE invoice_id IN ({", ".join("?" * len(items_by_invoice))})
+                ORDER BY id""",
+            tuple(items_by_invoice)
+        )
+        for row in cursor.fetchall():
+            items_by_invoice[row["invoice_id"]].append(dict(row))
+        
+        for invoice in invoices:
+            invoice["items"] = items_by_invoice[invoice["id"]]
+    
+    @classmethod
+    def page(cls, after_id=0, limit=100, include_items=False):
+        """
+        صفحة من الفواتير بترتيب المعرف (ترقيم بالمفتاح بدلاً من OFFSET)
+        
+        الصفحة التالية تطلب بمعرف آخر فاتورة في الصفحة الحالية، وصفحة أقصر من
+        limit تعني نهاية الفواتير
+        
+        Args:
+            after_id (int): معرف آخر فاتورة في الصفحة السابقة (0 للصفحة الأولى)
+            limit (int): عدد الفواتير في الصفحة (حتى max_page_size)
+            include_items (bool): إرفاق عناصر كل فاتورة في المفتاح items
             
-            invoices = [dict(row) for row in cursor.fetchall()]
+        Returns:
+            tuple: (success, result)
+                - success (bool): نجاح العملية
+                - result (list/str): قائمة الفواتير أو رسالة الخطأ
+        """
+        try:
+            # التأكد من وجود قاعدة البيانات
+            cls._ensure_db_exists()
             
-            # حساب الإجماليات
-            total_sales = sum(invoice["total"] for invoice in invoices)
-            total_items = 0
+            limit = min(max(int(limit), 1), cls.max_page_size)
             
-            for invoice in invoices:
-                # الحصول على عناصر كل فاتورة
+            # الاتصال بقاعدة البيانات
+            with ConnectionManager.transaction(cls.db_path) as conn:
+                cursor = conn.cursor()
+                
+                # البحث بالمفتاح الأساسي يبدأ من آخر صف مباشرة بدلاً من تخطي الصفوف السابقة كما في OFFSET
                 cursor.execute("""
-                    SELECT * FROM invoice_items
-                    WHERE invoice_id = ?
-                """, (invoice["id"],))
+                    SELECT i.*, u.username as user_name
+                    FROM invoices i
+                    LEFT JOIN users u ON i.user_id = u.id
+                    WHERE i.id > ?
+                    ORDER BY i.id
+                    LIMIT ?
+                """, (after_id or 0, limit))
+                invoices = [dict(row) for row in cursor.fetchall()]
                 
-                items = [dict(row) for row in cursor.fetchall()]
-                invoice["items"] = items
-                total_items += sum(item["quantity"] for item in items)
+                if include_items:
+                    cls._attach_items(cursor, invoices)
+                
+                return True, invoices
             
-            conn.close()
+        except Exception as e:
+            return False, f"خطأ في استرجاع الفواتير: {str(e)}"
+    
+    @classmethod
+    def iter_daily_sales(cls, date=None, include_items=True, batch_size=None):
+        """
+        المرور على فواتير يوم على دفعات بنفس ترتيب get_daily_sales (الأحدث أولاً)
+        
+        بديل get_daily_sales للأيام الكبيرة والتصدير: كل دفعة في معاملة قصيرة
+        تبدأ بعد آخر فاتورة (created_at, id) في الدفعة السابقة فتبقى الذاكرة ثابتة،
+        والإجماليات متاحة من get_daily_sales(date, summary_only=True)
+        
+        Args:
+            date (str): التاريخ المطلوب بصيغة YYYY-MM-DD (اليوم الحالي إذا كانت None)
+            include_items (bool): إرفاق عناصر كل فاتورة في المفتاح items
+            batch_size (int): عدد الفواتير في كل دفعة (batch_size الافتراضي إذا كان None)
             
-            result = {
-                "date": date,
-                "invoices": invoices,
-                "total_sales": total_sales,
-                "total_invoices": len(invoices),
-                "total_items": total_items
-            }
+        Yields:
+            dict: بيانات الفاتورة مع user_name
             
-            return True, result
+        Raises:
+            Exception: خطأ قاعدة البيانات أثناء قراءة إحدى الدفعات
+        """
+        # التأكد من وجود قاعدة البيانات
+        cls._ensure_db_exists()
+        
+        if date is None:
+            date = datetime.now().strftime("%Y-%m-%d")
+        
+        day_range = (cls._day_start(date), cls._day_start(date, 1))
+        batch_size = min(batch_size or cls.batch_size, cls.max_page_size)
+        last = None
+        
+        while True:
+            with ConnectionManager.transaction(cls.db_path) as conn:
+                cursor = conn.cursor()
+                
+                if last is None:
+                    after, params = "", day_range
+                else:
+                    after = "AND (i.created_at < ? OR (i.created_at = ? AND i.id < ?))"
+                    params = day_range + (last["created_at"], last["created_at"], last["id"])
+                
+                cursor.execute(f"""
+                    SELECT i.*, u.username as user_name
+                    FROM invoices i
+                    LEFT JOIN users u ON i.user_id = u.id
+                    WHERE i.created_at >= ? AND i.created_at < ? {after}
+                    ORDER BY i.created_at DESC, i.id DESC
+                    LIMIT ?
+                """, params + (batch_size,))
+                invoices = [dict(row) for row in cursor.fetchall()]
+                
+                if include_items:
+                    cls._attach_items(cursor, invoices)
             
-        except Exception as e:
-            return False, f"خطأ في استرجاع المبيعات اليومية: {str(e)}"
+            yield from invoices
+            if len(invoices) < batch_size:
+                return
+            last = invoices[-1]
     
     @classmethod
     def get_sales_by_date_range(cls, start_date, end_date):
@@ -240,8 +387,8 @@ class InvoiceModel:
         الحصول على المبيعات في فترة زمنية محددة
         
         Args:
-            start_date (str): تاريخ البداية بصيغة YYYY-MM-DD
-            end_date (str): تاريخ النهاية بصيغة YYYY-MM-DD
+            start_date (str): تاريخ البداية بصيغة YYYY-MM-DD (None بدون حد أدنى)
+            end_date (str): تاريخ النهاية بصيغة YYYY-MM-DD شاملاً (None بدون حد أعلى)
             
         Returns:
             tuple: (success, result)
@@ -253,34 +400,68 @@ class InvoiceModel:
             cls._ensure_db_exists()
             
             # الاتصال بقاعدة البيانات
-            conn = sqlite3.connect(cls.db_path)
-            conn.row_factory = sqlite3.Row  # للحصول على النتائج كقاموس
-            cursor = conn.cursor()
-            
-            # الحصول على المبيعات في الفترة الزمنية
-            cursor.execute("""
-                SELECT DATE(created_at) as date, 
-                       COUNT(*) as invoices_count,
-                       SUM(total) as total_sales
-                FROM invoices
-                WHERE DATE(created_at) BETWEEN ? AND ?
-                GROUP BY DATE(created_at)
-                ORDER BY date DESC
-            """, (start_date, end_date))
-            
-            daily_sales = [dict(row) for row in cursor.fetchall()]
+            with ConnectionManager.transaction(cls.db_path) as conn:
+                cursor = conn.cursor()
+                
+                # الحصول على المبيعات في الفترة الزمنية من ملخص المبيعات (صف لكل يوم)
+                cursor.execute("""
+                    SELECT date, invoices_count, total_sales
+                    FROM daily_sales
+                    WHERE date >= ? AND date <= ?
+                    ORDER BY date DESC
+                """, (start_date or "", end_date or "\uffff"))
+                
+                daily_sales = [dict(row) for row in cursor.fetchall()]
+                
+                result = {
+                    "start_date": start_date,
+                    "end_date": end_date,
+                    "daily_sales": daily_sales,
+                    "total_sales": sum(day["total_sales"] for day in daily_sales),
+                    "total_invoices": sum(day["invoices_count"] for day in daily_sales)
+                }
+                
+                return True, result
             
-            conn.close()
+        except Exception as e:
+            return False, f"خطأ في استرجاع المبيعات: {str(e)}"
+    
+    @classmethod
+    def get_sales_by_cashier(cls, start_date=None, end_date=None):
+        """
+        إجمالي مبيعات كل كاشير في فترة زمنية
+        
+        Args:
+            start_date (str): تاريخ البداية بصيغة YYYY-MM-DD (None بدون حد أدنى)
+            end_date (str): تاريخ النهاية بصيغة YYYY-MM-DD شاملاً (None بدون حد أعلى)
             
-            result = {
-                "start_date": start_date,
-                "end_date": end_date,
-                "daily_sales": daily_sales,
-                "total_sales": sum(day["total_sales"] for day in daily_sales),
-                "total_invoices": sum(day["invoices_count"] for day in daily_sales)
-            }
+        Returns:
+            tuple: (success, result)
+                - success (bool): نجاح العملية
+                - result (list/str): إجماليات كل كاشير مرتبة بالمبيعات أو رسالة الخطأ
+        """
+        try:
+            # التأكد من وجود قاعدة البيانات
+            cls._ensure_db_exists()
             
-            return True, result
+            # الاتصال بقاعدة البيانات
+            with ConnectionManager.transaction(cls.db_path) as conn:
+                cursor = conn.cursor()
+                
+                # الفواتير بدون مستخدم مسجلة بالمعرف 0
+                cursor.execute("""
+                    SELECT s.user_id, u.username as user_name,
+                           SUM(s.invoices_count) as invoices_count,
+                           SUM(s.total_sales) as total_sales,
+                           SUM(s.items_sold) as items_sold
+                    FROM cashier_daily_sales s
+                    LEFT JOIN users u ON u.id = s.user_id
+                    WHERE s.date >= ? AND s.date <= ?
+                    GROUP BY s.user_id
+                    ORDER BY total_sales DESC
+                """, (start_date or "", end_date or "\uffff"))
+                
+                return True, [dict(row) for row in cursor.fetchall()]
             
         except Exception as e:
-            return False, f"خطأ في استرجاع المبيعات: {str(e)}"
\ No newline at end of file
+            return False, f"خطأ في استرجاع مبيعات الكاشيرين: {str(e)}"
@@ -0,0 +1,183 @@
+from datetime import datetime
+from database.connection_manager import ConnectionManager
+from database.schema_migrations import SchemaMigrations
+
+class ParkedCartModel:
+    """
+    فئة نموذج السلال المعلقة - تحفظ سلة لم يكتمل بيعها حتى تستأنف لاحقاً
+    من نفس الجهاز أو من جهاز آخر
+    """
+
+    # مسار قاعدة البيانات
+    db_path = "data/store.db"
+
+    @classmethod
+    def _ensure_db_exists(cls):
+        """التأكد من ترحيل قاعدة البيانات (الجداول تنشأ مرة واحدة عند بدء البرنامج)"""
+        SchemaMigrations.ensure(cls.db_path)
+
+    @classmethod
+    def park(cls, name, terminal, user_id, items, discount=0):
+        """
+        حفظ سلة معلقة
+
+        Args:
+            name (str): اسم السلة (اسم العميل غالباً)
+            terminal (str): الجهاز الذي علق السلة
+            user_id (int): معرف المستخدم (الكاشير)
+            items (list): عناصر السلة (product_id, name, price, quantity, total)
+            discount (float): الخصم المطلوب على السلة
+
+        Returns:
+            tuple: (success, result)
+                - success (bool): نجاح العملية
+                - result (int/str): معرف السلة المعلقة أو رسالة الخطأ
+        """
+        try:
+            # التأكد من وجود قاعدة البيانات
+            cls._ensure_db_exists()
+
+            if not items:
+                return False, "السلة فارغة"
+
+            name = (name or "").strip()
+            if not name:
+                return False, "يجب إدخال اسم للسلة"
+
+            subtotal = round(sum(item["total"] for item in items), 2)
+            parked_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+            # الاتصال بقاعدة البيانات
+            with ConnectionManager.transaction(cls.db_path) as conn:
+                cursor = conn.cursor()
+
+                cursor.execute(
+                    """INSERT INTO parked_carts
+                       (name, terminal, user_id, items_count, subtotal, discount, parked_at)
+                       VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                    (name, terminal, user_id, len(items), subtotal, discount or 0, parked_at)
+                )
+                cart_id = cursor.lastrowid
+
+                # العناصر دفعة واحدة بترتيبها في السلة
+                cursor.executemany(
+                    """INSERT INTO parked_cart_items
+                       (cart_id, position, product_id, name, price, quantity)
+                       VALUES (?, ?, ?, ?, ?, ?)""",
+                    [(cart_id, position, item["product_id"], item["name"], item["price"], item["quantity"])
+                     for position, item in enumerate(items)]
+                )
+
+                return True, cart_id
+
+        except Exception as e:
+            return False, f"خطأ في تعليق السلة: {str(e)}"
+
+    @classmethod
+    def get_parked_carts(cls, terminal=None):
+        """
+        الحصول على السلال المعلقة (بدون عناصرها) من الأحدث للأقدم
+
+        Args:
+            terminal (str): سلال جهاز معين فقط (None: كل الأجهزة)
+
+        Returns:
+            tuple: (success, result)
+                - success (bool): نجاح العملية
+                - result (list/str): قائمة السلال أو رسالة الخطأ
+        """
+        try:
+            # التأكد من وجود قاعدة البيانات
+            cls._ensure_db_exists()
+
+            # الاتصال بقاعدة البيانات
+            with ConnectionManager.transaction(cls.db_path) as conn:
+                cursor = conn.cursor()
+
+                if terminal is None:
+                    cursor.execute("SELECT * FROM parked_carts ORDER BY parked_at DESC, id DESC")
+                else:
+                    cursor.execute(
+                        "SELECT * FROM parked_carts WHERE terminal = ? ORDER BY parked_at DESC, id DESC",
+                        (terminal,)
+                    )
+                carts = [dict(row) for row in cursor.fetchall()]
+
+                return True, carts
+
+        except Exception as e:
+            return False, f"خطأ في استرجاع السلال المعلقة: {str(e)}"
+
+    @classmethod
+    def take(cls, cart_id):
+        """
+        سحب سلة معلقة لاستئنافها: قراءتها وحذفها في نفس المعاملة
+        فلا يمكن أن يستأنف جهازان نفس السلة
+
+        Args:
+            cart_id (int): معرف السلة المعلقة
+
+        Returns:
+            tuple: (success, result)
+                - success (bool): نجاح العملية
+                - result (dict/str): بيانات السلة مع عناصرها (items) أو رسالة الخطأ
+        """
+        try:
+            # التأكد من وجود قاعدة البيانات
+            cls._ensure_db_exists()
+
+            # حجز قفل الكتابة من البداية حتى لا يقرأ جهازان نفس السلة قبل حذفها
+            with ConnectionManager.transaction(cls.db_path, immediate=True) as conn:
+                cursor = conn.cursor()
+
+                cursor.execute("SELECT * FROM parked_carts WHERE id = ?", (cart_id,))
+                cart = cursor.fetchone()
+                if not cart:
+                    return False, "السلة غير موجودة أو تم استئنافها من جهاز آخر"
+
+                cart = dict(cart)
+                cursor.execute(
+                    """SELECT product_id, name, price, quantity FROM parked_cart_items
+                       WHERE cart_id = ? ORDER BY position""",
+                    (cart_id,)
+                )
+                cart["items"] = [dict(row) for row in cursor.fetchall()]
+
+                cursor.execute("DELETE FROM parked_cart_items WHERE cart_id = ?", (cart_id,))
+                cursor.execute("DELETE FROM parked_carts WHERE id = ?", (cart_id,))
+
+                return True, cart
+
+        except Exception as e:
+            return False, f"خطأ في استئناف السلة: {str(e)}"
+
+    @classmethod
+    def delete_parked_cart(cls, cart_id):
+        """
+        حذف سلة معلقة بدون استئنافها
+
+        Args:
+            cart_id (int): معرف السلة المعلقة
+
+        Returns:
+            tuple: (success, message)
+                - success (bool): نجاح العملية
+                - message (str): رسالة النجاح أو الخطأ
+        """
+        try:
+            # التأكد من وجود قاعدة البيانات
+            cls._ensure_db_exists()
+
+            # الاتصال بقاعدة البيانات
+            with ConnectionManager.transaction(cls.db_path) as conn:
+                cursor = conn.cursor()
+
+                cursor.execute("DELETE FROM parked_cart_items WHERE cart_id = ?", (cart_id,))
+                cursor.execute("DELETE FROM parked_carts WHERE id = ?", (cart_id,))
+                if cursor.rowcount == 0:
+                    return False, "السلة غير موجودة"
+
+                return True, "تم حذف السلة المعلقة"
+
+        except Exception as e:
+            return False, f"خطأ في حذف السلة المعلقة: {str(e)}"
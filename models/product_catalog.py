@@ -0,0 +1,243 @@
+import threading
+from models.product_model import ProductModel
+from models.product_search import ProductSearchIndex, normalize_arabic
+
+class ProductCatalog:
+    """
+    ذاكرة مؤقتة للمنتجات - تحمل جميع المنتجات مرة واحدة ثم تتحدث تلقائياً
+    من أحداث ProductModel، وتبلغ الواجهة بكل منتج تغير حتى تحدث صفه فقط
+    """
+
+    # المنتجات المحملة حسب المعرف (None قبل أول تحميل)
+    _products = None
+    _index = ProductSearchIndex()
+    _lock = threading.RLock()
+
+    # المنتجات حسب الباركود (للإضافة للسلة بالماسح دون الرجوع لقاعدة البيانات)
+    _by_barcode = {}
+
+    # دوال الاستماع لتغييرات الذاكرة: callback(event, product)
+    _listeners = []
+
+    @classmethod
+    def load(cls, force=False):
+        """
+        تحميل المنتجات من قاعدة البيانات (مرة واحدة ما لم يطلب force)
+
+        Args:
+            force (bool): إعادة التحميل حتى لو كانت المنتجات محملة
+
+        Returns:
+            tuple: (success, message)
+                - success (bool): نجاح العملية
+                - message (str): رسالة الخطأ إن وجدت
+        """
+        with cls._lock:
+            if cls._products is not None and not force:
+                return True, ""
+
+            success, products = ProductModel.get_all_products()
+            if not success:
+                return False, products
+
+            cls._products = {product["id"]: product for product in products}
+            cls._index = ProductSearchIndex()
+            cls._index.build((product["id"], product["name"]) for product in products)
+            cls._by_barcode = {product["barcode"]: product["id"] for product in products if product.get("barcode")}
+            ProductModel.subscribe(cls._on_products_changed)
+            return True, ""
+
+    @classmethod
+    def subscribe(cls, callback):
+        """
+        الاشتراك في تغييرات الذاكرة
+
+        Args:
+            callback (callable): دالة تستقبل (event, product) حيث event هو
+                "added" أو "updated" أو "removed"
+        """
+        if callback not in cls._listeners:
+            cls._listeners.append(callback)
+
+    @classmethod
+    def unsubscribe(cls, callback):
+        """إلغاء الاشتراك في تغييرات الذاكرة"""
+        if callback in cls._listeners:
+            cls._listeners.remove(callback)
+
+    @classmethod
+    def get_all_products(cls):
+        """
+        الحصول على جميع المنتجات من الذاكرة (للقراءة فقط)
+
+        Returns:
+            tuple: (success, result)
+                - success (bool): نجاح العملية
+                - result (list/str): قائمة المنتجات أو رسالة الخطأ
+        """
+        success, message = cls.load()
+        if not success:
+            return False, message
+
+        with cls._lock:
+            return True, list(cls._products.values())
+
+    @classmethod
+    def get_available_products(cls):
+        """
+        الحصول على المنتجات المتاحة فقط (الكمية > 0) من الذاكرة
+
+        Returns:
+            tuple: (success, result)
+                - success (bool): نجاح العملية
+                - result (list/str): قائمة المنتجات أو رسالة الخطأ
+        """
+        success, message = cls.load()
+        if not success:
+            return False, message
+
+        with cls._lock:
+            return True, [product for product in cls._products.values() if product["quantity"] > 0]
+
+    @classmethod
+    def get_product(cls, product_id):
+        """
+        الحصول على منتج من الذاكرة حسب المعرف
+
+        Args:
+            product_id (int): معرف المنتج
+
+        Returns:
+            tuple: (success, result)
+                - success (bool): نجاح العملية
+                - result (dict/str): بيانات المنتج أو رسالة الخطأ
+        """
+        success, message = cls.load()
+        if not success:
+            return False, message
+
+        with cls._lock:
+            product = cls._products.get(product_id)
+
+        if product:
+            return True, product
+        else:
+            return False, "المنتج غير موجود"
+
+    @classmethod
+    def get_product_by_barcode(cls, barcode):
+        """
+        الحصول على منتج من الذاكرة حسب الباركود (بحث واحد في قاموس)
+
+        Args:
+            barcode (str): الباركود كما قرأه الماسح
+
+        Returns:
+            tuple: (success, result)
+                - success (bool): نجاح العملية
+                - result (dict/str): بيانات المنتج أو رسالة الخطأ
+        """
+        success, message = cls.load()
+        if not success:
+            return False, message
+
+        with cls._lock:
+            product_id = cls._by_barcode.get(barcode.strip())
+            product = cls._products.get(product_id) if product_id is not None else None
+
+        if product:
+            return True, product
+        else:
+            return False, "لا يوجد منتج بهذا الباركود"
+
+    @classmethod
+    def _set_barcode(cls, old, new):
+        """تحديث قاموس الباركود عند تغير منتج (old أو new قد يكون None)"""
+        if old and old.get("barcode") and cls._by_barcode.get(old["barcode"]) == old["id"]:
+            del cls._by_barcode[old["barcode"]]
+        if new and new.get("barcode"):
+            cls._by_barcode[new["barcode"]] = new["id"]
+
+    @classmethod
+    def search(cls, query, available_only=False, limit=None):
+        """
+        البحث في أسماء المنتجات عبر الفهرس (مع توحيد الكتابة العربية)
+
+        Args:
+            query (str): نص البحث (فارغ لكل المنتجات بترتيبها الأصلي)
+            available_only (bool): المنتجات المتاحة فقط (الكمية > 0)
+            limit (int): الحد الأقصى للنتائج (None لكل النتائج)
+
+        Returns:
+            tuple: (success, result)
+                - success (bool): نجاح العملية
+                - result (list/str): المنتجات مرتبة حسب الصلة أو رسالة الخطأ
+        """
+        success, message = cls.load()
+        if not success:
+            return False, message
+
+        with cls._lock:
+            products = cls._products
+            if not normalize_arabic(query):
+                # بدون نص بحث: كل المنتجات بترتيب تحميلها
+                results = [product for product in products.values()
+                           if not available_only or product["quantity"] > 0]
+                return True, results[:limit]
+
+            accept = None
+            if available_only:
+                accept = lambda product_id: products[product_id]["quantity"] > 0
+
+            return True, [products[product_id] for product_id in cls._index.search(query, limit, accept)]
+
+    @classmethod
+    def matches(cls, product, query):
+        """التحقق من ظهور المنتج في نتائج البحث (لتحديث صف واحد في الواجهة)"""
+        return ProductSearchIndex.matches(query, product["name"])
+
+    @classmethod
+    def _on_products_changed(cls, event, product_ids):
+        """تحديث المنتجات المتغيرة فقط ثم إبلاغ المشتركين بكل منتج على حدة"""
+        changes = []
+
+        if cls._products is None:
+            return
+
+        if event != "removed":
+            # إعادة قراءة المنتجات المتغيرة فقط باستعلام واحد (خارج القفل حتى لا تنتظره القراءات)
+            success, products = ProductModel.get_products_by_ids(product_ids)
+            if not success:
+                return
+
+        with cls._lock:
+            if cls._products is None:
+                return
+
+            if event == "removed":
+                for product_id in product_ids:
+                    product = cls._products.pop(product_id, None)
+                    cls._index.remove(product_id)
+                    if product:
+                        cls._set_barcode(product, None)
+                        changes.append(("removed", product))
+            else:
+                found = set()
+                for product in products:
+                    found.add(product["id"])
+                    change = "updated" if product["id"] in cls._products else "added"
+                    cls._set_barcode(cls._products.get(product["id"]), product)
+                    cls._products[product["id"]] = product
+                    cls._index.add(product["id"], product["name"])
+                    changes.append((change, product))
+
+                # منتجات لم تعد موجودة (حذفت من مكان آخر)
+                for product_id in product_ids:
+                    if product_id not in found and product_id in cls._products:
+                        cls._index.remove(product_id)
+                        cls._set_barcode(cls._products[product_id], None)
+                        changes.append(("removed", cls._products.pop(product_id)))
+
+        for change, product in changes:
+            for callback in list(cls._listeners):
+                callback(change, product)
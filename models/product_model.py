@@ -1,5 +1,6 @@
 import sqlite3
-import os
+from database.connection_manager import ConnectionManager
+from database.schema_migrations import SchemaMigrations
 
 class ProductModel:
     """
@@ -9,29 +10,55 @@ class ProductModel:
     # مسار قاعدة البيانات
     db_path = "data/store.db"
     
+    # دوال الاستماع لتغييرات المنتجات: callback(event, product_ids)
+    _listeners = []
+    
+    # عدد الصفوف في كل دفعة من دوال iter_ وأقصى حد لصفحة page
+    batch_size = 500
+    max_page_size = 1000
+    
     @classmethod
     def _ensure_db_exists(cls):
-        """التأكد من وجود قاعدة البيانات وإنشاء الجداول إذا لم تكن موجودة"""
-        # التأكد من وجود مجلد البيانات
-        os.makedirs(os.path.dirname(cls.db_path), exist_ok=True)
+        """التأكد من ترحيل قاعدة البيانات (الجداول تنشأ مرة واحدة عند بدء البرنامج)"""
+        SchemaMigrations.ensure(cls.db_path)
+    
+    @classmethod
+    def subscribe(cls, callback):
+        """
+        الاشتراك في تغييرات المنتجات
         
-        # إنشاء الاتصال بقاعدة البيانات
-        conn = sqlite3.connect(cls.db_path)
-        cursor = conn.cursor()
+        Args:
+            callback (callable): دالة تستقبل (event, product_ids) حيث event
+                هو "added" أو "updated" أو "removed"
+        """
+        if callback not in cls._listeners:
+            cls._listeners.append(callback)
+    
+    @classmethod
+    def unsubscribe(cls, callback):
+        """إلغاء الاشتراك في تغييرات المنتجات"""
+        if callback in cls._listeners:
+            cls._listeners.remove(callback)
+    
+    @classmethod
+    def notify_changed(cls, event, product_ids):
+        """
+        إبلاغ المشتركين بتغيير منتجات
         
-        # إنشاء جدول المنتجات إذا لم يكن موجوداً
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS products (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT UNIQUE NOT NULL,
-                price REAL NOT NULL,
-                quantity INTEGER NOT NULL DEFAULT 0,
-                sold INTEGER NOT NULL DEFAULT 0
-            )
-        ''')
+        يستدعى داخل المعاملة التي غيرت المنتجات، ويؤجل الإبلاغ حتى تأكيدها
+        فلا يصل أي حدث عن تغيير تم التراجع عنه
+        
+        Args:
+            event (str): نوع التغيير ("added" أو "updated" أو "removed")
+            product_ids (iterable): معرفات المنتجات المتغيرة
+        """
+        product_ids = list(product_ids)
         
-        conn.commit()
-        conn.close()
+        def publish():
+            for callback in list(cls._listeners):
+                callback(event, product_ids)
+        
+        ConnectionManager.on_commit(cls.db_path, publish)
     
     @classmethod
     def get_all_products(cls):
@@ -48,16 +75,14 @@ class ProductModel:
             cls._ensure_db_exists()
             
             # الاتصال بقاعدة البيانات
-            conn = sqlite3.connect(cls.db_path)
-            conn.row_factory = sqlite3.Row  # للحصول على النتائج كقاموس
-            cursor = conn.cursor()
-            
-            # الحصول على جميع المنتجات
-            cursor.execute("SELECT * FROM products")
-            products = [dict(row) for row in cursor.fetchall()]
-            conn.close()
-            
-            return True, products
+            with ConnectionManager.transaction(cls.db_path) as conn:
+                cursor = conn.cursor()
+                
+                # الحصول على جميع المنتجات
+                cursor.execute("SELECT * FROM products")
+                products = [dict(row) for row in cursor.fetchall()]
+                
+                return True, products
             
         except Exception as e:
             return False, f"خطأ في استرجاع المنتجات: {str(e)}"
@@ -77,19 +102,110 @@ class ProductModel:
             cls._ensure_db_exists()
             
             # الاتصال بقاعدة البيانات
-            conn = sqlite3.connect(cls.db_path)
-            conn.row_factory = sqlite3.Row  # للحصول على النتائج كقاموس
+            with ConnectionManager.transaction(cls.db_path) as conn:
+                cursor = conn.cursor()
+                
+                # الحصول على المنتجات المتاحة
+                cursor.execute("SELECT * FROM products WHERE quantity > 0")
+                products = [dict(row) for row in cursor.fetchall()]
+                
+                return True, products
+            
+        except Exception as e:
+            return False, f"خطأ في استرجاع المنتجات المتاحة: {str(e)}"
+    
+    @classmethod
+    def _fetch_page(cls, after_id, limit, available_only=False):
+        """صفحة منتجات بعد معرف معين بترتيب المعرف (بدون معالجة الأخطاء)"""
+        with ConnectionManager.transaction(cls.db_path) as conn:
             cursor = conn.cursor()
             
-            # الحصول على المنتجات المتاحة
-            cursor.execute("SELECT * FROM products WHERE quantity > 0")
-            products = [dict(row) for row in cursor.fetchall()]
-            conn.close()
+            # البحث بالمفتاح الأساسي يبدأ من آخر صف مباشرة بدلاً من تخطي الصفوف السابقة كما في OFFSET
+            cursor.execute(
+                f"""SELECT * FROM products
+                    WHERE id > ?{" AND quantity > 0" if available_only else ""}
+                    ORDER BY id
+                    LIMIT ?""",
+                (after_id or 0, limit)
+            )
+            return [dict(row) for row in cursor.fetchall()]
+    
+    @classmethod
+    def page(cls, after_id=0, limit=100, available_only=False):
+        """
+        صفحة من المنتجات بترتيب المعرف (ترقيم بالمفتاح بدلاً من OFFSET)
+        
+        الصفحة التالية تطلب بمعرف آخر منتج في الصفحة الحالية، وصفحة أقصر من
+        limit تعني نهاية المنتجات
+        
+        Args:
+            after_id (int): معرف آخر منتج في الصفحة السابقة (0 للصفحة الأولى)
+            limit (int): عدد المنتجات في الصفحة (حتى max_page_size)
+            available_only (bool): المنتجات المتاحة فقط (الكمية > 0)
             
-            return True, products
+        Returns:
+            tuple: (success, result)
+                - success (bool): نجاح العملية
+                - result (list/str): قائمة المنتجات أو رسالة الخطأ
+        """
+        try:
+            # التأكد من وجود قاعدة البيانات
+            cls._ensure_db_exists()
+            
+            return True, cls._fetch_page(after_id, min(max(int(limit), 1), cls.max_page_size), available_only)
             
         except Exception as e:
-            return False, f"خطأ في استرجاع المنتجات المتاحة: {str(e)}"
+            return False, f"خطأ في استرجاع المنتجات: {str(e)}"
+    
+    @classmethod
+    def _iter_pages(cls, available_only, batch_size):
+        """المرور على المنتجات صفحة بعد صفحة"""
+        cls._ensure_db_exists()
+        
+        batch_size = batch_size or cls.batch_size
+        after_id = 0
+        while True:
+            # كل دفعة في معاملة قصيرة مستقلة فلا تبقى معاملة قراءة مفتوحة أثناء معالجة الصفوف
+            products = cls._fetch_page(after_id, batch_size, available_only)
+            yield from products
+            if len(products) < batch_size:
+                return
+            after_id = products[-1]["id"]
+    
+    @classmethod
+    def iter_products(cls, batch_size=None):
+        """
+        المرور على جميع المنتجات بترتيب المعرف على دفعات (ذاكرة ثابتة مهما كان عدد المنتجات)
+        
+        بديل get_all_products للجداول الكبيرة والتصدير، والمنتجات المضافة أثناء
+        المرور تظهر إذا كان معرفها بعد آخر دفعة
+        
+        Args:
+            batch_size (int): عدد المنتجات في كل دفعة (batch_size الافتراضي إذا كان None)
+            
+        Yields:
+            dict: بيانات المنتج
+            
+        Raises:
+            Exception: خطأ قاعدة البيانات أثناء قراءة إحدى الدفعات
+        """
+        return cls._iter_pages(False, batch_size)
+    
+    @classmethod
+    def iter_available_products(cls, batch_size=None):
+        """
+        المرور على المنتجات المتاحة فقط (الكمية > 0) على دفعات مثل iter_products
+        
+        Args:
+            batch_size (int): عدد المنتجات في كل دفعة (batch_size الافتراضي إذا كان None)
+            
+        Yields:
+            dict: بيانات المنتج
+            
+        Raises:
+            Exception: خطأ قاعدة البيانات أثناء قراءة إحدى الدفعات
+        """
+        return cls._iter_pages(True, batch_size)
     
     @classmethod
     def get_product(cls, product_id):
@@ -109,25 +225,104 @@ class ProductModel:
             cls._ensure_db_exists()
             
             # الاتصال بقاعدة البيانات
-            conn = sqlite3.connect(cls.db_path)
-            conn.row_factory = sqlite3.Row  # للحصول على النتائج كقاموس
-            cursor = conn.cursor()
+            with ConnectionManager.transaction(cls.db_path) as conn:
+                cursor = conn.cursor()
+                
+                # البحث عن المنتج بواسطة المعرف
+                cursor.execute("SELECT * FROM products WHERE id = ?", (product_id,))
+                product = cursor.fetchone()
+                
+                if product:
+                    return True, dict(product)
+                else:
+                    return False, "المنتج غير موجود"
+                
+        except Exception as e:
+            return False, f"خطأ في استرجاع المنتج: {str(e)}"
+    
+    @classmethod
+    def get_products_by_ids(cls, product_ids):
+        """
+        الحصول على مجموعة منتجات باستعلام واحد
+        
+        Args:
+            product_ids (list): معرفات المنتجات
             
-            # البحث عن المنتج بواسطة المعرف
-            cursor.execute("SELECT * FROM products WHERE id = ?", (product_id,))
-            product = cursor.fetchone()
-            conn.close()
+        Returns:
+            tuple: (success, result)
+                - success (bool): نجاح العملية
+                - result (list/str): المنتجات الموجودة منها أو رسالة الخطأ
+        """
+        try:
+            # التأكد من وجود قاعدة البيانات
+            cls._ensure_db_exists()
             
-            if product:
-                return True, dict(product)
-            else:
-                return False, "المنتج غير موجود"
+            product_ids = list(product_ids)
+            if not product_ids:
+                return True, []
+            
+            # الاتصال بقاعدة البيانات
+            with ConnectionManager.transaction(cls.db_path) as conn:
+                cursor = conn.cursor()
+                
+                placeholders = ",".join("?" * len(product_ids))
+                cursor.execute(f"SELECT * FROM products WHERE id IN ({placeholders})", product_ids)
+                products = [dict(row) for row in cursor.fetchall()]
                 
+                return True, products
+            
         except Exception as e:
-            return False, f"خطأ في استرجاع المنتج: {str(e)}"
+            return False, f"خطأ في استرجاع المنتجات: {str(e)}"
+    
+    @classmethod
+    def get_product_by_barcode(cls, barcode):
+        """
+        الحصول على منتج حسب الباركود
+        
+        Args:
+            barcode (str): باركود المنتج
+            
+        Returns:
+            tuple: (success, result)
+                - success (bool): نجاح العملية
+                - result (dict/str): بيانات المنتج أو رسالة الخطأ
+        """
+        try:
+            # التأكد من وجود قاعدة البيانات
+            cls._ensure_db_exists()
+            
+            barcode = cls._clean_barcode(barcode)
+            if barcode is None:
+                return False, "الباركود مطلوب"
+            
+            # الاتصال بقاعدة البيانات
+            with ConnectionManager.transaction(cls.db_path) as conn:
+                product = conn.execute("SELECT * FROM products WHERE barcode = ?", (barcode,)).fetchone()
+                
+                if product:
+                    return True, dict(product)
+                else:
+                    return False, "لا يوجد منتج بهذا الباركود"
+                
+        except Exception as e:
+            return False, f"خطأ في البحث بالباركود: {str(e)}"
+    
+    @classmethod
+    def _clean_barcode(cls, barcode):
+        """توحيد الباركود المدخل (None للقيمة الفارغة)"""
+        if barcode is None:
+            return None
+        return str(barcode).strip() or None
+    
+    @classmethod
+    def _integrity_message(cls, error):
+        """رسالة خطأ تكرار الاسم أو الباركود"""
+        if "barcode" in str(error):
+            return "الباركود مستخدم لمنتج آخر"
+        return "اسم المنتج موجود بالفعل"
     
     @classmethod
-    def add_product(cls, name, price, quantity):
+    def add_product(cls, name, price, quantity, barcode=None):
         """
         إضافة منتج جديد
         
@@ -135,6 +330,7 @@ class ProductModel:
             name (str): اسم المنتج
             price (float): سعر المنتج
             quantity (int): الكمية المتاحة
+            barcode (str): باركود المنتج (None أو نص فارغ بدون باركود)
             
         Returns:
             tuple: (success, message)
@@ -156,26 +352,25 @@ class ProductModel:
                 return False, "الكمية لا يمكن أن تكون سالبة"
             
             # الاتصال بقاعدة البيانات
-            conn = sqlite3.connect(cls.db_path)
-            cursor = conn.cursor()
-            
-            # إضافة المنتج
-            try:
-                cursor.execute(
-                    "INSERT INTO products (name, price, quantity) VALUES (?, ?, ?)",
-                    (name, price, quantity)
-                )
-                conn.commit()
-                conn.close()
-                return True, "تمت إضافة المنتج بنجاح"
-            except sqlite3.IntegrityError:
-                return False, "اسم المنتج موجود بالفعل"
+            with ConnectionManager.transaction(cls.db_path) as conn:
+                cursor = conn.cursor()
+                
+                # إضافة المنتج
+                try:
+                    cursor.execute(
+                        "INSERT INTO products (name, price, quantity, barcode) VALUES (?, ?, ?, ?)",
+                        (name, price, quantity, cls._clean_barcode(barcode))
+                    )
+                    cls.notify_changed("added", [cursor.lastrowid])
+                    return True, "تمت إضافة المنتج بنجاح"
+                except sqlite3.IntegrityError as e:
+                    return False, cls._integrity_message(e)
                 
         except Exception as e:
             return False, f"خطأ في إضافة المنتج: {str(e)}"
     
     @classmethod
-    def update_product(cls, product_id, name, price, quantity):
+    def update_product(cls, product_id, name, price, quantity, barcode=None):
         """
         تحديث بيانات منتج
         
@@ -184,6 +379,7 @@ class ProductModel:
             name (str): اسم المنتج الجديد
             price (float): سعر المنتج الجديد
             quantity (int): الكمية المتاحة الجديدة
+            barcode (str): الباركود الجديد (None يبقي الحالي، والنص الفارغ يحذفه)
             
         Returns:
             tuple: (success, message)
@@ -205,28 +401,28 @@ class ProductModel:
                 return False, "الكمية لا يمكن أن تكون سالبة"
             
             # الاتصال بقاعدة البيانات
-            conn = sqlite3.connect(cls.db_path)
-            cursor = conn.cursor()
-            
-            # التحقق من وجود المنتج
-            cursor.execute("SELECT * FROM products WHERE id = ?", (product_id,))
-            product = cursor.fetchone()
-            
-            if not product:
-                conn.close()
-                return False, "المنتج غير موجود"
-            
-            # تحديث بيانات المنتج
-            try:
-                cursor.execute(
-                    "UPDATE products SET name = ?, price = ?, quantity = ? WHERE id = ?",
-                    (name, price, quantity, product_id)
-                )
-                conn.commit()
-                conn.close()
-                return True, "تم تحديث بيانات المنتج بنجاح"
-            except sqlite3.IntegrityError:
-                return False, "اسم المنتج موجود بالفعل"
+            with ConnectionManager.transaction(cls.db_path) as conn:
+                cursor = conn.cursor()
+                
+                # التحقق من وجود المنتج
+                cursor.execute("SELECT * FROM products WHERE id = ?", (product_id,))
+                product = cursor.fetchone()
+                
+                if not product:
+                    return False, "المنتج غير موجود"
+                
+                # تحديث بيانات المنتج
+                try:
+                    if barcode is None:
+                        barcode = product["barcode"]
+                    cursor.execute(
+                        "UPDATE products SET name = ?, price = ?, quantity = ?, barcode = ? WHERE id = ?",
+                        (name, price, quantity, cls._clean_barcode(barcode), product_id)
+                    )
+                    cls.notify_changed("updated", [product_id])
+                    return True, "تم تحديث بيانات المنتج بنجاح"
+                except sqlite3.IntegrityError as e:
+                    return False, cls._integrity_message(e)
                 
         except Exception as e:
             return False, f"خطأ في تحديث المنتج: {str(e)}"
@@ -253,30 +449,22 @@ class ProductModel:
             if sold_quantity <= 0:
                 return False, "الكمية المباعة يجب أن تكون أكبر من صفر"
             
-            # الاتصال بقاعدة البيانات
-            conn = sqlite3.connect(cls.db_path)
-            cursor = conn.cursor()
-            
-            # التحقق من وجود المنتج وكمية كافية
-            cursor.execute("SELECT quantity FROM products WHERE id = ?", (product_id,))
-            product = cursor.fetchone()
-            
-            if not product:
-                conn.close()
-                return False, "المنتج غير موجود"
-            
-            if product[0] < sold_quantity:
-                conn.close()
-                return False, "الكمية المتاحة غير كافية"
+            def sell(conn):
+                # خصم مشروط: التحقق من الكمية والخصم في جملة واحدة حتى لا يبيع
+                # جهازان نفس القطعة إذا تزامنا
+                cursor = conn.execute(
+                    "UPDATE products SET quantity = quantity - ?, sold = sold + ? WHERE id = ? AND quantity >= ?",
+                    (sold_quantity, sold_quantity, product_id, sold_quantity)
+                )
+                if cursor.rowcount == 0:
+                    exists = conn.execute("SELECT 1 FROM products WHERE id = ?", (product_id,)).fetchone()
+                    return False, "الكمية المتاحة غير كافية" if exists else "المنتج غير موجود"
+                
+                cls.notify_changed("updated", [product_id])
+                return True, "تم تحديث كمية المنتج بنجاح"
             
-            # تحديث كمية المنتج وزيادة عدد المبيعات
-            cursor.execute(
-                "UPDATE products SET quantity = quantity - ?, sold = sold + ? WHERE id = ?",
-                (sold_quantity, sold_quantity, product_id)
-            )
-            conn.commit()
-            conn.close()
-            return True, "تم تحديث كمية المنتج بنجاح"
+            # حجز قفل الكتابة مع إعادة المحاولة إذا كانت قاعدة البيانات مشغولة
+            return ConnectionManager.run_transaction(cls.db_path, sell, immediate=True)
                 
         except Exception as e:
             return False, f"خطأ في تحديث كمية المنتج: {str(e)}"
@@ -299,34 +487,37 @@ class ProductModel:
             cls._ensure_db_exists()
             
             # الاتصال بقاعدة البيانات
-            conn = sqlite3.connect(cls.db_path)
-            cursor = conn.cursor()
-            
-            # التحقق من وجود المنتج
-            cursor.execute("SELECT * FROM products WHERE id = ?", (product_id,))
-            product = cursor.fetchone()
-            
-            if not product:
-                conn.close()
-                return False, "المنتج غير موجود"
-            
-            # حذف المنتج
-            cursor.execute("DELETE FROM products WHERE id = ?", (product_id,))
-            conn.commit()
-            conn.close()
-            
-            return True, "تم حذف المنتج بنجاح"
+            with ConnectionManager.transaction(cls.db_path) as conn:
+                cursor = conn.cursor()
+                
+                # التحقق من وجود المنتج
+                cursor.execute("SELECT * FROM products WHERE id = ?", (product_id,))
+                product = cursor.fetchone()
+                
+                if not product:
+                    return False, "المنتج غير موجود"
+                
+                # حذف المنتج
+                cursor.execute("DELETE FROM products WHERE id = ?", (product_id,))
+                cls.notify_changed("removed", [product_id])
+                
+                return True, "تم حذف المنتج بنجاح"
                 
         except Exception as e:
             return False, f"خطأ في حذف المنتج: {str(e)}"
     
     @classmethod
-    def get_top_products(cls, limit=10):
+    def get_top_products(cls, limit=10, offset=0, start_date=None, end_date=None):
         """
         الحصول على أكثر المنتجات مبيعاً
         
+        الإيراد محسوب من ملخص المبيعات بسعر البيع وقت كل فاتورة وليس بالسعر الحالي
+        
         Args:
             limit (int): عدد المنتجات المراد استرجاعها
+            offset (int): عدد المنتجات التي يتم تخطيها (للعرض على صفحات)
+            start_date (str): تاريخ البداية بصيغة YYYY-MM-DD (None بدون حد أدنى)
+            end_date (str): تاريخ النهاية بصيغة YYYY-MM-DD شاملاً (None بدون حد أعلى)
             
         Returns:
             tuple: (success, result)
@@ -338,23 +529,36 @@ class ProductModel:
             cls._ensure_db_exists()
             
             # الاتصال بقاعدة البيانات
-            conn = sqlite3.connect(cls.db_path)
-            conn.row_factory = sqlite3.Row  # للحصول على النتائج كقاموس
-            cursor = conn.cursor()
-            
-            # الحصول على أكثر المنتجات مبيعاً
-            cursor.execute("""
-                SELECT id, name, price, quantity, sold, (sold * price) as revenue
-                FROM products
-                WHERE sold > 0
-                ORDER BY sold DESC
-                LIMIT ?
-            """, (limit,))
-            
-            products = [dict(row) for row in cursor.fetchall()]
-            conn.close()
-            
-            return True, products
+            with ConnectionManager.transaction(cls.db_path) as conn:
+                cursor = conn.cursor()
+                
+                # الحصول على أكثر المنتجات مبيعاً
+                if start_date is None and end_date is None:
+                    # كل الأوقات: قراءة مرتبة من فهرس الإجماليات
+                    cursor.execute("""
+                        SELECT p.id, p.name, p.price, p.quantity, s.quantity as sold, s.revenue
+                        FROM product_sales s
+                        JOIN products p ON p.id = s.product_id
+                        WHERE s.quantity > 0
+                        ORDER BY s.quantity DESC, s.product_id
+                        LIMIT ? OFFSET ?
+                    """, (limit, offset))
+                else:
+                    cursor.execute("""
+                        SELECT p.id, p.name, p.price, p.quantity,
+                               SUM(s.quantity) as sold, SUM(s.revenue) as revenue
+                        FROM product_daily_sales s
+                        JOIN products p ON p.id = s.product_id
+                        WHERE s.date >= ? AND s.date <= ?
+                        GROUP BY s.product_id
+                        HAVING sold > 0
+                        ORDER BY sold DESC, p.id
+                        LIMIT ? OFFSET ?
+                    """, (start_date or "", end_date or "\uffff", limit, offset))
+                
+                products = [dict(row) for row in cursor.fetchall()]
+                
+                return True, products
             
         except Exception as e:
             return False, f"خطأ في استرجاع أكثر المنتجات مبيعاً: {str(e)}"
@@ -377,21 +581,19 @@ class ProductModel:
             cls._ensure_db_exists()
             
             # الاتصال بقاعدة البيانات
-            conn = sqlite3.connect(cls.db_path)
-            conn.row_factory = sqlite3.Row  # للحصول على النتائج كقاموس
-            cursor = conn.cursor()
-            
-            # الحصول على المنتجات ذات المخزون المنخفض
-            cursor.execute("""
-                SELECT * FROM products
-                WHERE quantity <= ?
-                ORDER BY quantity ASC
-            """, (threshold,))
-            
-            products = [dict(row) for row in cursor.fetchall()]
-            conn.close()
-            
-            return True, products
+            with ConnectionManager.transaction(cls.db_path) as conn:
+                cursor = conn.cursor()
+                
+                # الحصول على المنتجات ذات المخزون المنخفض
+                cursor.execute("""
+                    SELECT * FROM products
+                    WHERE quantity <= ?
+                    ORDER BY quantity ASC
+                """, (threshold,))
+                
+                products = [dict(row) for row in cursor.fetchall()]
+                
+                return True, products
             
         except Exception as e:
             return False, f"خطأ في استرجاع المنتجات ذات المخزون المنخفض: {str(e)}"
\ No newline at end of file
@@ -0,0 +1,236 @@
+import bisect
+import heapq
+import re
+
+# التشكيل وعلامة المد والتطويل
+_DIACRITICS = re.compile("[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]")
+
+# توحيد أشكال الحروف التي يكتبها المستخدمون بطرق مختلفة
+_LETTER_MAP = str.maketrans({
+    "أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا",
+    "ة": "ه",
+    "ى": "ي", "ئ": "ي",
+    "ؤ": "و",
+})
+
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_arabic(text):
+    """
+    توحيد النص العربي للبحث: حذف التشكيل والتطويل وتوحيد الهمزات والألف
+    والتاء المربوطة والألف المقصورة وتحويل الحروف اللاتينية لحروف صغيرة
+
+    Args:
+        text (str): النص الأصلي
+
+    Returns:
+        str: النص الموحد
+    """
+    text = _DIACRITICS.sub("", text or "")
+    text = text.translate(_LETTER_MAP).lower()
+    return _SPACES.sub(" ", text).strip()
+
+
+class ProductSearchIndex:
+    """
+    فهرس بحث في أسماء المنتجات الموحدة
+
+    - قائمتان مرتبتان (الأسماء، وبدايات الكلمات داخل الأسماء) يبحث فيهما
+      بالتنصيف (bisect) عن المنتجات التي يبدأ اسمها أو إحدى كلماته بالنص
+    - مقاطع ثلاثية (trigrams) تشير لمعرفات المنتجات التي تحتويها، للتطابق
+      في منتصف الكلمة دون المرور على كل المنتجات
+    """
+
+    GRAM_SIZE = 3
+
+    def __init__(self):
+        # الاسم الموحد لكل منتج
+        self._names = {}
+        # (الاسم، المعرف) مرتبة
+        self._by_name = []
+        # (الاسم من بداية كلمة غير الأولى، المعرف) مرتبة
+        self._by_word = []
+        # المقطع -> معرفات المنتجات
+        self._postings = {}
+
+    def __len__(self):
+        return len(self._names)
+
+    @classmethod
+    def _grams(cls, text):
+        size = cls.GRAM_SIZE
+        return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+    @staticmethod
+    def _word_suffixes(text):
+        """الاسم ابتداءً من كل كلمة بعد الأولى"""
+        suffixes = []
+        position = text.find(" ")
+        while position != -1:
+            suffixes.append(text[position + 1:])
+            position = text.find(" ", position + 1)
+        return suffixes
+
+    def build(self, products):
+        """
+        بناء الفهرس دفعة واحدة (أسرع من إضافة المنتجات واحداً تلو الآخر)
+
+        Args:
+            products (iterable): أزواج (المعرف، الاسم)
+        """
+        self.__init__()
+        names = self._names
+        by_name = self._by_name
+        by_word = self._by_word
+        postings = self._postings
+        size = self.GRAM_SIZE
+
+        for product_id, name in products:
+            normalized = normalize_arabic(name)
+            names[product_id] = normalized
+            by_name.append((normalized, product_id))
+            for suffix in self._word_suffixes(normalized):
+                by_word.append((suffix, product_id))
+            for gram in {normalized[i:i + size] for i in range(len(normalized) - size + 1)}:
+                ids = postings.get(gram)
+                if ids is None:
+                    postings[gram] = {product_id}
+                else:
+                    ids.add(product_id)
+
+        by_name.sort()
+        by_word.sort()
+
+    def add(self, product_id, name):
+        """
+        إضافة منتج للفهرس أو تحديث اسمه
+
+        Args:
+            product_id (int): معرف المنتج
+            name (str): اسم المنتج
+        """
+        normalized = normalize_arabic(name)
+        old = self._names.get(product_id)
+        if old == normalized:
+            return
+        if old is not None:
+            self.remove(product_id)
+
+        self._names[product_id] = normalized
+        bisect.insort(self._by_name, (normalized, product_id))
+        for suffix in self._word_suffixes(normalized):
+            bisect.insort(self._by_word, (suffix, product_id))
+        for gram in self._grams(normalized):
+            self._postings.setdefault(gram, set()).add(product_id)
+
+    def remove(self, product_id):
+        """حذف منتج من الفهرس"""
+        normalized = self._names.pop(product_id, None)
+        if normalized is None:
+            return
+
+        self._discard(self._by_name, (normalized, product_id))
+        for suffix in self._word_suffixes(normalized):
+            self._discard(self._by_word, (suffix, product_id))
+
+        for gram in self._grams(normalized):
+            ids = self._postings.get(gram)
+            if ids is not None:
+                ids.discard(product_id)
+                if not ids:
+                    del self._postings[gram]
+
+    @staticmethod
+    def _discard(entries, entry):
+        position = bisect.bisect_left(entries, entry)
+        if position < len(entries) and entries[position] == entry:
+            del entries[position]
+
+    @staticmethod
+    def matches(query, name):
+        """التحقق من احتواء الاسم على نص البحث بعد توحيدهما"""
+        return normalize_arabic(query) in normalize_arabic(name)
+
+    @staticmethod
+    def _prefixed(entries, query):
+        """المعرفات التي يبدأ نصها بالنص المطلوب بالترتيب الأبجدي"""
+        position = bisect.bisect_left(entries, (query,))
+        while position < len(entries) and entries[position][0].startswith(query):
+            yield entries[position][1]
+            position += 1
+
+    def _infix_candidates(self, query):
+        """المنتجات التي تحتوي أسماؤها على النص في أي موضع"""
+        names = self._names
+
+        if len(query) < self.GRAM_SIZE:
+            # نص قصير: لا توجد مقاطع كافية فنفحص الأسماء مباشرة
+            return [product_id for product_id, name in names.items() if query in name]
+
+        postings = []
+        for gram in self._grams(query):
+            ids = self._postings.get(gram)
+            if not ids:
+                return []
+            postings.append(ids)
+
+        # التقاطع يبدأ بأصغر قائمة
+        postings.sort(key=len)
+        candidates = postings[0]
+        for ids in postings[1:]:
+            candidates = candidates & ids
+            if not candidates:
+                return []
+
+        # المقاطع قد تتطابق في مواضع متفرقة: نتأكد من التطابق المتصل
+        return [product_id for product_id in candidates if query in names[product_id]]
+
+    def search(self, query, limit=None, accept=None):
+        """
+        البحث عن المنتجات التي يحتوي اسمها على نص البحث
+
+        الترتيب: الأسماء التي تبدأ بالنص أولاً، ثم التي تبدأ إحدى كلماتها به،
+        ثم التي تحتويه في منتصف كلمة، وكل مجموعة مرتبة أبجدياً.
+        مع تحديد عدد النتائج لا تحسب المجموعات التالية بعد اكتمال العدد
+
+        Args:
+            query (str): نص البحث
+            limit (int): الحد الأقصى للنتائج (None لكل النتائج)
+            accept (callable): شرط إضافي على معرف المنتج (None لقبول الكل)
+
+        Returns:
+            list: معرفات المنتجات مرتبة حسب الصلة
+        """
+        query = normalize_arabic(query)
+
+        if not query:
+            if accept is not None:
+                return [product_id for product_id in self._names if accept(product_id)][:limit]
+            return list(self._names)[:limit]
+
+        results = []
+        seen = set()
+
+        def collect(product_ids):
+            for product_id in product_ids:
+                if limit is not None and len(results) >= limit:
+                    return
+                if product_id not in seen and (accept is None or accept(product_id)):
+                    seen.add(product_id)
+                    results.append(product_id)
+
+        collect(self._prefixed(self._by_name, query))
+        collect(self._prefixed(self._by_word, query))
+
+        if limit is None or len(results) < limit:
+            names = self._names
+            rest = [product_id for product_id in self._infix_candidates(query)
+                    if product_id not in seen and (accept is None or accept(product_id))]
+            if limit is not None:
+                rest = heapq.nsmallest(limit - len(results), rest, key=names.__getitem__)
+            else:
+                rest.sort(key=names.__getitem__)
+            collect(rest)
+
+        return results
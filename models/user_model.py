@@ -1,6 +1,7 @@
 import sqlite3
-import os
 import hashlib
+from database.connection_manager import ConnectionManager
+from database.schema_migrations import SchemaMigrations
 
 class UserModel:
     """
@@ -10,43 +11,13 @@ class UserModel:
     # مسار قاعدة البيانات
     db_path = "data/store.db"
     
+    # عدد الصفوف في كل دفعة من iter_users
+    batch_size = 500
+    
     @classmethod
     def _ensure_db_exists(cls):
-        """التأكد من وجود قاعدة البيانات وإنشاء الجداول إذا لم تكن موجودة"""
-        # التأكد من وجود مجلد البيانات
-        os.makedirs(os.path.dirname(cls.db_path), exist_ok=True)
-        
-        # إنشاء الاتصال بقاعدة البيانات
-        conn = sqlite3.connect(cls.db_path)
-        cursor = conn.cursor()
-        
-        # إنشاء جدول المستخدمين إذا لم يكن موجوداً
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password TEXT NOT NULL,
-                role TEXT NOT NULL
-            )
-        ''')
-        
-        # إضافة مستخدم مدير افتراضي إذا كانت قاعدة البيانات فارغة
-        cursor.execute("SELECT COUNT(*) FROM users")
-        if cursor.fetchone()[0] == 0:
-            # إنشاء مستخدم افتراضي (admin / admin)
-            cursor.execute(
-                "INSERT INTO users (username, password, role) VALUES (?, ?, ?)",
-                ("admin", "admin", "admin")
-            )
-            
-            # إضافة مستخدم عادي (user / user)
-            cursor.execute(
-                "INSERT INTO users (username, password, role) VALUES (?, ?, ?)",
-                ("user", "user", "worker")
-            )
-        
-        conn.commit()
-        conn.close()
+        """التأكد من ترحيل قاعدة البيانات (الجداول تنشأ مرة واحدة عند بدء البرنامج)"""
+        SchemaMigrations.ensure(cls.db_path)
     
     @classmethod
     def authenticate(cls, username, password):
@@ -70,41 +41,36 @@ class UserModel:
             hashed_password = hashlib.sha256(password.encode()).hexdigest()
             
             # الاتصال بقاعدة البيانات
-            conn = sqlite3.connect(cls.db_path)
-            conn.row_factory = sqlite3.Row  # للحصول على النتائج كقاموس
-            cursor = conn.cursor()
-            
-            # محاولة الدخول باستخدام كلمة المرور الأصلية
-            cursor.execute(
-                "SELECT id, username, role, password FROM users WHERE username = ?",
-                (username,)
-            )
-            user = cursor.fetchone()
-            
-            if user:
-                # فحص إذا كانت كلمة المرور تطابق النص الأصلي أو الهاش
-                if user['password'] == password:
-                    # تحديث كلمة المرور إلى النسخة المشفرة تلقائياً
-                    cursor.execute(
-                        "UPDATE users SET password = ? WHERE id = ?",
-                        (hashed_password, user['id'])
-                    )
-                    conn.commit()
-                    
-                    # تحويل نتيجة قاعدة البيانات إلى قاموس
-                    result = dict(user)
-                    del result['password']  # حذف كلمة المرور من النتيجة للأمان
-                    conn.close()
-                    return True, result
-                elif user['password'] == hashed_password:
-                    # كلمة المرور مشفرة بالفعل وتطابق المدخل
-                    result = dict(user)
-                    del result['password']  # حذف كلمة المرور من النتيجة للأمان
-                    conn.close()
-                    return True, result
-            
-            conn.close()
-            return False, "اسم المستخدم أو كلمة المرور غير صحيحة"
+            with ConnectionManager.transaction(cls.db_path) as conn:
+                cursor = conn.cursor()
+                
+                # محاولة الدخول باستخدام كلمة المرور الأصلية
+                cursor.execute(
+                    "SELECT id, username, role, password FROM users WHERE username = ?",
+                    (username,)
+                )
+                user = cursor.fetchone()
+                
+                if user:
+                    # فحص إذا كانت كلمة المرور تطابق النص الأصلي أو الهاش
+                    if user['password'] == password:
+                        # تحديث كلمة المرور إلى النسخة المشفرة تلقائياً
+                        cursor.execute(
+                            "UPDATE users SET password = ? WHERE id = ?",
+                            (hashed_password, user['id'])
+                        )
+                        
+                        # تحويل نتيجة قاعدة البيانات إلى قاموس
+                        result = dict(user)
+                        del result['password']  # حذف كلمة المرور من النتيجة للأمان
+                        return True, result
+                    elif user['password'] == hashed_password:
+                        # كلمة المرور مشفرة بالفعل وتطابق المدخل
+                        result = dict(user)
+                        del result['password']  # حذف كلمة المرور من النتيجة للأمان
+                        return True, result
+                
+                return False, "اسم المستخدم أو كلمة المرور غير صحيحة"
                 
         except Exception as e:
             return False, f"خطأ في المصادقة: {str(e)}"
@@ -124,20 +90,52 @@ class UserModel:
             cls._ensure_db_exists()
             
             # الاتصال بقاعدة البيانات
-            conn = sqlite3.connect(cls.db_path)
-            conn.row_factory = sqlite3.Row  # للحصول على النتائج كقاموس
-            cursor = conn.cursor()
-            
-            # الحصول على جميع المستخدمين
-            cursor.execute("SELECT id, username, role FROM users")
-            users = [dict(row) for row in cursor.fetchall()]
-            conn.close()
-            
-            return True, users
+            with ConnectionManager.transaction(cls.db_path) as conn:
+                cursor = conn.cursor()
+                
+                # الحصول على جميع المستخدمين
+                cursor.execute("SELECT id, username, role FROM users")
+                users = [dict(row) for row in cursor.fetchall()]
+                
+                return True, users
             
         except Exception as e:
             return False, f"خطأ في استرجاع المستخدمين: {str(e)}"
     
+    @classmethod
+    def iter_users(cls, batch_size=None):
+        """
+        المرور على جميع المستخدمين بترتيب المعرف على دفعات (ذاكرة ثابتة مهما كان عددهم)
+        
+        Args:
+            batch_size (int): عدد المستخدمين في كل دفعة (batch_size الافتراضي إذا كان None)
+            
+        Yields:
+            dict: بيانات المستخدم (id, username, role)
+            
+        Raises:
+            Exception: خطأ قاعدة البيانات أثناء قراءة إحدى الدفعات
+        """
+        # التأكد من وجود قاعدة البيانات
+        cls._ensure_db_exists()
+        
+        batch_size = batch_size or cls.batch_size
+        after_id = 0
+        while True:
+            # كل دفعة في معاملة قصيرة مستقلة تبدأ بعد آخر معرف في الدفعة السابقة
+            with ConnectionManager.transaction(cls.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "SELECT id, username, role FROM users WHERE id > ? ORDER BY id LIMIT ?",
+                    (after_id, batch_size)
+                )
+                users = [dict(row) for row in cursor.fetchall()]
+            
+            yield from users
+            if len(users) < batch_size:
+                return
+            after_id = users[-1]["id"]
+    
     @classmethod
     def get_user(cls, user_id):
         """
@@ -156,19 +154,17 @@ class UserModel:
             cls._ensure_db_exists()
             
             # الاتصال بقاعدة البيانات
-            conn = sqlite3.connect(cls.db_path)
-            conn.row_factory = sqlite3.Row  # للحصول على النتائج كقاموس
-            cursor = conn.cursor()
-            
-            # البحث عن المستخدم بواسطة المعرف
-            cursor.execute("SELECT id, username, role FROM users WHERE id = ?", (user_id,))
-            user = cursor.fetchone()
-            conn.close()
-            
-            if user:
-                return True, dict(user)
-            else:
-                return False, "المستخدم غير موجود"
+            with ConnectionManager.transaction(cls.db_path) as conn:
+                cursor = conn.cursor()
+                
+                # البحث عن المستخدم بواسطة المعرف
+                cursor.execute("SELECT id, username, role FROM users WHERE id = ?", (user_id,))
+                user = cursor.fetchone()
+                
+                if user:
+                    return True, dict(user)
+                else:
+                    return False, "المستخدم غير موجود"
                 
         except Exception as e:
             return False, f"خطأ في استرجاع المستخدم: {str(e)}"
@@ -200,20 +196,18 @@ class UserModel:
                 return False, "دور المستخدم يجب أن يكون 'admin' أو 'worker'"
             
             # الاتصال بقاعدة البيانات
-            conn = sqlite3.connect(cls.db_path)
-            cursor = conn.cursor()
-            
-            # إضافة المستخدم
-            try:
-                cursor.execute(
-                    "INSERT INTO users (username, password, role) VALUES (?, ?, ?)",
-                    (username, password, role)  # نستخدم كلمة المرور كما هي (بدون تشفير) للسهولة في البداية
-                )
-                conn.commit()
-                conn.close()
-                return True, "تمت إضافة المستخدم بنجاح"
-            except sqlite3.IntegrityError:
-                return False, "اسم المستخدم موجود بالفعل"
+            with ConnectionManager.transaction(cls.db_path) as conn:
+                cursor = conn.cursor()
+                
+                # إضافة المستخدم
+                try:
+                    cursor.execute(
+                        "INSERT INTO users (username, password, role) VALUES (?, ?, ?)",
+                        (username, password, role)  # نستخدم كلمة المرور كما هي (بدون تشفير) للسهولة في البداية
+                    )
+                    return True, "تمت إضافة المستخدم بنجاح"
+                except sqlite3.IntegrityError:
+                    return False, "اسم المستخدم موجود بالفعل"
                 
         except Exception as e:
             return False, f"خطأ في إضافة المستخدم: {str(e)}"
@@ -246,37 +240,34 @@ class UserModel:
                 return False, "دور المستخدم يجب أن يكون 'admin' أو 'worker'"
             
             # الاتصال بقاعدة البيانات
-            conn = sqlite3.connect(cls.db_path)
-            cursor = conn.cursor()
-            
-            # التحقق من وجود المستخدم
-            cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
-            user = cursor.fetchone()
-            
-            if not user:
-                conn.close()
-                return False, "المستخدم غير موجود"
-            
-            # تحديث بيانات المستخدم
-            try:
-                if password:
-                    # استخدام كلمة المرور كما هي بدون تشفير
-                    cursor.execute(
-                        "UPDATE users SET username = ?, password = ?, role = ? WHERE id = ?",
-                        (username, password, role, user_id)
-                    )
-                else:
-                    # الحفاظ على كلمة المرور القديمة
-                    cursor.execute(
-                        "UPDATE users SET username = ?, role = ? WHERE id = ?",
-                        (username, role, user_id)
-                    )
+            with ConnectionManager.transaction(cls.db_path) as conn:
+                cursor = conn.cursor()
+                
+                # التحقق من وجود المستخدم
+                cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
+                user = cursor.fetchone()
                 
-                conn.commit()
-                conn.close()
-                return True, "تم تحديث بيانات المستخدم بنجاح"
-            except sqlite3.IntegrityError:
-                return False, "اسم المستخدم موجود بالفعل"
+                if not user:
+                    return False, "المستخدم غير موجود"
+                
+                # تحديث بيانات المستخدم
+                try:
+                    if password:
+                        # استخدام كلمة المرور كما هي بدون تشفير
+                        cursor.execute(
+                            "UPDATE users SET username = ?, password = ?, role = ? WHERE id = ?",
+                            (username, password, role, user_id)
+                        )
+                    else:
+                        # الحفاظ على كلمة المرور القديمة
+                        cursor.execute(
+                            "UPDATE users SET username = ?, role = ? WHERE id = ?",
+                            (username, role, user_id)
+                        )
+                    
+                    return True, "تم تحديث بيانات المستخدم بنجاح"
+                except sqlite3.IntegrityError:
+                    return False, "اسم المستخدم موجود بالفعل"
                 
         except Exception as e:
             return False, f"خطأ في تحديث المستخدم: {str(e)}"
@@ -299,31 +290,27 @@ class UserModel:
             cls._ensure_db_exists()
             
             # الاتصال بقاعدة البيانات
-            conn = sqlite3.connect(cls.db_path)
-            cursor = conn.cursor()
-            
-            # التحقق من وجود المستخدم
-            cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
-            user = cursor.fetchone()
-            
-            if not user:
-                conn.close()
-                return False, "المستخدم غير موجود"
-            
-            # التأكد من وجود مستخدم مدير واحد على الأقل بعد الحذف
-            cursor.execute("SELECT COUNT(*) FROM users WHERE role = 'admin' AND id != ?", (user_id,))
-            admin_count = cursor.fetchone()[0]
-            
-            if user[3] == 'admin' and admin_count == 0:
-                conn.close()
-                return False, "لا يمكن حذف المستخدم المدير الوحيد"
-            
-            # حذف المستخدم
-            cursor.execute("DELETE FROM users WHERE id = ?", (user_id,))
-            conn.commit()
-            conn.close()
-            
-            return True, "تم حذف المستخدم بنجاح"
+            with ConnectionManager.transaction(cls.db_path) as conn:
+                cursor = conn.cursor()
+                
+                # التحقق من وجود المستخدم
+                cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
+                user = cursor.fetchone()
+                
+                if not user:
+                    return False, "المستخدم غير موجود"
+                
+                # التأكد من وجود مستخدم مدير واحد على الأقل بعد الحذف
+                cursor.execute("SELECT COUNT(*) FROM users WHERE role = 'admin' AND id != ?", (user_id,))
+                admin_count = cursor.fetchone()[0]
+                
+                if user[3] == 'admin' and admin_count == 0:
+                    return False, "لا يمكن حذف المستخدم المدير الوحيد"
+                
+                # حذف المستخدم
+                cursor.execute("DELETE FROM users WHERE id = ?", (user_id,))
+                
+                return True, "تم حذف المستخدم بنجاح"
                 
         except Exception as e:
             return False, f"خطأ في حذف المستخدم: {str(e)}"
@@ -336,26 +323,23 @@ class UserModel:
             cls._ensure_db_exists()
             
             # الاتصال بقاعدة البيانات
-            conn = sqlite3.connect(cls.db_path)
-            cursor = conn.cursor()
-            
-            # حذف المستخدمين الموجودين
-            cursor.execute("DELETE FROM users WHERE username IN ('admin', 'user')")
-            
-            # إضافة المستخدمين الافتراضيين
-            cursor.execute(
-                "INSERT OR REPLACE INTO users (username, password, role) VALUES (?, ?, ?)",
-                ("admin", "admin", "admin")
-            )
-            
-            cursor.execute(
-                "INSERT OR REPLACE INTO users (username, password, role) VALUES (?, ?, ?)",
-                ("user", "user", "worker")
-            )
-            
-            conn.commit()
-            conn.close()
-            
-            return True, "تمت إعادة تعيين المستخدمين الافتراضيين بنجاح"
+            with ConnectionManager.transaction(cls.db_path) as conn:
+                cursor = conn.cursor()
+                
+                # حذف المستخدمين الموجودين
+                cursor.execute("DELETE FROM users WHERE username IN ('admin', 'user')")
+                
+                # إضافة المستخدمين الافتراضيين
+                cursor.execute(
+                    "INSERT OR REPLACE INTO users (username, password, role) VALUES (?, ?, ?)",
+                    ("admin", "admin", "admin")
+                )
+                
+                cursor.execute(
+                    "INSERT OR REPLACE INTO users (username, password, role) VALUES (?, ?, ?)",
+                    ("user", "user", "worker")
+                )
+                
+                return True, "تمت إعادة تعيين المستخدمين الافتراضيين بنجاح"
         except Exception as e:
             return False, f"خطأ في إعادة تعيين المستخدمين: {str(e)}"
\ No newline at end of file
@@ -0,0 +1,334 @@
+class CartService:
+    """
+    خدمة سلة المشتريات - حسابات السلة بدون واجهة (إضافة وحذف وإجماليات)
+
+    السلة قائمة عناصر: product_id, name, price, quantity, total
+    """
+
+    @classmethod
+    def add_item(cls, items, product, quantity):
+        """
+        إضافة منتج للسلة أو زيادة كميته إذا كان موجوداً
+
+        Args:
+            items (list): عناصر السلة (تعدل مباشرة)
+            product (dict): المنتج (id, name, price, quantity المتاحة)
+            quantity (int): الكمية المطلوب إضافتها
+
+        Returns:
+            tuple: (success, result)
+                - success (bool): نجاح العملية
+                - result (dict/str): عنصر السلة بعد الإضافة أو رسالة الخطأ
+        """
+        # التحقق إذا كان المنتج موجود بالفعل في السلة
+        current = None
+        for item in items:
+            if item["product_id"] == product["id"]:
+                current = item
+                break
+
+        success, message = cls.check_quantity(product, quantity, current["quantity"] if current else 0)
+        if not success:
+            return False, message
+
+        if current is not None:
+            cls.set_quantity(current, current["quantity"] + quantity)
+            return True, current
+
+        item = cls.new_item(product, quantity)
+        items.append(item)
+        return True, item
+
+    @classmethod
+    def check_quantity(cls, product, quantity, in_cart=0):
+        """
+        التحقق من الكمية المطلوب إضافتها مقابل المتاح في المخزون
+
+        Args:
+            product (dict): المنتج (quantity المتاحة)
+            quantity (int): الكمية المطلوب إضافتها
+            in_cart (int): الكمية الموجودة في السلة بالفعل
+
+        Returns:
+            tuple: (success, message)
+        """
+        if quantity <= 0:
+            return False, "يجب أن تكون الكمية أكبر من صفر"
+
+        available = product["quantity"]
+        if in_cart + quantity > available:
+            return False, f"الكمية المتاحة هي {available} فقط"
+
+        return True, ""
+
+    @classmethod
+    def new_item(cls, product, quantity):
+        """عنصر سلة جديد من منتج"""
+        return {
+            "product_id": product["id"],
+            "name": product["name"],
+            "price": product["price"],
+            "quantity": quantity,
+            "total": round(quantity * product["price"], 2)  # تقريب لرقمين عشريين
+        }
+
+    @classmethod
+    def set_quantity(cls, item, quantity):
+        """تعديل كمية عنصر في السلة وإعادة حساب إجماليه"""
+        item["quantity"] = quantity
+        item["total"] = round(quantity * item["price"], 2)  # تقريب لرقمين عشريين
+
+    @classmethod
+    def remove_item(cls, items, product_id):
+        """
+        حذف منتج من السلة
+
+        Args:
+            items (list): عناصر السلة
+            product_id (int): معرف المنتج
+
+        Returns:
+            list: عناصر السلة بدون المنتج
+        """
+        return [item for item in items if item["product_id"] != product_id]
+
+    @classmethod
+    def compute_totals(cls, items, discount=0):
+        """
+        حساب إجماليات السلة
+
+        الخصم السالب أو غير الصحيح يعتبر صفراً، ولا يتجاوز الخصم إجمالي السلة
+
+        Args:
+            items (list): عناصر السلة
+            discount (float): مقدار الخصم المطلوب
+
+        Returns:
+            dict: subtotal, discount (بعد التصحيح), total
+        """
+        subtotal = round(sum(item["total"] for item in items), 2)
+        return cls.apply_discount(subtotal, discount)
+
+    @classmethod
+    def apply_discount(cls, subtotal, discount=0):
+        """
+        الإجماليات من مجموع السلة والخصم المطلوب (نفس قواعد compute_totals)
+
+        Args:
+            subtotal (float): مجموع عناصر السلة
+            discount (float): مقدار الخصم المطلوب
+
+        Returns:
+            dict: subtotal, discount (بعد التصحيح), total
+        """
+        try:
+            discount = float(discount or 0)
+        except (TypeError, ValueError):
+            discount = 0
+        discount = min(max(discount, 0), subtotal)
+
+        return {
+            "subtotal": subtotal,
+            "discount": discount,
+            "total": round(subtotal - discount, 2)
+        }
+
+
+class Cart:
+    """
+    سلة مشتريات بمفتاح معرف المنتج مع إجماليات محدثة باستمرار
+
+    كل إضافة أو تعديل أو حذف يغير المجموع بفرق العنصر فقط (بدون إعادة جمع
+    السلة كلها)، ويرسل حدثاً للمشتركين بالعنصر المتغير فقط:
+    "add" أو "update" أو "remove" أو "clear" (العنصر None)
+
+    العناصر بنفس شكل CartService: product_id, name, price, quantity, total
+    """
+
+    def __init__(self):
+        # معرف المنتج -> العنصر (بترتيب الإضافة)
+        self._items = {}
+
+        # المجموع بالقروش كعدد صحيح حتى لا تتراكم أخطاء الكسور مع كثرة التعديل
+        self._subtotal_cents = 0
+        self.requested_discount = 0
+
+        self._listeners = []
+
+    def __len__(self):
+        return len(self._items)
+
+    def __bool__(self):
+        return bool(self._items)
+
+    def __contains__(self, product_id):
+        return product_id in self._items
+
+    def __iter__(self):
+        return iter(self._items.values())
+
+    def subscribe(self, callback):
+        """
+        الاشتراك في تغييرات السلة
+
+        Args:
+            callback (callable): دالة تستقبل (event, item)
+        """
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        """إلغاء الاشتراك في تغييرات السلة"""
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _notify(self, event, item):
+        for callback in list(self._listeners):
+            callback(event, item)
+
+    def get(self, product_id):
+        """عنصر المنتج في السلة أو None"""
+        return self._items.get(product_id)
+
+    def items(self):
+        """
+        نسخة من عناصر السلة (لإتمام البيع في الخلفية دون تأثر بتعديل السلة)
+
+        Returns:
+            list: عناصر السلة بترتيب الإضافة
+        """
+        return [dict(item) for item in self._items.values()]
+
+    def add(self, product, quantity):
+        """
+        إضافة منتج للسلة أو زيادة كميته إذا كان موجوداً
+
+        Args:
+            product (dict): المنتج (id, name, price, quantity المتاحة)
+            quantity (int): الكمية المطلوب إضافتها
+
+        Returns:
+            tuple: (success, result)
+                - success (bool): نجاح العملية
+                - result (dict/str): عنصر السلة بعد الإضافة أو رسالة الخطأ
+        """
+        item = self._items.get(product["id"])
+        success, message = CartService.check_quantity(product, quantity, item["quantity"] if item else 0)
+        if not success:
+            return False, message
+
+        if item is None:
+            item = CartService.new_item(product, quantity)
+            self._items[item["product_id"]] = item
+            self._subtotal_cents += _cents(item["total"])
+            self._notify("add", item)
+        else:
+            self._change(item, item["quantity"] + quantity)
+        return True, item
+
+    def update(self, product_id, quantity, available=None):
+        """
+        تعديل كمية منتج في السلة (الكمية صفر تحذف المنتج)
+
+        Args:
+            product_id (int): معرف المنتج
+            quantity (int): الكمية الجديدة
+            available (int): الكمية المتاحة في المخزون للتحقق (None: بدون تحقق)
+
+        Returns:
+            tuple: (success, result)
+                - success (bool): نجاح العملية
+                - result (dict/str): عنصر السلة بعد التعديل أو رسالة الخطأ
+        """
+        item = self._items.get(product_id)
+        if item is None:
+            return False, "المنتج غير موجود في السلة"
+
+        if quantity == 0:
+            return self.remove(product_id)
+        if quantity < 0:
+            return False, "يجب أن تكون الكمية أكبر من صفر"
+        if available is not None and quantity > available:
+            return False, f"الكمية المتاحة هي {available} فقط"
+
+        self._change(item, quantity)
+        return True, item
+
+    def remove(self, product_id):
+        """
+        حذف منتج من السلة
+
+        Args:
+            product_id (int): معرف المنتج
+
+        Returns:
+            tuple: (success, result)
+                - success (bool): نجاح العملية
+                - result (dict/str): العنصر المحذوف أو رسالة الخطأ
+        """
+        item = self._items.pop(product_id, None)
+        if item is None:
+            return False, "المنتج غير موجود في السلة"
+
+        self._subtotal_cents -= _cents(item["total"])
+        self._notify("remove", item)
+        return True, item
+
+    def clear(self):
+        """تفريغ السلة وإلغاء الخصم"""
+        self._items = {}
+        self._subtotal_cents = 0
+        self.requested_discount = 0
+        self._notify("clear", None)
+
+    def load(self, items, discount=0):
+        """
+        استبدال محتوى السلة بعناصر جاهزة (سلة معلقة مستأنفة مثلاً)
+
+        Args:
+            items (list): عناصر السلة (product_id, name, price, quantity, total)
+            discount (float): الخصم المطلوب
+        """
+        self.clear()
+        for item in items:
+            item = dict(item)
+            self._items[item["product_id"]] = item
+            self._subtotal_cents += _cents(item["total"])
+            self._notify("add", item)
+        self.requested_discount = discount
+
+    def _change(self, item, quantity):
+        """تعديل كمية عنصر موجود وتحديث المجموع بالفرق فقط"""
+        before = _cents(item["total"])
+        CartService.set_quantity(item, quantity)
+        self._subtotal_cents += _cents(item["total"]) - before
+        self._notify("update", item)
+
+    @property
+    def subtotal(self):
+        """مجموع عناصر السلة"""
+        return self._subtotal_cents / 100
+
+    def set_discount(self, discount):
+        """
+        تحديد الخصم المطلوب (يصحح عند حساب الإجماليات)
+
+        Returns:
+            dict: subtotal, discount (بعد التصحيح), total
+        """
+        self.requested_discount = discount
+        return self.totals()
+
+    def totals(self):
+        """
+        إجماليات السلة بدون المرور على العناصر
+
+        Returns:
+            dict: subtotal, discount (بعد التصحيح), total
+        """
+        return CartService.apply_discount(self.subtotal, self.requested_discount)
+
+
+def _cents(amount):
+    """تحويل مبلغ مقرب لرقمين عشريين إلى قروش"""
+    return int(round(amount * 100))
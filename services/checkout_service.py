@@ -0,0 +1,128 @@
+from database.connection_manager import ConnectionManager
+from database.schema_migrations import SchemaMigrations
+from models.invoice_model import InvoiceModel
+from models.product_model import ProductModel
+from services.cart_service import CartService
+from services.invoice_number_service import InvoiceNumberService
+
+
+class CheckoutError(Exception):
+    """خطأ يلغي عملية البيع بالكامل (يتم التراجع عن كل التغييرات)"""
+
+
+class CheckoutService:
+    """
+    خدمة إتمام البيع - تتحقق من المخزون وتخصم الكميات وتسجل الفاتورة
+    في معاملة واحدة، فإما أن تنجح العملية كلها أو لا يتغير شيء
+    """
+
+    # مسار قاعدة البيانات
+    db_path = "data/store.db"
+
+    @classmethod
+    def checkout(cls, user_id, customer_name, customer_phone, barcode, items, discount=0):
+        """
+        إتمام عملية بيع
+
+        Args:
+            user_id (int): معرف المستخدم (الكاشير)
+            customer_name (str): اسم العميل
+            customer_phone (str): رقم هاتف العميل
+            barcode (str): رمز الباركود (باركود رقم الفاتورة إذا كان فارغاً)
+            items (list): عناصر السلة (product_id, name, price, quantity, total)
+            discount (float): مقدار الخصم
+
+        Returns:
+            tuple: (success, result)
+                - success (bool): نجاح العملية
+                - result (dict/str): بيانات الفاتورة أو رسالة الخطأ
+        """
+        if not items:
+            return False, "السلة فارغة"
+
+        # تجميع الكميات لكل منتج (قد يتكرر المنتج في السلة)
+        quantities = {}
+        for item in items:
+            if item["quantity"] <= 0:
+                return False, f"الكمية المباعة من {item['name']} يجب أن تكون أكبر من صفر"
+            quantities[item["product_id"]] = quantities.get(item["product_id"], 0) + item["quantity"]
+
+        # حساب الإجماليات بنفس حسابات السلة
+        totals = CartService.compute_totals(items, discount)
+        subtotal, discount, total = totals["subtotal"], totals["discount"], totals["total"]
+
+        def sell(conn):
+            # خصم الكميات دفعة واحدة بشرط كفاية المخزون: التحقق والخصم في نفس الجملة
+            # فلا يمكن لجهازين أن يبيعا نفس القطعة حتى مع تزامن الطلبات
+            try:
+                with ConnectionManager.transaction(cls.db_path):
+                    cursor = conn.executemany(
+                        "UPDATE products SET quantity = quantity - ?, sold = sold + ? WHERE id = ? AND quantity >= ?",
+                        [(quantity, quantity, product_id, quantity) for product_id, quantity in quantities.items()]
+                    )
+                    if cursor.rowcount != len(quantities):
+                        raise CheckoutError()
+            except CheckoutError:
+                # منتج لم يخصم: بعد التراجع عن الخصم (SAVEPOINT) تقرأ الكميات الأصلية لرسالة الخطأ
+                raise CheckoutError(cls._stock_error(conn, quantities))
+            ProductModel.notify_changed("updated", quantities)
+
+            # تسجيل الفاتورة وعناصرها داخل نفس المعاملة
+            success, invoice_id = InvoiceModel.create_invoice(
+                user_id, customer_name, customer_phone, barcode,
+                items, subtotal, discount, total, invoice_number=invoice_number
+            )
+            if not success:
+                raise CheckoutError(invoice_id)
+
+            created_at = conn.execute(
+                "SELECT created_at FROM invoices WHERE id = ?", (invoice_id,)
+            ).fetchone()[0]
+            return invoice_id, created_at
+
+        try:
+            SchemaMigrations.ensure(cls.db_path)
+
+            # رقم الفاتورة من مجموعة الأرقام المحجوزة لهذا الجهاز (بدون قاعدة البيانات غالباً)
+            invoice_number = InvoiceNumberService.next_number()
+            if not barcode:
+                barcode = InvoiceNumberService.barcode_for(invoice_number)
+
+            # BEGIN IMMEDIATE مع إعادة المحاولة إذا كان جهاز آخر يكتب في نفس اللحظة
+            invoice_id, created_at = ConnectionManager.run_transaction(cls.db_path, sell, immediate=True)
+
+            return True, {
+                "id": invoice_id,
+                "invoice_number": invoice_number,
+                "customer_name": customer_name,
+                "customer_phone": customer_phone,
+                "barcode": barcode,
+                "items": items,
+                "subtotal": subtotal,
+                "discount": discount,
+                "total": total,
+                "user_id": user_id,
+                "created_at": created_at
+            }
+
+        except CheckoutError as e:
+            return False, str(e)
+        except Exception as e:
+            return False, f"خطأ في إتمام عملية البيع: {str(e)}"
+
+    @classmethod
+    def _stock_error(cls, conn, quantities):
+        """رسالة أول منتج لا يمكن خصم كميته (غير موجود أو كميته غير كافية)"""
+        placeholders = ",".join("?" * len(quantities))
+        rows = conn.execute(
+            f"SELECT id, name, quantity FROM products WHERE id IN ({placeholders})", list(quantities)
+        ).fetchall()
+        stock = {row["id"]: row for row in rows}
+
+        for product_id, quantity in quantities.items():
+            product = stock.get(product_id)
+            if product is None:
+                return f"المنتج رقم {product_id} غير موجود"
+            if product["quantity"] < quantity:
+                return f"الكمية المتاحة من {product['name']} هي {product['quantity']} فقط"
+        return "تغير المخزون أثناء إتمام البيع، حاول مرة أخرى"
@@ -0,0 +1,169 @@
+import os
+import re
+import sys
+from datetime import datetime
+from database.connection_manager import ConnectionManager
+from database.schema_migrations import SchemaMigrations
+from models.invoice_model import InvoiceModel
+
+
+class InvoiceImportService:
+    """
+    خدمة استيراد الفواتير القديمة - تنقل ملفات invoice_<رقم>.txt التي كانت تكتب
+    عند كل عملية بيع إلى جداول invoices و invoice_items
+    """
+
+    # مسار قاعدة البيانات
+    db_path = "data/store.db"
+
+    # ملفات الفواتير الأصلية فقط (الملفات ذات اللاحقة invoice_<رقم>_<وقت> نسخ مطبوعة من قاعدة البيانات)
+    file_pattern = re.compile(r'^invoice_(\d+)\.txt$')
+
+    # أنماط استخراج بيانات الفاتورة من النص
+    name_pattern = re.compile(r'الاسم: (.*?)\s*\|?\s*$', re.MULTILINE)
+    phone_pattern = re.compile(r'رقم الهاتف: (.*?)\s*\|?\s*$', re.MULTILINE)
+    date_pattern = re.compile(r'التاريخ: (\d{4}-\d{2}-\d{2})')
+    barcode_pattern = re.compile(r'الباركود: (#[A-Z0-9]+)')
+    subtotal_pattern = re.compile(r'الإجمالي قبل الخصم:\s+(\d+(?:\.\d+)?)')
+    discount_pattern = re.compile(r'^\|\s*الخصم:\s+(\d+(?:\.\d+)?)', re.MULTILINE)
+    total_pattern = re.compile(r'الإجمالي بعد الخصم:\s+(\d+(?:\.\d+)?)')
+    item_pattern = re.compile(
+        r'^\|(.+?)\|\s*(\d+)\s*\|\s*(\d+(?:\.\d+)?)\s*\|\s*(\d+(?:\.\d+)?)\s*\|\s*$'
+    )
+    # سطر تكملة اسم صنف طويل (أعمدة الأرقام فارغة)
+    continuation_pattern = re.compile(r'^\|(.+?)\|\s*\|\s*\|\s*\|\s*$')
+
+    @classmethod
+    def parse_invoice_text(cls, content, filename):
+        """
+        استخراج بيانات الفاتورة من نص ملف الفاتورة
+
+        Args:
+            content (str): نص الفاتورة
+            filename (str): اسم الملف (يحتوي على وقت الإنشاء)
+
+        Returns:
+            dict: بيانات الفاتورة وعناصرها
+        """
+        def find(pattern, default=""):
+            match = pattern.search(content)
+            return match.group(1).strip() if match else default
+
+        # وقت الإنشاء من اسم الملف، أو التاريخ المكتوب في الفاتورة
+        match = cls.file_pattern.match(os.path.basename(filename))
+        created_at = datetime.fromtimestamp(int(match.group(1))).strftime("%Y-%m-%d %H:%M:%S")
+        invoice_date = find(cls.date_pattern)
+        if invoice_date and not created_at.startswith(invoice_date):
+            created_at = f"{invoice_date} 00:00:00"
+
+        items = []
+        item = None
+        for line in content.splitlines():
+            match = cls.item_pattern.match(line)
+            if match:
+                name, quantity, price, item_total = match.groups()
+                item = {
+                    "name": name.strip(),
+                    "quantity": int(quantity),
+                    "price": float(price),
+                    "total": float(item_total)
+                }
+                items.append(item)
+                continue
+
+            # سطر التكملة الذي يبدأ بمسافة زائدة يبدأ بكلمة جديدة، وإلا فهو تكملة كلمة طويلة
+            match = cls.continuation_pattern.match(line) if item else None
+            if match:
+                part = match.group(1)
+                item["name"] += f" {part.strip()}" if part.startswith("  ") else part.strip()
+            else:
+                item = None
+
+        subtotal = float(find(cls.subtotal_pattern, 0)) or sum(item["total"] for item in items)
+        discount = float(find(cls.discount_pattern, 0))
+        total = float(find(cls.total_pattern, 0)) or subtotal - discount
+
+        return {
+            "customer_name": find(cls.name_pattern),
+            "customer_phone": find(cls.phone_pattern),
+            "barcode": find(cls.barcode_pattern) or None,
+            "created_at": created_at,
+            "items": items,
+            "subtotal": subtotal,
+            "discount": discount,
+            "total": total
+        }
+
+    @classmethod
+    def import_directory(cls, directory="."):
+        """
+        استيراد كل ملفات الفواتير في مجلد إلى قاعدة البيانات
+
+        الفواتير المستوردة سابقاً (نفس الباركود ووقت الإنشاء) يتم تجاهلها،
+        ولا يتم تعديل المخزون لأن الكميات خصمت وقت البيع
+
+        Args:
+            directory (str): المجلد الذي يحتوي على ملفات الفواتير
+
+        Returns:
+            tuple: (success, result)
+                - success (bool): نجاح العملية
+                - result (dict/str): أعداد الفواتير المستوردة والمتجاهلة والفاشلة أو رسالة الخطأ
+        """
+        result = {"imported": 0, "skipped": 0, "failed": []}
+
+        try:
+            SchemaMigrations.ensure(cls.db_path)
+
+            filenames = sorted(f for f in os.listdir(directory) if cls.file_pattern.match(f))
+
+            with ConnectionManager.transaction(cls.db_path, immediate=True) as conn:
+                # ربط أسماء المنتجات بمعرفاتها (المنتجات المحذوفة تأخذ المعرف 0)
+                product_ids = {row["name"]: row["id"] for row in conn.execute("SELECT id, name FROM products")}
+
+                for filename in filenames:
+                    try:
+                        with open(os.path.join(directory, filename), "r", encoding="utf-8") as f:
+                            invoice = cls.parse_invoice_text(f.read(), filename)
+                    except Exception as e:
+                        result["failed"].append(f"{filename}: {str(e)}")
+                        continue
+
+                    # تجاهل الفواتير المستوردة سابقاً
+                    exists = conn.execute(
+                        "SELECT 1 FROM invoices WHERE barcode IS ? AND created_at = ?",
+                        (invoice["barcode"], invoice["created_at"])
+                    ).fetchone()
+                    if exists:
+                        result["skipped"] += 1
+                        continue
+
+                    for item in invoice["items"]:
+                        item["product_id"] = product_ids.get(item["name"], 0)
+
+                    success, message = InvoiceModel.create_invoice(
+                        None, invoice["customer_name"], invoice["customer_phone"], invoice["barcode"],
+                        invoice["items"], invoice["subtotal"], invoice["discount"], invoice["total"],
+                        created_at=invoice["created_at"]
+                    )
+                    if success:
+                        result["imported"] += 1
+                    else:
+                        result["failed"].append(f"{filename}: {message}")
+
+            return True, result
+
+        except Exception as e:
+            return False, f"خطأ في استيراد الفواتير: {str(e)}"
+
+
+if __name__ == "__main__":
+    # الاستخدام: python -m services.invoice_import_service [المجلد]
+    success, result = InvoiceImportService.import_directory(sys.argv[1] if len(sys.argv) > 1 else ".")
+    if not success:
+        print(result)
+        sys.exit(1)
+
+    print(f"تم استيراد {result['imported']} فاتورة، وتجاهل {result['skipped']} فاتورة مستوردة سابقاً")
+    for failure in result["failed"]:
+        print(f"فشل: {failure}")
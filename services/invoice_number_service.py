@@ -0,0 +1,107 @@
+import os
+import re
+import threading
+from database.connection_manager import ConnectionManager
+from database.schema_migrations import SchemaMigrations
+
+
+class InvoiceNumberService:
+    """
+    خدمة ترقيم الفواتير - لكل جهاز بادئة وتسلسل خاص بها (مثل T1 ثم 00000001)
+
+    الجهاز يحجز مجموعة من الأرقام (block_size) بزيادة التسلسل في جدول
+    invoice_sequences داخل معاملة، ثم يوزعها من الذاكرة بدون الرجوع لقاعدة
+    البيانات مع كل فاتورة. الحجز في قاعدة البيانات يمنع تكرار الأرقام بين
+    الأجهزة والعمليات، والأرقام غير المستخدمة عند الإغلاق تترك فجوة فقط
+    """
+
+    # مسار قاعدة البيانات
+    db_path = "data/store.db"
+
+    # بادئة هذا الجهاز (تضبط لكل جهاز بمتغير البيئة STORE_TERMINAL)
+    terminal = os.environ.get("STORE_TERMINAL", "T1")
+
+    # عدد الأرقام المحجوزة في كل مرة
+    block_size = 100
+
+    # عدد خانات التسلسل بعد البادئة
+    digits = 8
+
+    # البادئة حروف وأرقام إنجليزية كبيرة حتى يصلح الرقم كباركود
+    prefix_pattern = re.compile(r"[A-Z][A-Z0-9]{0,7}")
+
+    # المجموعات المحجوزة: (مسار قاعدة البيانات، البادئة) -> [الرقم التالي، نهاية المجموعة]
+    _blocks = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def next_number(cls, prefix=None):
+        """
+        الحصول على رقم الفاتورة التالي
+
+        Args:
+            prefix (str): بادئة الجهاز (terminal إذا كانت None)
+
+        Returns:
+            str: رقم الفاتورة (البادئة ثم التسلسل)
+        """
+        prefix = cls.terminal if prefix is None else prefix
+        if not cls.prefix_pattern.fullmatch(prefix):
+            raise ValueError(f"بادئة رقم الفاتورة غير صالحة: {prefix}")
+
+        key = (cls.db_path, prefix)
+        with cls._lock:
+            block = cls._blocks.get(key)
+            if block is not None and block[0] < block[1]:
+                value = block[0]
+                block[0] += 1
+                return cls.format_number(prefix, value)
+
+        return cls.format_number(prefix, cls._reserve(key))
+
+    @classmethod
+    def _reserve(cls, key):
+        """
+        حجز مجموعة جديدة من الأرقام وإرجاع أولها
+
+        باقي المجموعة يحفظ في الذاكرة بعد تأكيد المعاملة فقط، فإذا تم التراجع
+        عن معاملة خارجية حجزت فيها لا يستخدم الجهاز أرقاماً عادت متاحة لغيره
+        """
+        db_path, prefix = key
+        size = cls.block_size
+        SchemaMigrations.ensure(db_path)
+
+        def reserve(conn):
+            conn.execute("INSERT OR IGNORE INTO invoice_sequences (prefix, next_value) VALUES (?, 1)", (prefix,))
+            # القراءة بعد التحديث في نفس المعاملة (الصف محجوز لها) بدلاً من RETURNING
+            # الذي لا يدعمه MySQL
+            conn.execute(
+                "UPDATE invoice_sequences SET next_value = next_value + ? WHERE prefix = ?",
+                (size, prefix)
+            )
+            return conn.execute(
+                "SELECT next_value FROM invoice_sequences WHERE prefix = ?", (prefix,)
+            ).fetchone()[0]
+
+        end = ConnectionManager.run_transaction(db_path, reserve, immediate=True)
+        start = end - size
+
+        def keep():
+            with cls._lock:
+                block = cls._blocks.get(key)
+                # الاحتفاظ بأحدث مجموعة إذا حجز خيطان في نفس الوقت
+                if block is None or block[1] < end:
+                    cls._blocks[key] = [start + 1, end]
+
+        ConnectionManager.on_commit(db_path, keep)
+        return start
+
+    @classmethod
+    def format_number(cls, prefix, value):
+        """رقم الفاتورة كنص بعدد خانات ثابت"""
+        return f"{prefix}{value:0{cls.digits}d}"
+
+    @classmethod
+    def barcode_for(cls, invoice_number):
+        """باركود الفاتورة المطبوع على الإيصال"""
+        return f"#{invoice_number}"
@@ -0,0 +1,156 @@
+from database.connection_manager import ConnectionManager
+from database.schema_migrations import SchemaMigrations
+from models.parked_cart_model import ParkedCartModel
+from models.product_model import ProductModel
+from services.cart_service import CartService
+from services.invoice_number_service import InvoiceNumberService
+
+
+class ParkedCartError(Exception):
+    """خطأ يلغي استئناف السلة (تبقى السلة معلقة كما هي)"""
+
+
+class ParkedCartService:
+    """
+    خدمة السلال المعلقة - تعليق السلة الحالية حتى يخدم الجهاز العميل التالي،
+    واستئنافها لاحقاً من أي جهاز مع التحقق من المخزون والأسعار الحالية
+    """
+
+    # مسار قاعدة البيانات
+    db_path = "data/store.db"
+
+    @classmethod
+    def park(cls, user_id, name, items, discount=0, terminal=None):
+        """
+        تعليق سلة
+
+        Args:
+            user_id (int): معرف المستخدم (الكاشير)
+            name (str): اسم السلة
+            items (list): عناصر السلة (product_id, name, price, quantity, total)
+            discount (float): الخصم المطلوب على السلة
+            terminal (str): الجهاز (جهاز أرقام الفواتير الحالي إذا كان None)
+
+        Returns:
+            tuple: (success, result)
+                - success (bool): نجاح العملية
+                - result (int/str): معرف السلة المعلقة أو رسالة الخطأ
+        """
+        discount = CartService.compute_totals(items, discount)["discount"]
+        return ParkedCartModel.park(name, terminal or InvoiceNumberService.terminal, user_id, items, discount)
+
+    @classmethod
+    def resume(cls, cart_id):
+        """
+        استئناف سلة معلقة
+
+        السلة تسحب من قاعدة البيانات وتقرأ منتجاتها كلها باستعلام واحد في نفس
+        المعاملة، ثم تصحح العناصر حسب المخزون الحالي: المنتج المحذوف أو النافد
+        يحذف، والكمية الأكبر من المتاح تخفض، والسعر يحدث للسعر الحالي
+
+        Args:
+            cart_id (int): معرف السلة المعلقة
+
+        Returns:
+            tuple: (success, result)
+                - success (bool): نجاح العملية
+                - result (dict/str): id, name, terminal, discount, items (بعد التصحيح)
+                  و changes (رسائل التعديلات) أو رسالة الخطأ
+        """
+        def take(conn):
+            success, cart = ParkedCartModel.take(cart_id)
+            if not success:
+                raise ParkedCartError(cart)
+
+            success, products = ProductModel.get_products_by_ids(
+                {item["product_id"] for item in cart["items"]}
+            )
+            if not success:
+                raise ParkedCartError(products)
+
+            return cart, products
+
+        try:
+            SchemaMigrations.ensure(cls.db_path)
+
+            # السحب والتحقق في معاملة واحدة: إذا فشل التحقق تبقى السلة معلقة
+            cart, products = ConnectionManager.run_transaction(cls.db_path, take, immediate=True)
+
+            items, changes = cls.revalidate(cart["items"], products)
+            return True, {
+                "id": cart["id"],
+                "name": cart["name"],
+                "terminal": cart["terminal"],
+                "discount": cart["discount"],
+                "items": items,
+                "changes": changes
+            }
+
+        except ParkedCartError as e:
+            return False, str(e)
+        except Exception as e:
+            return False, f"خطأ في استئناف السلة: {str(e)}"
+
+    @classmethod
+    def revalidate(cls, items, products):
+        """
+        تصحيح عناصر سلة حسب بيانات المنتجات الحالية
+
+        Args:
+            items (list): العناصر المحفوظة (product_id, name, price, quantity)
+            products (list): المنتجات الحالية من قاعدة البيانات
+
+        Returns:
+            tuple: (items, changes)
+                - items (list): عناصر السلة الصالحة بالأسعار الحالية
+                - changes (list): رسائل توضح ما تم تعديله
+        """
+        products = {product["id"]: product for product in products}
+        valid = []
+        changes = []
+
+        for item in items:
+            product = products.get(item["product_id"])
+            if product is None:
+                changes.append(f"تم حذف {item['name']} لأنه لم يعد موجوداً")
+                continue
+
+            available = product["quantity"]
+            if available <= 0:
+                changes.append(f"تم حذف {product['name']} لنفاد الكمية")
+                continue
+
+            quantity = item["quantity"]
+            if quantity > available:
+                changes.append(f"الكمية المتاحة من {product['name']} هي {available} فقط")
+                quantity = available
+
+            if product["price"] != item["price"]:
+                changes.append(f"تغير سعر {product['name']} من {item['price']:.2f} إلى {product['price']:.2f}")
+
+            valid.append(CartService.new_item(product, quantity))
+
+        return valid, changes
+
+    @classmethod
+    def get_parked_carts(cls, terminal=None):
+        """
+        السلال المعلقة من الأحدث للأقدم
+
+        Args:
+            terminal (str): سلال جهاز معين فقط (None: كل الأجهزة)
+
+        Returns:
+            tuple: (success, result)
+        """
+        return ParkedCartModel.get_parked_carts(terminal)
+
+    @classmethod
+    def delete(cls, cart_id):
+        """
+        حذف سلة معلقة بدون استئنافها
+
+        Returns:
+            tuple: (success, message)
+        """
+        return ParkedCartModel.delete_parked_cart(cart_id)
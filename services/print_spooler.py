@@ -0,0 +1,237 @@
+"""
+طابور طباعة وحفظ الإيصالات في الخلفية
+
+عملية البيع تضع الفاتورة في الطابور وتعود فوراً، وخيط واحد في الخلفية
+ينشئ الإيصالات ويكتبها على دفعات: الملفات النصية في مجلد الإيصالات،
+وأوامر ESC/POS في ملف جهاز الطابعة (مثل /dev/usb/lp0) بفتحة واحدة لكل دفعة.
+المهمة التي تفشل يعاد تنفيذها بعد انتظار يتضاعف حتى عدد محدد من المحاولات
+"""
+import heapq
+import itertools
+import os
+import queue
+import threading
+import time
+import traceback
+from services.receipt_service import ReceiptService
+
+# أقصى عدد من المهام في الدفعة الواحدة
+BATCH_SIZE = 32
+
+# عدد مرات إعادة المحاولة قبل اعتبار المهمة فاشلة
+MAX_RETRIES = 3
+
+# الانتظار قبل أول إعادة (بالثواني) ويتضاعف مع كل محاولة
+RETRY_DELAY = 0.5
+
+
+class PrintJob:
+    """مهمة طباعة أو حفظ لفاتورة واحدة"""
+
+    __slots__ = ("id", "invoice", "target", "attempts", "on_done")
+
+    def __init__(self, job_id, invoice, target, on_done):
+        self.id = job_id
+        self.invoice = invoice
+        self.target = target
+        self.attempts = 0
+        self.on_done = on_done
+
+    @property
+    def number(self):
+        """رقم الفاتورة المستخدم في اسم الملف"""
+        return self.invoice.get("invoice_number") or self.invoice["id"]
+
+
+class PrintSpooler:
+    """
+    طابور الطباعة
+
+    - submit(invoice, target) يضيف مهمة ويعود فوراً ("file" للحفظ، "printer" للطابعة)
+    - depth عدد المهام التي لم تنته بعد (في الطابور أو تنفذ أو تنتظر إعادة المحاولة)
+    - on_error(job, error) تستدعى من خيط الطابور عند فشل مهمة نهائياً
+    - flush() ينتظر انتهاء كل المهام و close() يوقف الخيط بعد تنفيذ ما في الطابور
+    """
+
+    def __init__(self, directory="receipts", device=None, batch_size=BATCH_SIZE,
+                 max_retries=MAX_RETRIES, retry_delay=RETRY_DELAY, on_error=None):
+        """
+        Args:
+            directory (str): مجلد ملفات الإيصالات
+            device (str): ملف جهاز الطابعة (None: مهام الطابعة تحفظ كملفات)
+            batch_size (int): أقصى عدد مهام في الدفعة
+            max_retries (int): عدد مرات إعادة المهمة الفاشلة
+            retry_delay (float): الانتظار قبل أول إعادة بالثواني
+            on_error (callable): تستقبل (المهمة، الاستثناء) عند الفشل النهائي
+        """
+        self.directory = directory
+        self.device = device
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.on_error = on_error
+
+        self.jobs = queue.Queue()
+        self.ids = itertools.count(1)
+
+        # المهام التي تنتظر إعادة المحاولة: (وقت التنفيذ، رقم المهمة، المهمة)
+        self.retries = []
+
+        # عدد المهام غير المنتهية وإحصائيات التنفيذ
+        self.condition = threading.Condition()
+        self._depth = 0
+        self.completed = 0
+        self.failed = 0
+
+        self.closed = False
+        self.thread = threading.Thread(target=self._run, name="print-spooler", daemon=True)
+        self.thread.start()
+
+    @property
+    def depth(self):
+        """عدد المهام التي لم تنته بعد"""
+        return self._depth
+
+    def submit(self, invoice, target="file", on_done=None):
+        """
+        إضافة فاتورة للطابور
+
+        Args:
+            invoice (dict): بيانات الفاتورة مع عناصرها (items)
+            target (str): "file" لحفظ ملف نصي أو "printer" للطباعة
+            on_done (callable): تستقبل المهمة بعد تنفيذها (من خيط الطابور)
+
+        Returns:
+            int: رقم المهمة
+        """
+        if self.closed:
+            raise RuntimeError("طابور الطباعة متوقف")
+
+        job = PrintJob(next(self.ids), invoice, target, on_done)
+        with self.condition:
+            self._depth += 1
+        self.jobs.put(job)
+        return job.id
+
+    def flush(self, timeout=None):
+        """
+        انتظار انتهاء كل المهام الحالية
+
+        Returns:
+            bool: True إذا انتهت كل المهام قبل المهلة
+        """
+        with self.condition:
+            return self.condition.wait_for(lambda: self._depth == 0, timeout)
+
+    def close(self, timeout=None):
+        """إيقاف الطابور بعد تنفيذ المهام الموجودة (والانتظار حتى المهلة)"""
+        if self.closed:
+            return
+        self.closed = True
+        self.jobs.put(None)
+        self.thread.join(timeout)
+
+    def _run(self):
+        """حلقة خيط الطابور: تجميع دفعة من المهام وتنفيذها"""
+        stopping = False
+        while not (stopping and not self.retries):
+            batch = []
+            timeout = max(self.retries[0][0] - time.monotonic(), 0) if self.retries else None
+
+            if stopping:
+                # بعد الإيقاف لا تصل مهام جديدة، فقط انتظار موعد إعادة المحاولة
+                time.sleep(timeout)
+            else:
+                # الانتظار حتى وصول مهمة أو حلول موعد أقرب إعادة محاولة
+                try:
+                    job = self.jobs.get(timeout=timeout)
+                except queue.Empty:
+                    job = False
+
+                # باقي المهام الموجودة في الطابور حتى حجم الدفعة (None علامة الإيقاف)
+                while job is not False:
+                    if job is None:
+                        stopping = True
+                        break
+                    batch.append(job)
+                    if len(batch) >= self.batch_size:
+                        break
+                    try:
+                        job = self.jobs.get_nowait()
+                    except queue.Empty:
+                        break
+
+            now = time.monotonic()
+            while self.retries and self.retries[0][0] <= now and len(batch) < self.batch_size:
+                batch.append(heapq.heappop(self.retries)[2])
+
+            if batch:
+                self._process(batch)
+
+    def _process(self, batch):
+        """تنفيذ دفعة: الملفات واحداً واحداً ومهام الطابعة في كتابة واحدة على الجهاز"""
+        printer_jobs = []
+        for job in batch:
+            if job.target == "printer" and self.device:
+                printer_jobs.append(job)
+                continue
+            try:
+                self._write_file(job)
+            except Exception as e:
+                self._failed(job, e)
+            else:
+                self._finished(job)
+
+        if printer_jobs:
+            try:
+                data = b"".join(ReceiptService.render_escpos(job.invoice) for job in printer_jobs)
+                with open(self.device, "ab") as device:
+                    device.write(data)
+                    device.flush()
+            except Exception as e:
+                for job in printer_jobs:
+                    self._failed(job, e)
+            else:
+                for job in printer_jobs:
+                    self._finished(job)
+
+    def _write_file(self, job):
+        """حفظ الإيصال كملف نصي (الكتابة في ملف مؤقت ثم إعادة التسمية حتى لا يبقى ملف ناقص)"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"فاتورة_{job.number}.txt")
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            f.write(ReceiptService.render_text(job.invoice))
+        os.replace(temporary, path)
+
+    def _finished(self, job):
+        if job.on_done is not None:
+            try:
+                job.on_done(job)
+            except Exception:
+                traceback.print_exc()
+        with self.condition:
+            self.completed += 1
+            self._depth -= 1
+            self.condition.notify_all()
+
+    def _failed(self, job, error):
+        """إعادة جدولة المهمة الفاشلة أو اعتبارها فاشلة بعد آخر محاولة"""
+        job.attempts += 1
+        if job.attempts <= self.max_retries:
+            delay = self.retry_delay * 2 ** (job.attempts - 1)
+            heapq.heappush(self.retries, (time.monotonic() + delay, job.id, job))
+            return
+
+        if self.on_error is not None:
+            try:
+                self.on_error(job, error)
+            except Exception:
+                traceback.print_exc()
+        else:
+            traceback.print_exception(type(error), error, error.__traceback__)
+
+        with self.condition:
+            self.failed += 1
+            self._depth -= 1
+            self.condition.notify_all()
@@ -0,0 +1,84 @@
+import threading
+from services.receipt_template import ReceiptTemplate
+
+
+class ReceiptService:
+    """
+    خدمة الإيصالات - تنشئ نص الفاتورة عند الطلب من بيانات قاعدة البيانات
+    باستخدام قالب يترجم مرة واحدة من إعدادات المتجر
+    """
+
+    # إعدادات الإيصال (تعدل بـ configure)
+    config = {
+        "store_name": "محل البركة",
+        "address": "شارع النصر – القاهرة",
+        "phone": "0100-123-4567",
+        "footer": ("شكراً لتعاملكم معنا!", "للاتصال: 0100-123-4567"),
+        "width": 48,
+    }
+
+    # القالب المترجم من الإعدادات الحالية
+    _template = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def configure(cls, **options):
+        """
+        تعديل إعدادات الإيصال (يعاد إنشاء القالب عند أول استخدام بعدها)
+
+        Args:
+            **options: معاملات ReceiptTemplate (store_name, address, phone, footer, width...)
+        """
+        with cls._lock:
+            cls.config = {**cls.config, **options}
+            cls._template = None
+
+    @classmethod
+    def template(cls):
+        """القالب المترجم (ينشأ مرة واحدة لكل إعدادات)"""
+        template = cls._template
+        if template is None:
+            with cls._lock:
+                if cls._template is None:
+                    cls._template = ReceiptTemplate(**cls.config)
+                template = cls._template
+        return template
+
+    @classmethod
+    def render_text(cls, invoice):
+        """
+        إنشاء نص الفاتورة للحفظ أو الطباعة
+
+        Args:
+            invoice (dict): بيانات الفاتورة مع عناصرها (items)
+
+        Returns:
+            str: نص الفاتورة
+        """
+        return cls.template().render_text(invoice)
+
+    @classmethod
+    def render_escpos(cls, invoice):
+        """
+        أوامر طباعة الفاتورة على طابعة حرارية
+
+        Args:
+            invoice (dict): بيانات الفاتورة مع عناصرها (items)
+
+        Returns:
+            bytes: البيانات المرسلة للطابعة
+        """
+        return cls.template().render_escpos(invoice)
+
+    @classmethod
+    def render_html(cls, invoice):
+        """
+        الفاتورة بصيغة HTML
+
+        Args:
+            invoice (dict): بيانات الفاتورة مع عناصرها (items)
+
+        Returns:
+            str: HTML الفاتورة
+        """
+        return cls.template().render_html(invoice)
@@ -0,0 +1,359 @@
+"""
+قالب الإيصال المترجم - يجهز الأجزاء الثابتة من الإيصال (الترويسة والحدود
+وعناوين الأعمدة والتذييل) مرة واحدة لكل إعدادات متجر، ثم يملأ بيانات
+كل فاتورة في قائمة أسطر تجمع بـ join في النهاية
+
+المخرجات: نص عادي (للحفظ والعرض)، بايتات ESC/POS (للطابعات الحرارية)، HTML
+"""
+import html
+import re
+from functools import lru_cache
+from unicodedata import category, east_asian_width
+
+
+# أوامر ESC/POS المستخدمة
+ESC_INIT = b"\x1b@"
+ESC_ALIGN_LEFT = b"\x1ba\x00"
+ESC_ALIGN_CENTER = b"\x1ba\x01"
+ESC_BOLD_ON = b"\x1bE\x01"
+ESC_BOLD_OFF = b"\x1bE\x00"
+ESC_DOUBLE_ON = b"\x1d!\x11"
+ESC_DOUBLE_OFF = b"\x1d!\x00"
+ESC_CUT = b"\x1dV\x42\x03"  # تغذية 3 أسطر ثم قص جزئي
+
+# أقل عرض لعمود اسم الصنف (أعمدة الأرقام لا تتسع على حسابه أكثر من ذلك)
+MIN_NAME_WIDTH = 6
+
+
+# الحروف التي لا تأخذ خانة واحدة بالضبط: التشكيل العربي وعلامات الاتجاه
+# والحروف العريضة، النص الخالي منها (أغلب النصوص) عرضه هو طوله مباشرة
+_SPECIAL_WIDTH = re.compile(
+    "[\u0300-\u036f\u0610-\u061a\u061c\u064b-\u065f\u0670\u06d6-\u06ed"
+    "\u200b-\u200f\u202a-\u202e\u2060-\u2069\ufeff"
+    "\u1100-\u115f\u2e80-\u303e\u3041-\u33ff\u3400-\u4dbf\u4e00-\u9fff"
+    "\uac00-\ud7a3\uf900-\ufaff\ufe30-\ufe4f\uff00-\uff60\uffe0-\uffe6]"
+)
+
+
+def display_width(text):
+    """
+    عرض النص على الشاشة أو الطابعة بعدد الخانات
+
+    التشكيل العربي (الفتحة والشدة...) وعلامات الاتجاه لا تأخذ خانة،
+    والحروف العريضة (الصينية واليابانية) تأخذ خانتين
+    """
+    if not _SPECIAL_WIDTH.search(text):
+        return len(text)
+    width = 0
+    for char in text:
+        if category(char) in ("Mn", "Me", "Cf"):
+            continue
+        width += 2 if east_asian_width(char) in ("W", "F") else 1
+    return width
+
+
+def fit(text, width):
+    """النص بعرض ثابت: يقص إذا كان أطول ويكمل بمسافات إذا كان أقصر"""
+    current = display_width(text)
+    if current > width:
+        text = _take(text, width)
+        current = display_width(text)
+    return text + " " * (width - current)
+
+
+@lru_cache(maxsize=8192)
+def wrap(text, width):
+    """
+    تقسيم النص على أسطر بعرض ثابت (عند المسافات إن أمكن)
+
+    السطر الذي يبدأ بكلمة جديدة يبدأ بمسافة، والكلمة الأطول من السطر تكمل
+    في أول السطر التالي بدون مسافة، فيمكن إرجاع النص كما كان من الأسطر
+    (InvoiceImportService يفعل ذلك عند استيراد الإيصالات)
+
+    النتيجة محفوظة لكل اسم لأن أسماء الأصناف تتكرر في الإيصالات
+
+    Returns:
+        tuple: الأسطر بعد إكمالها بمسافات حتى العرض المطلوب
+    """
+    if display_width(text) <= width:
+        return (fit(text, width),)
+
+    lines = []
+    line = ""
+    for word in text.split():
+        candidate = f"{line} {word}" if line or lines else word
+        if display_width(candidate) <= width:
+            line = candidate
+            continue
+        if line:
+            lines.append(line)
+        line = f" {word}" if lines else word
+        # كلمة أطول من السطر تقسم على عدة أسطر
+        while display_width(line) > width:
+            part = _take(line, width)
+            lines.append(part)
+            line = line[len(part):]
+    if line:
+        lines.append(line)
+    return tuple(fit(line, width) for line in lines)
+
+
+def _clip(value, width):
+    """قيمة رقمية منسقة بعرض عمودها، أو # تملأ العمود إذا لم تتسع (بدل قص الأرقام)"""
+    return value if len(value) <= width else "#" * width
+
+
+def _take(text, width):
+    """أطول بداية من النص لا يتجاوز عرضها width (بدون فصل التشكيل عن حرفه)"""
+    end = 0
+    used = 0
+    for index, char in enumerate(text):
+        if category(char) in ("Mn", "Me", "Cf"):
+            end = index + 1
+            continue
+        char_width = 2 if east_asian_width(char) in ("W", "F") else 1
+        if used + char_width > width:
+            break
+        used += char_width
+        end = index + 1
+    return text[:end]
+
+
+class ReceiptTemplate:
+    """
+    قالب إيصال لمتجر معين - ينشأ مرة واحدة ويستخدم لكل الفواتير
+
+    النص العادي يحافظ على شكل الإيصالات القديمة (حقول داخل إطار وأعمدة
+    مفصولة بـ |) حتى يبقى استيرادها بـ InvoiceImportService ممكناً
+    """
+
+    def __init__(self, store_name, address, phone, footer=(), width=48,
+                 quantity_width=6, price_width=8, total_width=9,
+                 escpos_encoding="cp1256", escpos_codepage=None):
+        """
+        Args:
+            store_name (str): اسم المتجر
+            address (str): العنوان
+            phone (str): الهاتف
+            footer (tuple): أسطر التذييل
+            width (int): عرض الإيصال بالخانات (48 لطابعة 80 مم)
+            quantity_width (int): عرض عمود الكمية
+            price_width (int): عرض عمود السعر
+            total_width (int): عرض عمود الإجمالي
+            escpos_encoding (str): ترميز النص المرسل للطابعة الحرارية (cp1256 هو جدول WPC1256 العربي)
+            escpos_codepage (int): رقم جدول الحروف بأمر ESC t حسب دليل الطابعة (None بدون الأمر)
+        """
+        inner = width - 4
+        self.width = width
+        self.inner = inner
+        self.name_width = width - 13 - quantity_width - price_width - total_width
+        if self.name_width < MIN_NAME_WIDTH:
+            raise ValueError("عرض الإيصال لا يكفي أعمدة الأصناف")
+        self.escpos_encoding = escpos_encoding
+
+        border = "+" + "-" * (width - 2) + "+"
+        self.border = border
+
+        header = [
+            self._center(f"████ {store_name} ████"),
+            self._center(f"العنوان: {address}"),
+            self._center(f"الهاتف: {phone}"),
+        ]
+        centered_footer = [self._center(line) for line in footer]
+
+        # أعمدة الأصناف بالعرض المحدد، وبعرض أكبر للأرقام عند الحاجة (محفوظة لكل عرض)
+        self._number_widths = (quantity_width, price_width, total_width)
+        self._layouts = {}
+        self._layout = self._item_layout(*self._number_widths)
+
+        # أسطر الإجماليات: العنوان ثم القيمة محاذاة لليمين
+        self._totals = []
+        for key, label in (("subtotal", "الإجمالي قبل الخصم"), ("discount", "الخصم"), ("total", "الإجمالي بعد الخصم")):
+            value_width = inner - display_width(label) - 2
+            self._totals.append((key, value_width, f"| {label}: {{:>{value_width}}} |".format))
+
+        self._text_head = header + [border]
+        self._text_totals_border = border
+        self._text_footer = [border] + centered_footer
+
+        # أجزاء ESC/POS الثابتة بعد ترميزها
+        start = ESC_INIT
+        if escpos_codepage is not None:
+            start += b"\x1bt" + bytes([escpos_codepage])
+        self._escpos_head = (
+            start + ESC_ALIGN_CENTER + ESC_BOLD_ON + ESC_DOUBLE_ON + self._encode(store_name) + b"\n"
+            + ESC_DOUBLE_OFF + ESC_BOLD_OFF + self._encode(f"العنوان: {address}\nالهاتف: {phone}\n")
+            + ESC_ALIGN_LEFT
+        )
+        self._escpos_footer = ESC_ALIGN_CENTER + self._encode("".join(f"{line}\n" for line in footer))
+
+        # أجزاء HTML الثابتة
+        escape = html.escape
+        self._html_head = (
+            '<div class="receipt" dir="rtl">\n'
+            f"<h2>{escape(store_name)}</h2>\n"
+            f"<p>العنوان: {escape(address)}<br>الهاتف: {escape(phone)}</p>\n"
+        )
+        self._html_columns = (
+            '<table class="items">\n'
+            "<tr><th>الصنف</th><th>الكمية</th><th>السعر</th><th>الإجمالي</th></tr>\n"
+        )
+        self._html_footer = "".join(f'<p class="footer">{escape(line)}</p>\n' for line in footer) + "</div>\n"
+
+    def _item_layout(self, quantity_width, price_width, total_width):
+        """
+        أعمدة الأصناف بعرض معين لأعمدة الأرقام (الاسم يأخذ باقي العرض)
+
+        Returns:
+            tuple: (عرض الاسم، صيغة سطر الصنف، أعمدة سطر تكملة الاسم، أسطر عناوين الأعمدة)
+        """
+        key = (quantity_width, price_width, total_width)
+        layout = self._layouts.get(key)
+        if layout is None:
+            name_width = self.width - 13 - quantity_width - price_width - total_width
+            # صيغة سطر الصنف: الاسم جاهز بعرضه والأرقام نصوص منسقة
+            item_line = f"| {{}} | {{:^{quantity_width}}} | {{:>{price_width}}} | {{:>{total_width}}} |".format
+            empty_columns = f" | {' ' * quantity_width} | {' ' * price_width} | {' ' * total_width} |"
+            columns = (
+                f"| {fit('الصنف', name_width)} | {fit('الكمية', quantity_width)} | "
+                f"{fit('السعر', price_width)} | {fit('الإجمالي', total_width)} |"
+            )
+            layout = self._layouts[key] = (name_width, item_line, empty_columns, [self.border, columns, self.border])
+        return layout
+
+    def _widen(self, lengths):
+        """
+        عرض أعمدة الأرقام الذي يتسع لأطول قيمة في كل عمود
+
+        الزيادة تؤخذ من عمود الاسم حتى MIN_NAME_WIDTH خانات، والقيمة التي لا تتسع
+        بعدها تظهر # حتى لا يخرج السطر عن الإطار
+        """
+        spare = self.name_width - MIN_NAME_WIDTH
+        widths = []
+        for width, length in zip(self._number_widths, lengths):
+            extra = min(max(length - width, 0), spare)
+            spare -= extra
+            widths.append(width + extra)
+        return widths
+
+    def _center(self, text):
+        """توسيط سطر بعرض الإيصال"""
+        text = fit(text, self.width).rstrip()
+        return " " * ((self.width - display_width(text)) // 2) + text
+
+    def _encode(self, text):
+        """ترميز النص للطابعة (الحروف غير الموجودة في جدول الطابعة تستبدل بـ ?)"""
+        return text.encode(self.escpos_encoding, "replace")
+
+    def _fields(self, invoice):
+        """حقول رأس الفاتورة (العنوان، القيمة)"""
+        return (
+            ("الاسم", invoice.get("customer_name") or ""),
+            ("رقم الهاتف", invoice.get("customer_phone") or ""),
+            ("رقم الفاتورة", str(invoice.get("invoice_number") or invoice["id"])),
+            ("الباركود", invoice.get("barcode") or ""),
+            ("التاريخ", (invoice.get("created_at") or "")[:10]),
+        )
+
+    def _text_lines(self, invoice):
+        """أسطر جسم الإيصال (الحقول والأصناف والإجماليات) بدون الترويسة والتذييل"""
+        inner = self.inner
+
+        lines = [f"| {fit(f'{label}: {value}', inner)} |" for label, value in self._fields(invoice)]
+
+        # الأرقام بصيغتها النهائية أولاً لمعرفة أعرض قيمة في كل عمود
+        # (عناصر قاعدة البيانات تستخدم item_total وعناصر السلة total)
+        rows = [
+            (item["name"], str(item["quantity"]), f"{item['price']:.2f}",
+             f"{item['item_total'] if 'item_total' in item else item['total']:.2f}")
+            for item in invoice["items"]
+        ]
+        widths = self._number_widths
+        layout = self._layout
+        if rows:
+            lengths = [max(len(row[column]) for row in rows) for column in (1, 2, 3)]
+            if any(length > width for length, width in zip(lengths, widths)):
+                widths = self._widen(lengths)
+                layout = self._item_layout(*widths)
+        name_width, item_line, empty_columns, columns = layout
+        quantity_width, price_width, total_width = widths
+        lines += columns
+
+        for name, quantity, price, item_total in rows:
+            name_lines = wrap(name, name_width)
+            lines.append(item_line(name_lines[0], _clip(quantity, quantity_width), _clip(price, price_width),
+                                   _clip(item_total, total_width)))
+            for name_line in name_lines[1:]:
+                lines.append(f"| {name_line}{empty_columns}")
+
+        lines.append(self._text_totals_border)
+        lines += [line(_clip(f"{invoice[key]:.2f}", width)) for key, width, line in self._totals]
+        return lines
+
+    def render_text(self, invoice):
+        """
+        نص الإيصال للحفظ أو العرض
+
+        Args:
+            invoice (dict): بيانات الفاتورة مع عناصرها (items)
+
+        Returns:
+            str: نص الإيصال
+        """
+        lines = self._text_head + self._text_lines(invoice) + self._text_footer
+        lines.append("")
+        return "\n".join(lines)
+
+    def render_escpos(self, invoice):
+        """
+        أوامر الطباعة على طابعة حرارية ESC/POS (ترويسة بخط كبير وباركود الفاتورة ثم قص الورق)
+
+        Args:
+            invoice (dict): بيانات الفاتورة مع عناصرها (items)
+
+        Returns:
+            bytes: البيانات المرسلة للطابعة
+        """
+        parts = [self._escpos_head, self._encode("\n".join(self._text_lines(invoice)) + "\n")]
+
+        # باركود CODE128 (المجموعة B تقبل الحروف والأرقام و #)
+        barcode = (invoice.get("barcode") or "").encode("ascii", "ignore")
+        if barcode and len(barcode) <= 250:
+            parts.append(ESC_ALIGN_CENTER + b"\x1dh\x50\x1dw\x02\x1dH\x02\x1dk\x49"
+                         + bytes([len(barcode) + 2]) + b"{B" + barcode + b"\n")
+
+        parts.append(self._escpos_footer)
+        parts.append(ESC_CUT)
+        return b"".join(parts)
+
+    def render_html(self, invoice):
+        """
+        الإيصال بصيغة HTML (للعرض أو الإرسال بالبريد)
+
+        Args:
+            invoice (dict): بيانات الفاتورة مع عناصرها (items)
+
+        Returns:
+            str: HTML الإيصال
+        """
+        escape = html.escape
+        parts = [self._html_head, '<table class="info">\n']
+        for label, value in self._fields(invoice):
+            parts.append(f"<tr><th>{label}:</th><td>{escape(value)}</td></tr>\n")
+        parts.append("</table>\n")
+        parts.append(self._html_columns)
+
+        for item in invoice["items"]:
+            item_total = item["item_total"] if "item_total" in item else item["total"]
+            parts.append(
+                f"<tr><td>{escape(item['name'])}</td><td>{item['quantity']}</td>"
+                f"<td>{item['price']:.2f}</td><td>{item_total:.2f}</td></tr>\n"
+            )
+
+        parts.append('</table>\n<table class="totals">\n')
+        parts.append(f"<tr><th>الإجمالي قبل الخصم:</th><td>{invoice['subtotal']:.2f}</td></tr>\n")
+        parts.append(f"<tr><th>الخصم:</th><td>{invoice['discount']:.2f}</td></tr>\n")
+        parts.append(f"<tr><th>الإجمالي بعد الخصم:</th><td>{invoice['total']:.2f}</td></tr>\n")
+        parts.append("</table>\n")
+        parts.append(self._html_footer)
+        return "".join(parts)
@@ -0,0 +1,120 @@
+from models.invoice_model import InvoiceModel
+from models.product_model import ProductModel
+
+
+class ReportService:
+    """
+    خدمة التقارير - تجمع بيانات التقارير من النماذج بصيغة جاهزة للعرض
+    بدون أي اعتماد على الواجهة
+    """
+
+    @classmethod
+    def sales_by_day(cls, start_date=None, end_date=None):
+        """
+        إجمالي المبيعات لكل يوم في فترة (كل الأيام إذا لم تحدد الفترة)
+
+        Args:
+            start_date (str): تاريخ البداية بصيغة YYYY-MM-DD
+            end_date (str): تاريخ النهاية بصيغة YYYY-MM-DD شاملاً
+
+        Returns:
+            tuple: (success, result)
+                - success (bool): نجاح العملية
+                - result (dict/str): daily_sales و total_sales و total_invoices أو رسالة الخطأ
+        """
+        return InvoiceModel.get_sales_by_date_range(start_date, end_date)
+
+    @classmethod
+    def day_invoices(cls, date):
+        """
+        فواتير يوم محدد (بدون عناصرها) من الأحدث للأقدم
+
+        Args:
+            date (str): التاريخ بصيغة YYYY-MM-DD
+
+        Returns:
+            tuple: (success, result)
+                - success (bool): نجاح العملية
+                - result (list/str): قائمة الفواتير أو رسالة الخطأ
+        """
+        success, day = InvoiceModel.get_daily_sales(date, include_items=False)
+        if not success:
+            return False, day
+        return True, day["invoices"]
+
+    @classmethod
+    def day_summary(cls, date=None):
+        """
+        إجماليات يوم واحد (عدد الفواتير والمبيعات والقطع المباعة)
+
+        Args:
+            date (str): التاريخ بصيغة YYYY-MM-DD (اليوم الحالي إذا كانت None)
+
+        Returns:
+            tuple: (success, result)
+        """
+        return InvoiceModel.get_daily_sales(date, summary_only=True)
+
+    @classmethod
+    def invoice_details(cls, invoice_id):
+        """
+        فاتورة كاملة للعرض: عناصرها تحمل total مثل عناصر السلة
+
+        Args:
+            invoice_id (int): معرف الفاتورة
+
+        Returns:
+            tuple: (success, result)
+                - success (bool): نجاح العملية
+                - result (dict/str): بيانات الفاتورة أو رسالة الخطأ
+        """
+        success, invoice = InvoiceModel.get_invoice(invoice_id)
+        if not success:
+            return False, invoice
+
+        for item in invoice["items"]:
+            item["total"] = item["item_total"]
+        return True, invoice
+
+    @classmethod
+    def top_products(cls, limit=10, offset=0, start_date=None, end_date=None):
+        """
+        المنتجات الأكثر مبيعاً مرتبة بالكمية المباعة (في فترة أو كل الأوقات)
+
+        Args:
+            limit (int): عدد المنتجات
+            offset (int): عدد المنتجات التي يتم تخطيها
+            start_date (str): تاريخ البداية بصيغة YYYY-MM-DD
+            end_date (str): تاريخ النهاية بصيغة YYYY-MM-DD شاملاً
+
+        Returns:
+            tuple: (success, result)
+        """
+        return ProductModel.get_top_products(limit, offset, start_date, end_date)
+
+    @classmethod
+    def sales_by_cashier(cls, start_date=None, end_date=None):
+        """
+        إجمالي مبيعات كل كاشير في فترة (كل الأوقات إذا لم تحدد الفترة)
+
+        Args:
+            start_date (str): تاريخ البداية بصيغة YYYY-MM-DD
+            end_date (str): تاريخ النهاية بصيغة YYYY-MM-DD شاملاً
+
+        Returns:
+            tuple: (success, result)
+        """
+        return InvoiceModel.get_sales_by_cashier(start_date, end_date)
+
+    @classmethod
+    def low_stock(cls, threshold=5):
+        """
+        المنتجات التي وصل مخزونها للحد الأدنى أو أقل
+
+        Args:
+            threshold (int): الحد الأدنى للمخزون
+
+        Returns:
+            tuple: (success, result)
+        """
+        return ProductModel.get_low_stock(threshold)
@@ -0,0 +1,107 @@
+"""
+إعدادات مشتركة للاختبارات: توجيه النماذج والخدمات لقاعدة بيانات مؤقتة
+وإرجاعها بعد كل اختبار
+
+قاعدة بيانات MySQL تستخدم إذا حدد رابطها في STORE_MYSQL_URL وكان
+mysql-connector-python مثبتاً (القاعدة المحددة تحذف وتنشأ من جديد لكل اختبار
+فلا تستخدم قاعدة بيانات حقيقية)، وإلا تتخطى اختبارات MySQL
+"""
+import os
+import socket
+from urllib.parse import urlsplit
+import pytest
+from database.connection_manager import ConnectionManager
+from database.schema_migrations import SchemaMigrations
+from models.invoice_model import InvoiceModel
+from models.parked_cart_model import ParkedCartModel
+from models.product_catalog import ProductCatalog
+from models.product_model import ProductModel
+from models.user_model import UserModel
+from services.checkout_service import CheckoutService
+from services.invoice_import_service import InvoiceImportService
+from services.invoice_number_service import InvoiceNumberService
+from services.parked_cart_service import ParkedCartService
+
+# كل الفئات التي تحدد قاعدة البيانات بـ db_path (نفس القائمة في main.py)
+MODEL_CLASSES = (UserModel, ProductModel, InvoiceModel, ParkedCartModel, CheckoutService,
+                 ParkedCartService, InvoiceNumberService, InvoiceImportService)
+
+
+def use_database(db_path):
+    """توجيه النماذج والخدمات لقاعدة بيانات معينة مع مسح الحالة المحفوظة في الذاكرة"""
+    ConnectionManager.close_all()
+    for cls in MODEL_CLASSES:
+        cls.db_path = db_path
+    InvoiceNumberService._blocks.clear()
+    ProductCatalog._products = None
+
+
+@pytest.fixture(autouse=True, scope="module")
+def restore_database():
+    """إرجاع مسار قاعدة البيانات الأصلي بعد كل ملف اختبارات"""
+    paths = {cls: cls.db_path for cls in MODEL_CLASSES}
+    yield
+    ConnectionManager.close_all()
+    for cls, path in paths.items():
+        cls.db_path = path
+    InvoiceNumberService._blocks.clear()
+    ProductCatalog._products = None
+
+
+@pytest.fixture
+def store_db(tmp_path):
+    """قاعدة بيانات SQLite جديدة بعد الترحيل والنماذج موجهة إليها"""
+    db_path = str(tmp_path / "store.db")
+    success, result = SchemaMigrations.migrate(db_path)
+    assert success, result
+    use_database(db_path)
+    yield db_path
+    ConnectionManager.close_all()
+
+
+def mysql_url():
+    """رابط خادم MySQL للاختبارات أو تخطي الاختبار إذا لم يكن متاحاً"""
+    url = os.environ.get("STORE_MYSQL_URL")
+    if not url:
+        pytest.skip("لم يحدد رابط خادم MySQL (STORE_MYSQL_URL)")
+    pytest.importorskip("mysql.connector", reason="mysql-connector-python غير مثبت")
+
+    parts = urlsplit(url)
+    try:
+        socket.create_connection((parts.hostname or "localhost", parts.port or 3306), timeout=1).close()
+    except OSError as e:
+        pytest.skip(f"خادم MySQL غير متاح ({e})")
+    return url
+
+
+def recreate_mysql_database(url):
+    """حذف قاعدة بيانات الاختبار وإنشاؤها من جديد"""
+    import mysql.connector
+
+    parts = urlsplit(url)
+    database = parts.path.lstrip("/")
+    conn = mysql.connector.connect(host=parts.hostname or "localhost", port=parts.port or 3306,
+                                   user=parts.username or "root", password=parts.password or "")
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"DROP DATABASE IF EXISTS `{database}`")
+        cursor.execute(f"CREATE DATABASE `{database}` CHARACTER SET utf8mb4")
+    finally:
+        conn.close()
+
+
+@pytest.fixture(params=["sqlite", pytest.param("mysql", marks=pytest.mark.mysql)])
+def backend_db(request, tmp_path):
+    """نفس الاختبار على SQLite وعلى MySQL (إن كان متاحاً) بعد الترحيل"""
+    if request.param == "sqlite":
+        db_path = str(tmp_path / "store.db")
+    else:
+        db_path = mysql_url()
+        ConnectionManager.close_all()
+        recreate_mysql_database(db_path)
+
+    success, result = SchemaMigrations.migrate(db_path)
+    assert success, result
+    use_database(db_path)
+    yield db_path
+    ConnectionManager.close_all()
@@ -0,0 +1,56 @@
+"""
+خادم HTTP/JSON (api/server.py): الطلب بـ Content-Length غير صحيح يرد عليه 400
+ويغلق الاتصال بدلاً من أن يسقط الاتصال بخطأ
+"""
+import asyncio
+import json
+import pytest
+from api.server import ApiServer
+
+
+async def exchange(server, request):
+    """إرسال طلب خام وقراءة الرد كاملاً حتى يغلق الخادم الاتصال"""
+    listener = await asyncio.start_server(server.handle_connection, "127.0.0.1", 0)
+    port = listener.sockets[0].getsockname()[1]
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(request)
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+        return response
+    finally:
+        listener.close()
+        await listener.wait_closed()
+
+
+def parse(response):
+    head, _, body = response.partition(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    return int(lines[0].split(" ")[1]), lines[1:], json.loads(body)
+
+
+@pytest.mark.parametrize("length", ["abc", "-5", "1e3", "+7", "²"])
+def test_invalid_content_length_gets_400(store_db, length):
+    server = ApiServer(store_db, read_workers=1)
+    try:
+        request = f"POST /users HTTP/1.1\r\nContent-Length: {length}\r\n\r\n{{}}".encode("latin-1")
+        status, headers, payload = parse(asyncio.run(exchange(server, request)))
+    finally:
+        server.read_pool.shutdown()
+        server.write_pool.shutdown()
+
+    assert status == 400 and not payload["success"]
+    assert "Connection: close" in headers
+
+
+def test_valid_request_still_served(store_db):
+    server = ApiServer(store_db, read_workers=1)
+    try:
+        request = b"GET /products HTTP/1.1\r\nContent-Length: 0\r\nConnection: close\r\n\r\n"
+        status, headers, payload = parse(asyncio.run(exchange(server, request)))
+    finally:
+        server.read_pool.shutdown()
+        server.write_pool.shutdown()
+
+    assert status == 200 and payload == {"success": True, "result": []}
@@ -0,0 +1,222 @@
+"""
+نفس عمليات النماذج والخدمات على SQLite دائماً وعلى MySQL إذا كان متاحاً
+(STORE_MYSQL_URL)، مع ترجمة جمل SQLite إلى MySQL بدون خادم
+"""
+import threading
+import pytest
+from database.connection_manager import ConnectionManager
+from database.db_connection import MySQLConnection, translate_mysql
+from database.schema_migrations import SchemaMigrations
+from models.invoice_model import InvoiceModel
+from models.product_model import ProductModel
+from models.user_model import UserModel
+from services.checkout_service import CheckoutService
+from services.invoice_import_service import InvoiceImportService
+from services.parked_cart_service import ParkedCartService
+from services.receipt_template import ReceiptTemplate
+from services.report_service import ReportService
+
+
+def ok(result):
+    """التحقق من نجاح دالة تعيد (success, result) وإرجاع النتيجة"""
+    success, value = result
+    assert success, value
+    return value
+
+
+@pytest.mark.parametrize("sql, expected", [
+    ("BEGIN IMMEDIATE", "START TRANSACTION"),
+    ("RELEASE sp_1", "RELEASE SAVEPOINT sp_1"),
+    ("SELECT * FROM products WHERE id = ? AND name LIKE '%?%'",
+     "SELECT * FROM products WHERE id = %s AND name LIKE '%%?%%'"),
+    ("INSERT OR IGNORE INTO invoice_sequences (prefix, next_value) VALUES (?, 1)",
+     "INSERT IGNORE INTO invoice_sequences (prefix, next_value) VALUES (%s, 1)"),
+    ("INSERT OR REPLACE INTO users (username) VALUES (?)", "REPLACE INTO users (username) VALUES (%s)"),
+    ("INSERT INTO product_sales (product_id, quantity) VALUES (?, ?) "
+     "ON CONFLICT(product_id) DO UPDATE SET quantity = quantity + excluded.quantity",
+     "INSERT INTO product_sales (product_id, quantity) VALUES (%s, %s) "
+     "ON DUPLICATE KEY UPDATE quantity = quantity + VALUES(quantity)"),
+    ("CREATE TABLE IF NOT EXISTS t (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT, price REAL) WITHOUT ROWID",
+     "CREATE TABLE IF NOT EXISTS t (id INTEGER PRIMARY KEY AUTO_INCREMENT, name VARCHAR(255), price DOUBLE)"),
+    ("CREATE UNIQUE INDEX IF NOT EXISTS idx ON t(name)", "CREATE UNIQUE INDEX idx ON t(name)"),
+    ("DROP TABLE temp.invoice_totals", "DROP TEMPORARY TABLE invoice_totals"),
+    ("SELECT 1 FROM invoices WHERE barcode IS ? AND created_at = ?",
+     "SELECT 1 FROM invoices WHERE barcode <=> %s AND created_at = %s"),
+    ("SELECT * FROM invoices WHERE barcode IS NULL", "SELECT * FROM invoices WHERE barcode IS NULL"),
+])
+def test_translate_mysql(sql, expected):
+    assert translate_mysql(sql) == expected
+
+
+def test_translate_mysql_without_params_keeps_percent():
+    assert translate_mysql("SELECT '%'", False) == "SELECT '%'"
+
+
+@pytest.fixture
+def sale(backend_db):
+    """مستخدم ومنتجان وفاتورة بيع واحدة"""
+    ok(UserModel.add_user("cashier", "secret", "worker"))
+    user = ok(UserModel.authenticate("cashier", "secret"))
+
+    ok(ProductModel.add_product("شاي", 12.5, 40, "6220000000011"))
+    ok(ProductModel.add_product("سكر", 20, 5))
+    tea = ok(ProductModel.get_product_by_barcode("6220000000011"))
+    sugar = next(product for product in ok(ProductModel.get_all_products()) if product["name"] == "سكر")
+
+    items = [
+        {"product_id": tea["id"], "name": tea["name"], "price": tea["price"], "quantity": 3, "total": 37.5},
+        {"product_id": sugar["id"], "name": sugar["name"], "price": sugar["price"], "quantity": 2, "total": 40.0},
+    ]
+    invoice = ok(CheckoutService.checkout(user["id"], "عميل", "0100", None, items, 7.5))
+    return {"user": user, "tea": tea, "sugar": sugar, "items": items, "invoice": invoice,
+            "day": invoice["created_at"][:10]}
+
+
+def test_migration_reaches_latest_version(backend_db):
+    assert SchemaMigrations.get_version(backend_db) == SchemaMigrations.latest_version()
+
+
+def test_users(backend_db):
+    ok(UserModel.add_user("cashier", "secret", "worker"))
+    assert not UserModel.add_user("cashier", "x", "worker")[0]
+    assert ok(UserModel.authenticate("cashier", "secret"))["username"] == "cashier"
+
+
+def test_duplicate_barcode_rejected(sale):
+    success, message = ProductModel.add_product("قهوة", 30, 5, "6220000000011")
+    assert not success and "الباركود" in message
+
+
+def test_checkout_and_invoice(sale):
+    invoice = sale["invoice"]
+    assert invoice["total"] == 70.0
+
+    stored = ok(InvoiceModel.get_invoice(invoice["id"]))
+    assert len(stored["items"]) == 2
+    assert stored["invoice_number"] == invoice["invoice_number"]
+    assert ok(InvoiceModel.get_invoice_by_barcode(invoice["barcode"]))["id"] == invoice["id"]
+
+
+def test_checkout_over_stock_rejected(sale):
+    # الشاي يكفي والسكر لا يكفي: لا يخصم شيء والرسالة بالكمية الأصلية للسكر
+    over = [sale["items"][0], dict(sale["items"][1], quantity=10, total=200.0)]
+    success, message = CheckoutService.checkout(sale["user"]["id"], "", "", None, over)
+    assert not success and message == "الكمية المتاحة من سكر هي 3 فقط"
+
+    tea = ok(ProductModel.get_product(sale["tea"]["id"]))
+    sugar = ok(ProductModel.get_product(sale["sugar"]["id"]))
+    assert tea["quantity"] == 37 and tea["sold"] == 3
+    assert sugar["quantity"] == 3 and sugar["sold"] == 2
+
+
+def test_checkout_missing_product_rejected(sale):
+    missing = [sale["items"][0], dict(sale["items"][1], product_id=999999)]
+    assert CheckoutService.checkout(sale["user"]["id"], "", "", None, missing) == \
+        (False, "المنتج رقم 999999 غير موجود")
+    assert ok(ProductModel.get_product(sale["tea"]["id"]))["quantity"] == 37
+
+
+def test_reports_from_aggregates(sale):
+    day = sale["day"]
+    summary = ok(ReportService.day_summary(day))
+    assert summary["total_invoices"] == 1 and summary["total_items"] == 5
+    assert ok(ReportService.top_products(10, 0, day, day))[0]["sold"] == 3
+    assert ok(ReportService.sales_by_cashier(day, day))[0]["invoices_count"] == 1
+
+
+def test_parked_cart_resumes_once(sale):
+    cart_id = ok(ParkedCartService.park(sale["user"]["id"], "سلة", sale["items"][:1]))
+    cart = ok(ParkedCartService.resume(cart_id))
+    assert cart["items"][0]["quantity"] == 3 and not cart["changes"]
+    assert not ParkedCartService.resume(cart_id)[0]
+
+
+def test_iterators_and_keyset_pages(sale):
+    product_ids = sorted(product["id"] for product in ok(ProductModel.get_all_products()))
+    assert [product["id"] for product in ProductModel.iter_products(batch_size=1)] == product_ids
+    assert [product["id"] for product in ok(ProductModel.page(product_ids[0], 10))] == product_ids[1:]
+    assert len(list(UserModel.iter_users(batch_size=1))) == len(ok(UserModel.get_all_users()))
+
+    daily = list(InvoiceModel.iter_daily_sales(sale["day"], batch_size=1))
+    assert [invoice["id"] for invoice in daily] == [sale["invoice"]["id"]]
+    assert len(daily[0]["items"]) == 2
+
+    stored = ok(InvoiceModel.get_invoice(sale["invoice"]["id"]))
+    assert ok(InvoiceModel.page(0, 10, True))[0]["items"] == stored["items"]
+
+
+def test_import_legacy_invoices_once(backend_db, tmp_path):
+    template = ReceiptTemplate("متجر", "القاهرة", "0100")
+    items = [{"name": "شاي", "price": 12.5, "quantity": 2, "total": 25.0}]
+    # فاتورة بباركود وأخرى بدونه (NULL) حتى تختبر المقارنة barcode IS ?
+    for timestamp, barcode in ((1767340800, "#AB12"), (1767344400, None)):
+        invoice = {"id": timestamp, "barcode": barcode, "created_at": "", "customer_name": "عميل",
+                   "customer_phone": "0100", "items": items, "subtotal": 25.0, "discount": 0.0, "total": 25.0}
+        (tmp_path / f"invoice_{timestamp}.txt").write_text(template.render_text(invoice), encoding="utf-8")
+
+    assert ok(InvoiceImportService.import_directory(str(tmp_path))) == {"imported": 2, "skipped": 0, "failed": []}
+    assert ok(InvoiceImportService.import_directory(str(tmp_path))) == {"imported": 0, "skipped": 2, "failed": []}
+
+
+def test_savepoint_rollback_keeps_outer_transaction(backend_db, sale):
+    tea_id = sale["tea"]["id"]
+
+    class Rollback(Exception):
+        pass
+
+    with ConnectionManager.transaction(backend_db) as conn:
+        conn.execute("UPDATE products SET quantity = 100 WHERE id = ?", (tea_id,))
+        with pytest.raises(Rollback):
+            with ConnectionManager.transaction(backend_db) as inner:
+                inner.execute("UPDATE products SET quantity = 0 WHERE id = ?", (tea_id,))
+                raise Rollback()
+
+    assert ok(ProductModel.get_product(tea_id))["quantity"] == 100
+
+
+def test_concurrent_checkout_never_oversells(backend_db):
+    threads, sales = 8, 25
+    stock = threads * sales // 2
+    ok(ProductModel.add_product("منتج التزامن", 1, stock))
+    product = next(product for product in ok(ProductModel.get_all_products()) if product["name"] == "منتج التزامن")
+    item = {"product_id": product["id"], "name": product["name"], "price": 1, "quantity": 1, "total": 1}
+
+    results = []
+    lock = threading.Lock()
+
+    def sell():
+        for _ in range(sales):
+            success, _ = CheckoutService.checkout(None, "", "", None, [item])
+            with lock:
+                results.append(success)
+
+    workers = [threading.Thread(target=sell) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    product = ok(ProductModel.get_product(product["id"]))
+    assert sum(results) == stock
+    assert product["quantity"] == 0 and product["sold"] == stock
+
+
+class DuplicateIndexError(Exception):
+    errno = 1061
+
+
+class FakeMySQL:
+    """اتصال MySQL بديل: إنشاء الفهرس يفشل لأنه موجود"""
+
+    def cursor(self, buffered=False):
+        return self
+
+    def execute(self, sql, params=None):
+        if sql.startswith("CREATE"):
+            raise DuplicateIndexError("Duplicate key name 'idx_products_barcode'")
+
+
+def test_mysql_create_index_if_not_exists_is_idempotent():
+    cursor = MySQLConnection(FakeMySQL(), None).cursor()
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_products_barcode ON products(barcode)")
+    assert cursor.fetchall() == []
@@ -0,0 +1,36 @@
+"""
+قياس أداء طبقة الخدمات بـ pytest-benchmark على متاجر تجريبية بـ 1000 و 100 ألف
+ومليون منتج (الحجمان الكبيران بطيئان: python -m pytest -m slow tests/test_bench_services.py)
+
+مقارنة النتائج بتشغيل سابق:
+    python -m pytest tests/test_bench_services.py --benchmark-autosave
+    python -m pytest tests/test_bench_services.py --benchmark-compare --benchmark-compare-fail=mean:20%
+"""
+import pytest
+from benchmarks.bench_services import CASE_NAMES, SIZES, build_store, service_cases
+from database.connection_manager import ConnectionManager
+
+pytest.importorskip("pytest_benchmark")
+
+# المتجر الصغير في كل تشغيل والأحجام الكبيرة مع -m slow فقط
+STORE_SIZES = [
+    pytest.param(size, id=f"{size // 1000000}m" if size >= 1000000 else f"{size // 1000}k",
+                 marks=() if size <= 1000 else pytest.mark.slow)
+    for size in SIZES
+]
+
+
+@pytest.fixture(scope="module", params=STORE_SIZES)
+def store(request, tmp_path_factory):
+    """متجر تجريبي بحجم معين (ينشأ مرة واحدة لكل حجم) وعمليات القياس عليه"""
+    size = request.param
+    db_path = str(tmp_path_factory.mktemp("bench") / f"store_{size}.db")
+    invoices = build_store(db_path, size)
+    yield service_cases(db_path, size, invoices)
+    ConnectionManager.close_all()
+
+
+@pytest.mark.parametrize("case", CASE_NAMES)
+def test_service(benchmark, store, case):
+    benchmark.group = case
+    benchmark(store[case])
@@ -0,0 +1,26 @@
+"""
+تشغيل سكربتات القياس في benchmarks/ بأحجام صغيرة للتأكد من أنها ما زالت تعمل
+(مثلاً بعد ترحيل يغير أعمدة الجداول) - بطيئة: python -m pytest -m slow
+"""
+import os
+import subprocess
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPTS = [
+    ("bench_sales_reports", ["--invoices", "2000", "--days", "30", "--repeat", "1"]),
+    ("bench_product_search", ["--products", "2000", "--repeat", "1"]),
+    ("bench_receipts", ["--receipts", "200", "--target", "0"]),
+    ("bench_services", ["--sizes", "1000", "--min-time", "0.01"]),
+    ("stress_checkout", ["--terminals", "2", "--products", "5", "--stock", "50", "--duration", "5"]),
+]
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("script, args", SCRIPTS, ids=[script for script, _ in SCRIPTS])
+def test_benchmark_script_runs(script, args):
+    result = subprocess.run([sys.executable, "-m", f"benchmarks.{script}", *args], cwd=ROOT,
+                            capture_output=True, text=True, timeout=300)
+    assert result.returncode == 0, result.stderr
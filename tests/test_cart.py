@@ -0,0 +1,128 @@
+"""
+سلة المشتريات (services/cart_service.py Cart): المجموع المحدث بالقروش بعد كثرة
+التعديل، والخصم، والأحداث المرسلة للواجهة
+"""
+import random
+import pytest
+from services.cart_service import Cart, CartService
+
+PRICES = [0.1, 0.2, 0.3, 0.05, 19.99, 33.33, 1.15, 1000.01, 12.5, 7]
+
+
+def product(product_id, price, quantity=1000):
+    return {"id": product_id, "name": f"منتج {product_id}", "price": price, "quantity": quantity}
+
+
+def test_subtotal_matches_full_sum_after_many_edits():
+    rng = random.Random(7)
+    cart = Cart()
+    for step in range(5000):
+        product_id = rng.randrange(len(PRICES))
+        action = rng.random()
+        if action < 0.5:
+            cart.add(product(product_id, PRICES[product_id]), rng.randint(1, 5))
+        elif action < 0.8:
+            cart.update(product_id, rng.randint(0, 20))
+        elif action < 0.98:
+            cart.remove(product_id)
+        else:
+            cart.clear()
+
+        if step % 50 == 0:
+            cart.set_discount(rng.choice([0, 1.5, -3, "2.25", "abc", None, 10 ** 6]))
+        # المجموع المحدث بالفرق يساوي إعادة جمع السلة كلها بدون أخطاء كسور
+        assert cart.totals() == CartService.compute_totals(cart.items(), cart.requested_discount)
+
+    expected = sum(round(item["quantity"] * item["price"] * 100) for item in cart.items())
+    assert round(cart.subtotal * 100) == expected
+
+
+def test_small_prices_do_not_drift():
+    cart = Cart()
+    cart.add(product(1, 0.1), 1)
+    cart.add(product(2, 0.2), 1)
+    for quantity in range(1, 1000):
+        cart.update(1, quantity % 7 + 1)
+    cart.update(1, 1)
+    assert cart.subtotal == 0.3
+    assert cart.totals() == {"subtotal": 0.3, "discount": 0, "total": 0.3}
+
+
+@pytest.mark.parametrize("discount, expected", [
+    (5, 5.0),
+    ("2.5", 2.5),
+    (-3, 0),
+    (None, 0),
+    ("خطأ", 0),
+    (1000, 20.0),  # لا يتجاوز الخصم مجموع السلة
+])
+def test_discount_is_corrected(discount, expected):
+    cart = Cart()
+    cart.add(product(1, 10), 2)
+    totals = cart.set_discount(discount)
+    assert totals["discount"] == expected
+    assert totals["total"] == round(20 - expected, 2)
+    # الخصم المطلوب يبقى كما هو ويصحح مع كل تغيير للمجموع
+    cart.update(1, 1)
+    assert cart.totals()["discount"] == min(expected, 10)
+
+
+def test_events_carry_changed_item_only():
+    cart = Cart()
+    events = []
+    listener = lambda event, item: events.append((event, dict(item) if item else None))
+    cart.subscribe(listener)
+    cart.subscribe(listener)  # الاشتراك مرتين لا يكرر الأحداث
+
+    tea, sugar = product(1, 12.5, 5), product(2, 20, 5)
+    cart.add(tea, 2)
+    cart.add(tea, 1)
+    cart.add(sugar, 1)
+    cart.update(2, 4)
+    cart.update(1, 0)
+    cart.remove(2)
+    cart.load([CartService.new_item(tea, 3)], discount=2)
+    cart.clear()
+
+    assert events == [
+        ("add", {"product_id": 1, "name": "منتج 1", "price": 12.5, "quantity": 2, "total": 25.0}),
+        ("update", {"product_id": 1, "name": "منتج 1", "price": 12.5, "quantity": 3, "total": 37.5}),
+        ("add", {"product_id": 2, "name": "منتج 2", "price": 20, "quantity": 1, "total": 20}),
+        ("update", {"product_id": 2, "name": "منتج 2", "price": 20, "quantity": 4, "total": 80}),
+        ("remove", {"product_id": 1, "name": "منتج 1", "price": 12.5, "quantity": 3, "total": 37.5}),
+        ("remove", {"product_id": 2, "name": "منتج 2", "price": 20, "quantity": 4, "total": 80}),
+        ("clear", None),
+        ("add", {"product_id": 1, "name": "منتج 1", "price": 12.5, "quantity": 3, "total": 37.5}),
+        ("clear", None),
+    ]
+    assert not cart and cart.requested_discount == 0
+
+    cart.unsubscribe(listener)
+    cart.add(tea, 1)
+    assert len(events) == 9
+
+
+def test_rejected_changes_send_no_event():
+    cart = Cart()
+    events = []
+    cart.subscribe(lambda event, item: events.append(event))
+    tea = product(1, 12.5, 3)
+    cart.add(tea, 2)
+
+    assert cart.add(tea, 2) == (False, "الكمية المتاحة هي 3 فقط")
+    assert cart.add(tea, 0) == (False, "يجب أن تكون الكمية أكبر من صفر")
+    assert cart.update(1, -1) == (False, "يجب أن تكون الكمية أكبر من صفر")
+    assert cart.update(1, 4, available=3) == (False, "الكمية المتاحة هي 3 فقط")
+    assert cart.update(9, 1) == (False, "المنتج غير موجود في السلة")
+    assert cart.remove(9) == (False, "المنتج غير موجود في السلة")
+
+    assert events == ["add"]
+    assert cart.get(1)["quantity"] == 2 and cart.subtotal == 25.0
+
+
+def test_items_are_copies():
+    cart = Cart()
+    cart.add(product(1, 12.5), 2)
+    items = cart.items()
+    items[0]["quantity"] = 99
+    assert cart.get(1)["quantity"] == 2 and 1 in cart and len(cart) == 1
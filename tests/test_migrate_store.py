@@ -0,0 +1,262 @@
+"""
+قارئ ملفات mysqldump والنقل بين MySQL و SQLite (tools/migrate_store.py)
+"""
+import io
+import sqlite3
+import time
+import pytest
+from services.checkout_service import CheckoutService
+from models.product_model import ProductModel
+from tools.migrate_store import CHUNK_SIZE, DumpReader, StoreMigrator, parse_time_zone, parse_value
+
+# ملف فيه كل ما يجب أن يتخطاه القارئ أو يحلله: تعليقات وجمل /*!...*/ و LOCK TABLES،
+# ونصوص فيها فواصل وأقواس و ; وعلامات هروب، وجملة INSERT على عدة أسطر وبأعمدة محددة
+DUMP = r"""-- MySQL dump 10.13
+/*!40101 SET NAMES utf8mb4 */;
+/*!40014 SET @OLD_FOREIGN_KEY_CHECKS=@@FOREIGN_KEY_CHECKS, FOREIGN_KEY_CHECKS=0 */;
+
+DROP TABLE IF EXISTS `products`;
+CREATE TABLE `products` (
+  `id` int NOT NULL AUTO_INCREMENT,
+  `name` varchar(100) NOT NULL,
+  `price` decimal(10,2) NOT NULL,
+  `quantity` int NOT NULL DEFAULT '0',
+  `sold` int NOT NULL DEFAULT '0',
+  `created_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+LOCK TABLES `products` WRITE;
+/*!40000 ALTER TABLE `products` DISABLE KEYS */;
+INSERT INTO `products` VALUES (1,'شاي (كبير), 1/2',12.50,40,3,'2025-08-05 02:33:15'),(2,'O\'Brien''s; \"x\"',0.99,0,0,NULL),
+(3,'سطر\nجديد\\ و\ttab',1000.00,-1,2,NULL);
+/*!40000 ALTER TABLE `products` ENABLE KEYS */;
+UNLOCK TABLES;
+
+INSERT INTO `products` (`id`, `name`, `price`, `quantity`, `sold`) VALUES (4,'),(;',5.00,1,0);
+-- Dump completed
+"""
+
+EXPECTED_PRODUCTS = [
+    (1, "شاي (كبير), 1/2", 12.5, 40, 3, "2025-08-05 02:33:15"),
+    (2, "O'Brien's; \"x\"", 0.99, 0, 0, None),
+    (3, "سطر\nجديد\\ و\ttab", 1000.0, -1, 2, None),
+    (4, "),(;", 5.0, 1, 0),
+]
+
+
+@pytest.mark.parametrize("token, expected", [
+    ("'plain'", "plain"),
+    (r"'O\'Brien'", "O'Brien"),
+    ("'it''s'", "it's"),
+    (r"'\0\b\n\r\t\Z'", "\0\b\n\r\t\x1a"),
+    (r"'back\\slash'", "back\\slash"),
+    (r"'\"quoted\"'", '"quoted"'),
+    (r"'50\%\_'", r"50\%\_"),
+    (r"'\x'", "x"),
+    ("''", ""),
+    ("NULL", None),
+    ("42", 42),
+    (" -7 ", -7),
+    ("12.50", 12.5),
+    ("1e3", 1000.0),
+    ("0x4142", b"AB"),
+])
+def test_parse_value(token, expected):
+    assert parse_value(token) == expected
+
+
+def read_events(text, chunk_size, batch_size=2):
+    return list(DumpReader(io.StringIO(text), chunk_size=chunk_size, batch_size=batch_size).events())
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, CHUNK_SIZE])
+def test_reader_across_chunk_boundaries(chunk_size):
+    events = read_events(DUMP, chunk_size)
+
+    assert events[0] == ("table", "products", ["id", "name", "price", "quantity", "sold", "created_at"])
+    rows = [row for event in events if event[0] == "rows" for row in event[3]]
+    assert rows == EXPECTED_PRODUCTS
+
+    # دفعات batch_size صفين، والجملة الأخيرة بأعمدتها المحددة
+    batches = [(event[2], len(event[3])) for event in events if event[0] == "rows"]
+    assert batches == [(None, 2), (None, 1), (["id", "name", "price", "quantity", "sold"], 1)]
+
+
+def test_reader_rejects_truncated_insert():
+    with pytest.raises(ValueError):
+        read_events("INSERT INTO `products` VALUES (1,'a',1.00,1,0),(2,'b", 3)
+
+
+def test_import_sharp_db_dump(store_db):
+    migrator = StoreMigrator(store_db)
+    try:
+        with open("sql/sharp_db.sql", encoding="utf-8") as stream:
+            migrator.import_dump(stream)
+    finally:
+        migrator.close()
+
+    assert migrator.counts["users"] == 4 and migrator.counts["products"] == 4
+    conn = sqlite3.connect(store_db)
+    try:
+        assert conn.execute("SELECT username, role FROM users WHERE id = 1").fetchone() == ("adm", "admin")
+        assert conn.execute("SELECT name, price, quantity, sold FROM products WHERE id = 1").fetchone() == \
+            ("كباس", 1000.0, 20, 4)
+    finally:
+        conn.close()
+
+
+def test_import_refuses_non_empty_store_and_rolls_back(store_db):
+    assert ProductModel.add_product("موجود", 1, 1)[0]
+
+    migrator = StoreMigrator(store_db)
+    try:
+        with pytest.raises(ValueError, match="--replace"):
+            migrator.import_dump(io.StringIO(DUMP))
+
+        # صف تالف في منتصف الملف: لا يبقى شيء مما أدخل قبله
+        broken = DUMP.replace("(4,'),(;',5.00,1,0)", "(4,'),(;',5.00,1,0")
+        with pytest.raises(ValueError):
+            migrator.import_dump(io.StringIO(broken), replace=True)
+    finally:
+        migrator.close()
+
+    conn = sqlite3.connect(store_db)
+    try:
+        assert conn.execute("SELECT name FROM products").fetchall() == [("موجود",)]
+    finally:
+        conn.close()
+
+
+TABLE_QUERIES = {
+    "users": "SELECT id, username, password, role FROM users ORDER BY id",
+    "products": "SELECT id, name, price, quantity, sold FROM products ORDER BY id",
+    "invoices": "SELECT id, customer_name, customer_phone, subtotal, discount, total, created_at "
+                "FROM invoices ORDER BY id",
+    "invoice_items": "SELECT id, invoice_id, product_id, name, price, quantity, item_total "
+                     "FROM invoice_items ORDER BY id",
+    "daily_sales": "SELECT * FROM daily_sales ORDER BY date",
+}
+
+
+def snapshot(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return {table: conn.execute(query).fetchall() for table, query in TABLE_QUERIES.items()}
+    finally:
+        conn.close()
+
+
+def test_export_import_round_trip(store_db, tmp_path):
+    names = ["شاي", "O'Brien \\ \"x\"", "سطر\nجديد", "),(;", "50%"]
+    for position, name in enumerate(names, 1):
+        assert ProductModel.add_product(name, position * 1.25, 100)[0]
+    products = ProductModel.get_all_products()[1]
+    for product in products:
+        item = {"product_id": product["id"], "name": product["name"], "price": product["price"],
+                "quantity": 2, "total": round(product["price"] * 2, 2)}
+        assert CheckoutService.checkout(1, "عميل '1'", "0100", None, [item], 0.5)[0]
+
+    dump = io.StringIO()
+    migrator = StoreMigrator(store_db)
+    try:
+        # جمل صغيرة حتى يقسم كل جدول على عدة جمل INSERT
+        migrator.export_dump(dump, statement_size=60)
+    finally:
+        migrator.close()
+    assert dump.getvalue().count("INSERT INTO `invoice_items`") > 1
+
+    target = str(tmp_path / "imported.db")
+    migrator = StoreMigrator(target)
+    try:
+        dump.seek(0)
+        migrator.import_dump(dump)
+    finally:
+        migrator.close()
+
+    assert snapshot(target) == snapshot(store_db)
+
+
+@pytest.fixture
+def utc_plus_3(monkeypatch):
+    """التوقيت المحلي للجهاز +03:00 (في صيغة POSIX تعكس الإشارة)"""
+    monkeypatch.setenv("TZ", "UTC-3")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+# فاتورتان قرب منتصف الليل: الأولى بعد منتصف الليل بالتوقيت المحلي (+03:00)
+TIMED_INVOICES = """CREATE TABLE `invoices` (
+  `id` int NOT NULL AUTO_INCREMENT,
+  `subtotal` decimal(10,2) NOT NULL,
+  `discount` decimal(10,2) DEFAULT '0.00',
+  `total` decimal(10,2) NOT NULL,
+  `created_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP,
+  `customer_name` varchar(100) DEFAULT '',
+  `customer_phone` varchar(20) DEFAULT '',
+  PRIMARY KEY (`id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+INSERT INTO `invoices` VALUES (1,10.00,0.00,10.00,'2025-08-05 22:30:00','',''),(2,20.00,0.00,20.00,'2025-08-05 20:00:00','','');
+"""
+
+
+def import_text(db_path, text):
+    migrator = StoreMigrator(db_path)
+    try:
+        migrator.import_dump(io.StringIO(text))
+    finally:
+        migrator.close()
+    conn = sqlite3.connect(db_path)
+    try:
+        return (conn.execute("SELECT id, created_at FROM invoices ORDER BY id").fetchall(),
+                conn.execute("SELECT date, invoices_count FROM daily_sales ORDER BY date").fetchall())
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize("header, expected", [
+    # mysqldump يكتب الأوقات بتوقيت UTC
+    ("/*!40103 SET TIME_ZONE='+00:00' */;\n", ["2025-08-06 01:30:00", "2025-08-05 23:00:00"]),
+    ("SET TIME_ZONE = '+02:00';\n", ["2025-08-05 23:30:00", "2025-08-05 21:00:00"]),
+    ("/*!40103 SET TIME_ZONE='-05:30' */;\n", ["2025-08-06 07:00:00", "2025-08-06 04:30:00"]),
+    # بدون SET TIME_ZONE (--skip-tz-utc) أو SYSTEM: الأوقات محلية كما هي
+    ("", ["2025-08-05 22:30:00", "2025-08-05 20:00:00"]),
+    ("/*!40103 SET TIME_ZONE='SYSTEM' */;\n", ["2025-08-05 22:30:00", "2025-08-05 20:00:00"]),
+])
+def test_import_converts_dump_time_zone_to_local(store_db, utc_plus_3, header, expected):
+    invoices, daily = import_text(store_db, header + TIMED_INVOICES + "/*!40103 SET TIME_ZONE=@OLD_TIME_ZONE */;\n")
+
+    assert invoices == [(1, expected[0]), (2, expected[1])]
+    # ملخص المبيعات اليومية بتاريخ اليوم المحلي
+    days = {}
+    for created_at in expected:
+        days[created_at[:10]] = days.get(created_at[:10], 0) + 1
+    assert daily == sorted(days.items())
+
+
+def test_export_writes_utc_near_midnight(store_db, tmp_path, utc_plus_3):
+    import_text(store_db, "/*!40103 SET TIME_ZONE='+00:00' */;\n" + TIMED_INVOICES)
+
+    dump = io.StringIO()
+    migrator = StoreMigrator(store_db)
+    try:
+        migrator.export_dump(dump)
+    finally:
+        migrator.close()
+    text = dump.getvalue()
+    assert "SET TIME_ZONE='+00:00'" in text
+    assert "'2025-08-05 22:30:00'" in text and "'2025-08-05 20:00:00'" in text
+    assert "2025-08-06 01:30:00" not in text
+
+    invoices, daily = import_text(str(tmp_path / "imported.db"), text)
+    assert invoices == [(1, "2025-08-06 01:30:00"), (2, "2025-08-05 23:00:00")]
+    assert daily == [("2025-08-05", 1), ("2025-08-06", 1)]
+
+
+def test_parse_time_zone():
+    assert parse_time_zone("SYSTEM") is None
+    assert parse_time_zone("+00:00").utcoffset(None).total_seconds() == 0
+    assert parse_time_zone("-05:30").utcoffset(None).total_seconds() == -(5 * 3600 + 1800)
+    assert parse_time_zone("Africa/Cairo").key == "Africa/Cairo"
@@ -0,0 +1,106 @@
+"""
+مجموعة اتصالات MySQL بدون خادم: الاتصال الفعلي بديل بسيط يسجل الفحص والإغلاق
+"""
+import sqlite3
+import threading
+import pytest
+from database.db_connection import MySQLBackend
+
+
+class FakeRaw:
+    """اتصال mysql.connector بديل"""
+
+    def __init__(self):
+        self.pings = 0
+        self.closed = False
+        self.in_transaction = False
+        self.broken = False
+
+    def ping(self, reconnect=False, attempts=1, delay=0):
+        self.pings += 1
+
+    def rollback(self):
+        if self.broken:
+            raise OSError("connection lost")
+        self.in_transaction = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeBackend(MySQLBackend):
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.opened = []
+
+    def open_raw(self):
+        raw = FakeRaw()
+        self.opened.append(raw)
+        return raw
+
+
+def test_connections_are_reused():
+    backend = FakeBackend(pool_size=2)
+    conn = backend.connect()
+    backend.release(conn)
+    assert backend.connect() is conn
+    assert len(backend.opened) == 1
+
+
+def test_idle_connection_is_checked_after_interval():
+    backend = FakeBackend(pool_size=1, health_check_interval=60)
+    conn = backend.connect()
+    assert conn.raw.pings == 1  # اتصال جديد يفحص
+
+    backend.release(conn)
+    backend.connect()
+    assert conn.raw.pings == 1  # استخدم منذ لحظات
+
+    backend.release(conn)
+    conn.last_used -= 61
+    backend.connect()
+    assert conn.raw.pings == 2
+
+
+def test_exhausted_pool_times_out():
+    backend = FakeBackend(pool_size=1, acquire_timeout=0.05)
+    backend.connect()
+    with pytest.raises(sqlite3.OperationalError, match="busy"):
+        backend.connect()
+
+
+def test_waiting_thread_gets_released_connection():
+    backend = FakeBackend(pool_size=1, acquire_timeout=5)
+    conn = backend.connect()
+    timer = threading.Timer(0.05, backend.release, (conn,))
+    timer.start()
+    assert backend.connect() is conn
+    timer.join()
+
+
+def test_broken_connection_is_discarded():
+    backend = FakeBackend(pool_size=1)
+    conn = backend.connect()
+    conn.raw.in_transaction = True
+    conn.raw.broken = True
+    backend.release(conn)
+
+    assert conn.raw.closed
+    replacement = backend.connect()
+    assert replacement is not conn and len(backend.opened) == 2
+
+
+def test_close_replaces_pool():
+    backend = FakeBackend(pool_size=2)
+    idle = backend.connect()
+    busy = backend.connect()
+    backend.release(idle)
+
+    backend.close()
+    assert idle.raw.closed and not busy.raw.closed
+
+    # الاتصال المستخدم أثناء الإغلاق يغلق عند إعادته ولا يدخل المجموعة الجديدة
+    backend.release(busy)
+    assert busy.raw.closed
+    fresh = backend.connect()
+    assert fresh not in (idle, busy) and fresh.pool is not busy.pool
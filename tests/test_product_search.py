@@ -0,0 +1,147 @@
+"""
+فهرس البحث في أسماء المنتجات (models/product_search.py): النتائج تطابق البحث
+المباشر normalize_arabic(q) in normalize_arabic(name) بعد الإضافة والحذف وتغيير
+الأسماء، بترتيب: بداية الاسم ثم بداية كلمة ثم منتصف كلمة
+"""
+import random
+import pytest
+from models.product_search import ProductSearchIndex, normalize_arabic
+
+LETTERS = "ابتسمنهويةىأإآؤئ" + "abcXY"
+MARKS = "َّـ"  # فتحة وشدة وتطويل
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("أحمد", "احمد"),
+    ("إسلام آمنة", "اسلام امنه"),
+    ("مُدَرِّسـة", "مدرسه"),
+    ("مستشفى شاطئ مؤمن", "مستشفي شاطي مومن"),
+    ("  Coffee\t  BEANS ", "coffee beans"),
+    (None, ""),
+])
+def test_normalize_arabic(text, expected):
+    assert normalize_arabic(text) == expected
+
+
+def random_name(rng):
+    words = []
+    for _ in range(rng.randint(1, 3)):
+        word = "".join(rng.choice(LETTERS) for _ in range(rng.randint(1, 6)))
+        if rng.random() < 0.3:
+            position = rng.randint(1, len(word))
+            word = word[:position] + rng.choice(MARKS) + word[position:]
+        words.append(word)
+    return " ".join(words)
+
+
+def rank(name, query):
+    """ترتيب النتيجة كما يجب أن يعيده الفهرس: (المجموعة، مفتاح الترتيب داخلها) أو None"""
+    if query not in name:
+        return None
+    if name.startswith(query):
+        return 0, name
+    suffixes = [name[position + 1:] for position, char in enumerate(name) if char == " "]
+    matching = [suffix for suffix in suffixes if suffix.startswith(query)]
+    if matching:
+        return 1, min(matching)
+    return 2, name
+
+
+def check(index, names, query, limit=None, accept=None):
+    normalized = normalize_arabic(query)
+    results = index.search(query, limit, accept)
+    assert len(results) == len(set(results))
+
+    if not normalized:
+        # بدون نص بحث: كل المنتجات (المقبولة) بترتيب إضافتها للفهرس
+        accepted = {product_id for product_id in names if accept is None or accept(product_id)}
+        assert set(results) <= accepted
+        assert len(results) == (len(accepted) if limit is None else min(limit, len(accepted)))
+        return
+
+    expected = sorted(
+        (key, product_id) for product_id, key in
+        ((product_id, rank(normalize_arabic(name), normalized)) for product_id, name in names.items())
+        if key is not None and (accept is None or accept(product_id))
+    )
+    if limit is not None:
+        expected = expected[:limit]
+
+    # المفاتيح المتساوية (نفس الاسم) لا ترتيب محدد بينها فتقارن المفاتيح بالترتيب
+    assert [rank(normalize_arabic(names[product_id]), normalized) for product_id in results] == \
+        [key for key, _ in expected]
+    if limit is None:
+        assert set(results) == {product_id for _, product_id in expected}
+        assert set(results) == {product_id for product_id, name in names.items()
+                                if ProductSearchIndex.matches(query, name)
+                                and (accept is None or accept(product_id))}
+
+
+def queries_for(rng, names):
+    queries = ["", "ا", "zz", "ب ت", "  "]
+    for name in rng.sample(list(names.values()), min(20, len(names))):
+        start = rng.randrange(len(name))
+        queries.append(name[start:start + rng.randint(1, 5)])
+    return queries
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_search_matches_brute_force_after_edits(seed):
+    rng = random.Random(seed)
+    names = {product_id: random_name(rng) for product_id in range(1, 301)}
+    index = ProductSearchIndex()
+    index.build(names.items())
+
+    for step in range(400):
+        product_id = rng.randint(1, 350)
+        if rng.random() < 0.3 and product_id in names:
+            index.remove(product_id)
+            del names[product_id]
+        else:
+            names[product_id] = random_name(rng)
+            index.add(product_id, names[product_id])
+
+        if step % 100 == 0:
+            assert len(index) == len(names)
+            even = lambda product_id: product_id % 2 == 0
+            for query in queries_for(rng, names):
+                check(index, names, query)
+                check(index, names, query, limit=5)
+                check(index, names, query, accept=even)
+                check(index, names, query, limit=3, accept=even)
+
+
+def test_build_equals_incremental_add():
+    rng = random.Random(11)
+    names = {product_id: random_name(rng) for product_id in range(1, 200)}
+    built = ProductSearchIndex()
+    built.build(names.items())
+    added = ProductSearchIndex()
+    for product_id, name in names.items():
+        added.add(product_id, name)
+
+    for query in queries_for(rng, names):
+        assert sorted(built.search(query)) == sorted(added.search(query))
+        assert [names[i] for i in built.search(query, 10)] == [names[i] for i in added.search(query, 10)]
+
+
+def test_ranking_groups():
+    index = ProductSearchIndex()
+    index.build([(1, "عصير برتقال"), (2, "برتقال"), (3, "بسكويت"), (4, "كيك بالبرتقال"),
+                 (5, "برتقال أبو صره"), (6, "شاي")])
+
+    # بداية الاسم (أبجدياً) ثم بداية كلمة ثم منتصف كلمة
+    assert index.search("برتقال") == [2, 5, 1, 4]
+    assert index.search("برتقال", limit=3) == [2, 5, 1]
+    assert index.search("البرتقال") == [4]
+    assert index.search("ابو") == [5]
+    assert index.search("xyz") == []
+
+    # بدون نص بحث: كل المنتجات بترتيب إضافتها
+    assert index.search("") == [1, 2, 3, 4, 5, 6]
+    assert index.search(" ", limit=2) == [1, 2]
+
+    index.add(2, "شاي برتقال")
+    index.remove(5)
+    assert index.search("برتقال") == [1, 2, 4]
+    assert index.search("شا") == [6, 2]
@@ -0,0 +1,57 @@
+"""
+إيصال النص العادي: الإطار لا ينكسر مع الأرقام الكبيرة والأسماء الطويلة،
+واستيراد الإيصال المحفوظ يعيد نفس الأصناف (InvoiceImportService)
+"""
+import pytest
+from services.invoice_import_service import InvoiceImportService
+from services.receipt_template import ReceiptTemplate, display_width
+
+NAMES = [
+    "شاي",
+    "شاي العروسة الناعم الأحمر عبوة كبيرة جداً",
+    "SuperLongProductCodeWithoutSpaces-XL",
+    "كابل USB-C-Lightning-Braided 2م",
+    "abcdefghijkl mnopqrstuvwx yz",
+    "قهوة - محوج",
+]
+
+
+def invoice_with(items):
+    subtotal = sum(item["total"] for item in items)
+    return {"id": 7, "invoice_number": "A-7", "barcode": "#AB12", "created_at": "2026-01-02 10:00:00",
+            "customer_name": "عميل", "customer_phone": "0100", "items": items,
+            "subtotal": subtotal, "discount": 0.0, "total": subtotal}
+
+
+def box_widths(text):
+    """عرض كل أسطر الإطار (بعد الترويسة)"""
+    lines = text.splitlines()
+    start = next(index for index, line in enumerate(lines) if line.startswith("+"))
+    return {display_width(line) for line in lines[start:] if line.startswith(("|", "+"))}
+
+
+@pytest.mark.parametrize("width", [48, 64])
+@pytest.mark.parametrize("quantity, price", [(3, 12.5), (12345, 999999.99)])
+def test_saved_receipt_imports_same_items(width, quantity, price):
+    template = ReceiptTemplate("متجر", "القاهرة", "0100", width=width)
+    items = [{"name": name, "quantity": quantity, "price": price, "total": round(quantity * price, 2)}
+             for name in NAMES]
+    text = template.render_text(invoice_with(items))
+
+    assert box_widths(text) == {width}
+    assert "#" * 3 not in text
+
+    parsed = InvoiceImportService.parse_invoice_text(text, "invoice_1767340800.txt")
+    assert [(item["name"], item["quantity"], item["price"], item["total"]) for item in parsed["items"]] == \
+        [(item["name"], item["quantity"], item["price"], item["total"]) for item in items]
+
+
+def test_value_wider_than_every_column_is_marked_not_clipped():
+    # عمود الاسم بأقل عرض فلا تتسع أعمدة الأرقام
+    template = ReceiptTemplate("متجر", "القاهرة", "0100", width=42)
+    items = [{"name": "شاي", "quantity": 1, "price": 1.0, "total": 10.0 ** 12}]
+    text = template.render_text(invoice_with(items))
+
+    assert box_widths(text) == {42}
+    assert "| " + "#" * 9 + " |" in text
+    assert "1000000000000.00" in text  # سطر الإجماليات يتسع للقيمة
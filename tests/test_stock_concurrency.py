@@ -0,0 +1,40 @@
+"""
+البيع من عدة أجهزة (عمليات منفصلة) على نفس قاعدة البيانات لا يبيع أكثر من المخزون
+
+قياس عدد عمليات البيع في الثانية مع زيادة الأجهزة في benchmarks/stress_checkout.py
+"""
+import sqlite3
+import pytest
+from benchmarks.stress_checkout import run_round
+
+
+@pytest.mark.parametrize("terminals, products, stock", [
+    (4, 5, 100),
+    (8, 20, 2000),
+])
+def test_concurrent_terminals_never_oversell(tmp_path, terminals, products, stock):
+    checkouts, stock_failures, errors, rate, problems = run_round(str(tmp_path), terminals, products, stock, 60)
+
+    assert errors == 0
+    assert problems == []
+    # المخزون قليل فيجب أن تصل الأجهزة لنفاده فعلاً وإلا لم يختبر التزاحم عليه
+    assert stock_failures > 0
+
+    conn = sqlite3.connect(str(tmp_path / f"stress_{terminals}.db"))
+    try:
+        rows = conn.execute("""
+            SELECT p.quantity, p.sold, COALESCE(SUM(ii.quantity), 0)
+            FROM products p
+            LEFT JOIN invoice_items ii ON ii.product_id = p.id
+            GROUP BY p.id
+        """).fetchall()
+        invoices = conn.execute("SELECT COUNT(*) FROM invoices").fetchone()[0]
+    finally:
+        conn.close()
+
+    assert len(rows) == products
+    for quantity, sold, invoiced in rows:
+        assert quantity >= 0
+        assert sold == invoiced
+        assert quantity + invoiced == stock
+    assert invoices == checkouts
@@ -0,0 +1,323 @@
+"""
+مولد بيانات تجريبية لقاعدة بيانات المتجر - منتجات بأسماء عربية ومستخدمين
+وسنوات من الفواتير وعناصرها، مع توزيع Zipf لشعبية المنتجات
+
+نفس البذرة (seed) ونفس المعاملات تنتج نفس البيانات دائماً
+
+الاستخدام (من مجلد المشروع):
+    python -m tools.generate_store --db data/test_store.db --products 20000 --years 3
+    python -m tools.generate_store --db data/test_store.db --invoices-per-day 2000 --zipf 1.2 --seed 7
+"""
+import argparse
+import hashlib
+import itertools
+import os
+import random
+import sqlite3
+import sys
+import time
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from database.connection_manager import ConnectionManager
+from database.sales_aggregates import SalesAggregates
+from database.schema_migrations import SchemaMigrations
+
+
+# عدد الصفوف في كل دفعة executemany
+BATCH_SIZE = 50000
+
+# مكونات أسماء المنتجات
+PRODUCT_NAMES = [
+    "أرز", "سكر", "شاي", "قهوة", "زيت", "مكرونة", "عدس", "فول", "دقيق", "ملح",
+    "لبن", "جبنة", "زبدة", "عسل", "مربى", "بسكويت", "شيكولاتة", "عصير", "مياه", "صابون",
+    "شامبو", "منظف", "مناديل", "تونة", "سردين", "صلصة", "خل", "كاتشب", "مايونيز", "بن",
+]
+PRODUCT_KINDS = [
+    "أبيض", "بلدي", "فاخر", "ممتاز", "خفيف", "كامل الدسم", "بالفراولة", "بالمانجو",
+    "بالليمون", "سادة", "محوج", "حار", "عضوي", "اقتصادي", "للأطفال", "بالنعناع",
+]
+PRODUCT_BRANDS = [
+    "الضحى", "النيل", "الأهرام", "البركة", "الواحة", "الريف", "جهينة", "دومتي",
+    "الفلاح", "السلام", "الهدى", "المراعي",
+]
+PRODUCT_SIZES = ["250 جم", "500 جم", "1 كجم", "2 كجم", "1 لتر", "2 لتر", "عبوة صغيرة", "عبوة عائلية"]
+
+CUSTOMER_NAMES = [
+    "محمد", "أحمد", "محمود", "علي", "حسن", "إبراهيم", "يوسف", "عمر", "خالد", "مصطفى",
+    "فاطمة", "مريم", "آية", "نور", "سارة", "هدى", "منى", "ياسمين", "رحاب", "إيمان",
+]
+
+# بادئة أرقام الفواتير المولدة (التسلسل هو معرف الفاتورة)
+INVOICE_PREFIX = "G"
+
+# كمية كل صنف في الفاتورة (الكميات الصغيرة أكثر تكراراً)
+QUANTITIES = (1, 1, 1, 1, 2, 2, 3, 5)
+
+
+def product_names(count, rng):
+    """أسماء منتجات فريدة من تركيب المكونات (يضاف رقم عند تجاوز عدد التركيبات)"""
+    combos = list(itertools.product(PRODUCT_NAMES, PRODUCT_KINDS, PRODUCT_BRANDS, PRODUCT_SIZES))
+    rng.shuffle(combos)
+    for i in range(count):
+        name = " ".join(combos[i % len(combos)])
+        round_number = i // len(combos)
+        yield f"{name} {round_number + 1}" if round_number else name
+
+
+def ean13(number):
+    """باركود EAN-13 للرقم (بادئة 622 ثم الرقم في 9 خانات ثم خانة التحقق)"""
+    digits = f"622{number:09d}"
+    checksum = sum(int(digit) * (3 if i % 2 else 1) for i, digit in enumerate(digits))
+    return digits + str((10 - checksum % 10) % 10)
+
+
+def zipf_weights(count, exponent):
+    """الأوزان التراكمية لتوزيع Zipf: المنتج صاحب الترتيب k وزنه 1 / k^exponent"""
+    return list(itertools.accumulate(1 / rank ** exponent for rank in range(1, count + 1)))
+
+
+class StoreGenerator:
+    """
+    مولد البيانات - يكتب مباشرة بـ executemany في معاملة واحدة كبيرة لكل جدول
+    """
+
+    def __init__(self, db_path, seed=42):
+        self.db_path = db_path
+        self.rng = random.Random(seed)
+        self.rows = 0
+
+        success, result = SchemaMigrations.migrate(db_path)
+        if not success:
+            raise RuntimeError(result)
+        # المولد يستخدم اتصالاً خاصاً به بإعدادات كتابة سريعة
+        ConnectionManager.close_all()
+
+        self.conn = sqlite3.connect(db_path, isolation_level=None)
+        self.conn.execute("PRAGMA synchronous = OFF")
+        self.conn.execute("PRAGMA cache_size = -200000")
+
+    def _next_id(self, table):
+        return self.conn.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {table}").fetchone()[0]
+
+    def _insert(self, sql, rows):
+        """إدخال الصفوف على دفعات داخل معاملة واحدة"""
+        self.conn.execute("BEGIN")
+        try:
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) == BATCH_SIZE:
+                    self.conn.executemany(sql, batch)
+                    self.rows += len(batch)
+                    batch.clear()
+            if batch:
+                self.conn.executemany(sql, batch)
+                self.rows += len(batch)
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def generate_users(self, count):
+        """
+        إضافة كاشيرين بأسماء cashier_N وكلمة مرور مساوية للاسم
+
+        Returns:
+            list: معرفات كل المستخدمين
+        """
+        first_id = self._next_id("users")
+
+        def rows():
+            for user_id in range(first_id, first_id + count):
+                username = f"cashier_{user_id}"
+                yield user_id, username, hashlib.sha256(username.encode()).hexdigest(), "worker"
+
+        self._insert("INSERT OR IGNORE INTO users (id, username, password, role) VALUES (?, ?, ?, ?)", rows())
+        return [row[0] for row in self.conn.execute("SELECT id FROM users")]
+
+    def generate_products(self, count):
+        """
+        إضافة منتجات بأسعار وكميات عشوائية
+
+        Returns:
+            list: (id, name, price) للمنتجات الجديدة
+        """
+        first_id = self._next_id("products")
+        rng = self.rng
+        products = [
+            (product_id, name, round(rng.uniform(2, 400), 2))
+            for product_id, name in zip(range(first_id, first_id + count), product_names(count, rng))
+        ]
+
+        self._insert(
+            "INSERT INTO products (id, name, price, quantity, sold, barcode) VALUES (?, ?, ?, ?, 0, ?)",
+            ((product_id, name, price, rng.randint(0, 500), ean13(product_id)) for product_id, name, price in products)
+        )
+        return products
+
+    def generate_invoices(self, products, user_ids, years, invoices_per_day, max_items, zipf, start_date=None):
+        """
+        إضافة فواتير يومية لعدد من السنوات تنتهي اليوم (أو تبدأ من start_date)
+
+        عدد الفواتير في كل يوم يتغير حول invoices_per_day، والمنتجات تختار
+        بتوزيع Zipf على ترتيب عشوائي للمنتجات حتى لا تكون الشعبية مرتبطة بالمعرف
+
+        Returns:
+            int: عدد الفواتير المضافة
+        """
+        rng = self.rng
+        days = int(years * 365)
+        if start_date is None:
+            start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days - 1)
+        else:
+            start = datetime.strptime(start_date, "%Y-%m-%d")
+
+        ranked = products[:]
+        rng.shuffle(ranked)
+        cum_weights = zipf_weights(len(ranked), zipf)
+
+        first_invoice = self._next_id("invoices")
+        first_item = self._next_id("invoice_items")
+        items = []
+        sold = {}
+
+        # أوقات ساعات العمل من 9 صباحاً حتى 11 مساءً كنصوص جاهزة
+        times = [f"{second // 3600:02d}:{second // 60 % 60:02d}:{second % 60:02d}"
+                 for second in range(9 * 3600, 23 * 3600)]
+
+        def invoice_rows():
+            # الحلقة الأساسية تستخدم rng.random مباشرة لأن choice و randrange أبطأ بكثير
+            rand = rng.random
+            total_weight = cum_weights[-1]
+            last_rank = len(ranked) - 1
+            invoice_id = first_invoice
+            item_id = first_item
+
+            for day in range(days):
+                day_prefix = (start + timedelta(days=day)).strftime("%Y-%m-%d ")
+                count = rng.randint(invoices_per_day // 2, invoices_per_day * 3 // 2)
+
+                for time_index in sorted(int(rand() * len(times)) for _ in range(count)):
+                    subtotal = 0
+                    seen = set()
+                    for _ in range(1 + int(rand() * max_items)):
+                        product_id, name, price = ranked[min(bisect_right(cum_weights, rand() * total_weight), last_rank)]
+                        if product_id in seen:
+                            continue
+                        seen.add(product_id)
+
+                        quantity = QUANTITIES[int(rand() * len(QUANTITIES))]
+                        item_total = round(price * quantity, 2)
+                        items.append((item_id, invoice_id, product_id, name, price, quantity, item_total))
+                        sold[product_id] = sold.get(product_id, 0) + quantity
+                        subtotal += item_total
+                        item_id += 1
+
+                    subtotal = round(subtotal, 2)
+                    discount = round(subtotal * 0.05, 2) if rand() < 0.1 else 0
+
+                    invoice_number = f"{INVOICE_PREFIX}{invoice_id:08d}"
+                    yield (invoice_id, CUSTOMER_NAMES[int(rand() * len(CUSTOMER_NAMES))],
+                           f"01{int(rand() * 10 ** 9):09d}", "#" + invoice_number,
+                           subtotal, discount, round(subtotal - discount, 2),
+                           user_ids[int(rand() * len(user_ids))], day_prefix + times[time_index], invoice_number)
+                    invoice_id += 1
+
+        def flush(batch):
+            # العناصر تكتب مع فواتيرها حتى لا تتراكم في الذاكرة
+            self.conn.executemany(
+                "INSERT INTO invoices (id, customer_name, customer_phone, barcode, subtotal, discount, total, "
+                "user_id, created_at, invoice_number) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", batch
+            )
+            self.conn.executemany("INSERT INTO invoice_items VALUES (?, ?, ?, ?, ?, ?, ?)", items)
+            self.rows += len(batch) + len(items)
+            batch.clear()
+            items.clear()
+
+        # فهارس الفواتير تبنى مرة واحدة بعد الإدخال بدلاً من تحديثها مع كل صف
+        indexes = self.conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL "
+            "AND tbl_name IN ('invoices', 'invoice_items')"
+        ).fetchall()
+
+        self.conn.execute("BEGIN")
+        try:
+            for (sql,) in indexes:
+                self.conn.execute("DROP INDEX " + sql.split(" ON ")[0].split()[-1])
+
+            batch = []
+            for row in invoice_rows():
+                batch.append(row)
+                if len(batch) == BATCH_SIZE:
+                    flush(batch)
+            if batch:
+                flush(batch)
+
+            for (sql,) in indexes:
+                self.conn.execute(sql)
+
+            # الكمية المباعة لكل منتج تطابق عناصر الفواتير
+            self.conn.executemany("UPDATE products SET sold = sold + ? WHERE id = ?",
+                                  ((quantity, product_id) for product_id, quantity in sold.items()))
+
+            # تسلسل بادئة المولد يبدأ بعد آخر فاتورة حتى لا يكرر InvoiceNumberService أرقامها
+            self.conn.execute(
+                "INSERT INTO invoice_sequences (prefix, next_value) VALUES (?, ?) "
+                "ON CONFLICT(prefix) DO UPDATE SET next_value = MAX(next_value, excluded.next_value)",
+                (INVOICE_PREFIX, self._next_id("invoices"))
+            )
+
+            # الفواتير أدخلت مباشرة بدون create_invoice فيعاد حساب ملخص المبيعات
+            SalesAggregates.rebuild(self.conn)
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+        return self._next_id("invoices") - first_invoice
+
+    def close(self):
+        self.conn.execute("ANALYZE")
+        self.conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="توليد بيانات تجريبية لقاعدة بيانات المتجر")
+    parser.add_argument("--db", default="data/store.db", help="مسار قاعدة البيانات")
+    parser.add_argument("--products", type=int, default=5000, help="عدد المنتجات")
+    parser.add_argument("--users", type=int, default=10, help="عدد الكاشيرين")
+    parser.add_argument("--years", type=float, default=2, help="عدد سنوات الفواتير")
+    parser.add_argument("--invoices-per-day", type=int, default=300, help="متوسط عدد الفواتير في اليوم")
+    parser.add_argument("--max-items", type=int, default=6, help="أقصى عدد أصناف في الفاتورة")
+    parser.add_argument("--zipf", type=float, default=1.1, help="أس توزيع Zipf لشعبية المنتجات")
+    parser.add_argument("--start-date", help="تاريخ أول يوم YYYY-MM-DD (افتراضياً تنتهي الفواتير اليوم)")
+    parser.add_argument("--seed", type=int, default=42, help="بذرة الأرقام العشوائية")
+    args = parser.parse_args()
+
+    if args.products <= 0 or args.max_items <= 0 or args.invoices_per_day < 0:
+        parser.error("عدد المنتجات والأصناف يجب أن يكون أكبر من صفر")
+
+    directory = os.path.dirname(args.db)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+
+    started = time.perf_counter()
+    generator = StoreGenerator(args.db, args.seed)
+    try:
+        user_ids = generator.generate_users(args.users)
+        products = generator.generate_products(args.products)
+        invoices = generator.generate_invoices(products, user_ids, args.years, args.invoices_per_day,
+                                               args.max_items, args.zipf, args.start_date)
+    except sqlite3.Error as e:
+        print(f"خطأ في توليد البيانات: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        generator.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"تم إنشاء {len(products):,} منتج و {invoices:,} فاتورة في {args.db}")
+    print(f"{generator.rows:,} صف في {elapsed:.1f} ث ({generator.rows / elapsed:,.0f} صف/ث)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,640 @@
+"""
+نقل بيانات المتجر بين ملف mysqldump بمخطط sql/sharp_db.sql وقاعدة بيانات SQLite
+
+- import: يقرأ ملف mysqldump على أجزاء (بدون تحميله كاملاً) ويحلل جمل INSERT
+  متعددة الصفوف صفاً صفاً، ثم يدخل الصفوف بدفعات executemany كبيرة في معاملة واحدة
+- export: يكتب قاعدة SQLite كملف mysqldump بنفس مخطط sql/sharp_db.sql يمكن
+  تحميله في MySQL مباشرة
+
+اختلافات المخطط:
+    invoice_items في MySQL بدون name و item_total (الاسم من المنتجات والإجمالي من السعر والكمية)
+    DECIMAL في MySQL و REAL في SQLite
+    created_at نوع timestamp في MySQL ونص YYYY-MM-DD HH:MM:SS في SQLite
+    أوقات SQLite بالتوقيت المحلي (datetime.now()) وأوقات mysqldump بتوقيت SET TIME_ZONE
+    في بداية الملف (UTC عادة) فتحول عند الإدخال والتصدير
+    أعمدة SQLite الإضافية (barcode, user_id, invoice_number) تنقل إذا وجدت في الملف
+
+الاستخدام (من مجلد المشروع):
+    python -m tools.migrate_store import sql/sharp_db.sql --db data/store.db
+    python -m tools.migrate_store export --db data/store.db --out backup.sql
+"""
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+from database.connection_manager import ConnectionManager
+from database.sales_aggregates import SalesAggregates
+from database.schema_migrations import SchemaMigrations
+
+
+# عدد الصفوف في كل دفعة executemany
+BATCH_SIZE = 50000
+
+# حجم الجزء المقروء من الملف في كل مرة
+CHUNK_SIZE = 1 << 20
+
+# أقصى حجم لجملة INSERT عند التصدير (مثل net_buffer_length في mysqldump)
+STATEMENT_SIZE = 1 << 20
+
+# الجداول المنقولة بترتيب الإدخال
+TABLES = ("users", "products", "invoices", "invoice_items")
+
+# بداية الجمل التي يحللها القارئ (باقي الجمل تتخطى)
+_STATEMENT_START = re.compile(
+    r"\s*(?:(--[^\n]*\n)|(/\*.*?\*/\s*;?)|"
+    r"(INSERT\s+(?:IGNORE\s+)?INTO\s+`?(\w+)`?\s*(?:\(([^)]*)\))?\s*VALUES\s*)|"
+    r"(CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?`?(\w+)`?)|(;))",
+    re.I | re.S
+)
+
+# جملة كاملة حتى ; خارج النصوص
+_STATEMENT_END = re.compile(r"(?:'(?:[^'\\]|\\.|'')*'|`[^`]*`|[^';`])*;", re.S)
+
+# صف كامل (...) متبوع بفاصلة أو ; ثم قيمه
+_TUPLE = re.compile(r"\s*\(((?:'(?:[^'\\]|\\.|'')*'|[^'()])*)\)\s*([,;])", re.S)
+_VALUE = re.compile(r"'(?:[^'\\]|\\.|'')*'|[^,]+", re.S)
+
+# أسماء الأعمدة في CREATE TABLE (كل سطر يبدأ باسم عمود بين `)
+_COLUMN = re.compile(r"^\s*`(\w+)`\s", re.M)
+
+# توقيت أوقات الملف (SET TIME_ZONE='+00:00' وليس استرجاع @OLD_TIME_ZONE)
+_TIME_ZONE = re.compile(r"\bSET\s+TIME_ZONE\s*=\s*'([^']*)'", re.I)
+_OFFSET = re.compile(r"([+-])(\d{1,2}):(\d{2})")
+
+# صيغة الأوقات في SQLite و MySQL
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# علامات الهروب في نصوص MySQL
+_UNESCAPE = re.compile(r"\\(.)|''", re.S)
+_ESCAPES = {"0": "\0", "b": "\b", "n": "\n", "r": "\r", "t": "\t", "Z": "\x1a"}
+_EXPORT_ESCAPES = str.maketrans({
+    "\\": "\\\\", "\0": "\\0", "\n": "\\n", "\r": "\\r", "\x1a": "\\Z", "'": "\\'", '"': '\\"',
+})
+
+
+def _unescape_match(match):
+    char = match.group(1)
+    if char is None:
+        return "'"
+    if char in "%_":
+        # \% و \_ تبقى كما هي في MySQL
+        return "\\" + char
+    return _ESCAPES.get(char, char)
+
+
+def parse_value(token):
+    """تحويل قيمة من جملة INSERT إلى قيمة Python"""
+    if token[0] == "'":
+        text = token[1:-1]
+        if "\\" in text or "''" in text:
+            text = _UNESCAPE.sub(_unescape_match, text)
+        return text
+
+    # الأعداد الصحيحة أغلب القيم في الملف
+    try:
+        return int(token)
+    except ValueError:
+        pass
+
+    token = token.strip()
+    if token == "NULL":
+        return None
+    if token[:2] in ("0x", "0X"):
+        return bytes.fromhex(token[2:])
+    return float(token)
+
+
+class DumpReader:
+    """
+    قارئ ملف mysqldump بالتدفق
+
+    events() يعيد أحداثاً بترتيب الملف:
+        ("table", name, columns)        من CREATE TABLE
+        ("rows", name, columns, rows)   صفوف جملة INSERT على دفعات (columns None إذا لم تحدد)
+        ("time_zone", value)            من SET TIME_ZONE='...' (توقيت الأوقات بعدها)
+    الذاكرة المستخدمة حجم جزء واحد من الملف تقريباً مهما كان حجم الجمل
+    """
+
+    def __init__(self, stream, chunk_size=CHUNK_SIZE, batch_size=BATCH_SIZE):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+        self.buffer = ""
+        self.position = 0
+        self.eof = False
+        self.bytes_read = 0
+
+    def _fill(self):
+        """قراءة جزء جديد (مع حذف الجزء المقروء من بداية الذاكرة)"""
+        if self.eof:
+            return False
+        chunk = self.stream.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.bytes_read += len(chunk)
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        return True
+
+    def _match(self, pattern, lookahead=None):
+        """
+        مطابقة نمط عند الموضع الحالي مع قراءة المزيد إذا لم تكتمل الجملة
+
+        lookahead: عند عدم المطابقة لا يقرأ المزيد إذا كان المتبقي في الذاكرة
+        أطول من هذا الحد (بداية الجمل قصيرة فعدم مطابقتها لا يعني أنها مقطوعة)
+        """
+        while True:
+            match = pattern.match(self.buffer, self.position)
+            # المطابقة الصحيحة تنتهي قبل نهاية الذاكرة (وإلا قد تكون مقطوعة)
+            if match and (match.end() < len(self.buffer) or self.eof):
+                return match
+            if match is None and lookahead is not None and len(self.buffer) - self.position > lookahead:
+                return None
+            if not self._fill():
+                return match
+
+    def events(self):
+        while True:
+            match = self._match(_STATEMENT_START, lookahead=4096)
+            if match is None:
+                if self.buffer[self.position:].strip():
+                    # جملة أخرى (SET أو LOCK TABLES أو DROP ...): تتخطى حتى ;
+                    end = self._match(_STATEMENT_END)
+                    if end is None:
+                        raise ValueError(f"جملة غير مكتملة في نهاية الملف: {self.buffer[self.position:][:80]}")
+                    self.position = end.end()
+                    yield from self._time_zone(end.group(0))
+                    continue
+                return
+
+            self.position = match.end()
+            if match.group(2):
+                # /*!40103 SET TIME_ZONE='+00:00' */; في بداية ملفات mysqldump
+                yield from self._time_zone(match.group(2))
+            elif match.group(3):
+                table = match.group(4)
+                columns = [name.strip(" `") for name in match.group(5).split(",")] if match.group(5) else None
+                yield from self._rows(table, columns)
+            elif match.group(6):
+                end = self._match(_STATEMENT_END)
+                if end is None:
+                    raise ValueError(f"تعريف الجدول {match.group(7)} غير مكتمل")
+                self.position = end.end()
+                yield ("table", match.group(7), _COLUMN.findall(end.group(0)))
+
+    @staticmethod
+    def _time_zone(statement):
+        time_zone = _TIME_ZONE.search(statement)
+        if time_zone:
+            yield ("time_zone", time_zone.group(1))
+
+    def _rows(self, table, columns):
+        """صفوف جملة INSERT واحدة على دفعات"""
+        rows = []
+        values = _VALUE.findall
+        while True:
+            match = self._match(_TUPLE)
+            if match is None:
+                raise ValueError(f"صف غير صحيح في بيانات الجدول {table}: {self.buffer[self.position:][:80]}")
+            self.position = match.end()
+            rows.append(tuple(map(parse_value, values(match.group(1)))))
+
+            if match.group(2) == ";":
+                yield ("rows", table, columns, rows)
+                return
+            if len(rows) >= self.batch_size:
+                yield ("rows", table, columns, rows)
+                rows = []
+
+
+def parse_time_zone(value):
+    """
+    قيمة SET TIME_ZONE في MySQL ('+03:00' أو 'SYSTEM' أو اسم منطقة مثل 'Africa/Cairo')
+
+    Returns:
+        tzinfo: المنطقة الزمنية، أو None لتوقيت الجهاز المحلي
+    """
+    if value.upper() == "SYSTEM":
+        return None
+    match = _OFFSET.fullmatch(value)
+    if match is None:
+        return ZoneInfo(value)
+    offset = timedelta(hours=int(match.group(2)), minutes=int(match.group(3)))
+    return timezone(-offset if match.group(1) == "-" else offset)
+
+
+def _to_local(value, zone):
+    """وقت من الملف بتوقيت zone إلى الوقت المحلي المخزن في SQLite"""
+    value = str(value)[:19]
+    if zone is None:
+        return value
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        # تاريخ MySQL الصفري 0000-00-00 00:00:00 لا يحول
+        return value
+    return moment.replace(tzinfo=zone).astimezone().strftime(TIME_FORMAT)
+
+
+def _converters(now, zone=None):
+    """
+    تحويل صف من مخطط MySQL إلى أعمدة جدول SQLite
+
+    Args:
+        now (str): الوقت المحلي الحالي بدلاً من created_at الفارغ
+        zone (tzinfo): توقيت أوقات الملف (None إذا كانت بالتوقيت المحلي)
+
+    Returns:
+        dict: الجدول -> (أعمدة SQLite، دالة تستقبل قاموس (اسم العمود -> الموضع) وتعيد دالة تحويل الصف)
+    """
+    def getter(index, name, default=None):
+        position = index.get(name)
+        if position is None:
+            return lambda row: default
+        return lambda row: row[position]
+
+    def users(index):
+        fields = [getter(index, name) for name in ("id", "username", "password")]
+        role = getter(index, "role", "worker")
+        return lambda row: tuple(field(row) for field in fields) + (role(row) or "worker",)
+
+    def products(index):
+        fields = [getter(index, name) for name in ("id", "name", "price", "quantity")]
+        sold = getter(index, "sold", 0)
+        barcode = getter(index, "barcode")
+        return lambda row: tuple(field(row) for field in fields) + (sold(row) or 0, barcode(row) or None)
+
+    def invoices(index):
+        fields = [getter(index, name) for name in ("id", "customer_name", "customer_phone", "barcode",
+                                                   "subtotal", "discount", "total", "user_id",
+                                                   "created_at", "invoice_number")]
+
+        def convert(row):
+            values = [field(row) for field in fields]
+            values[1] = values[1] or ""
+            values[2] = values[2] or ""
+            values[5] = values[5] or 0
+            # timestamp NULL في MySQL بينما التاريخ مطلوب في SQLite
+            values[8] = _to_local(values[8], zone) if values[8] is not None else now
+            return tuple(values)
+        return convert
+
+    def invoice_items(index):
+        fields = [getter(index, name) for name in ("id", "invoice_id", "product_id")]
+        name = getter(index, "name", "")
+        price = getter(index, "price")
+        quantity = getter(index, "quantity")
+        item_total = getter(index, "item_total")
+
+        def convert(row):
+            row_price, row_quantity, total = price(row), quantity(row), item_total(row)
+            if total is None:
+                total = round(row_price * row_quantity, 2)
+            return tuple(field(row) for field in fields) + (name(row) or "", row_price, row_quantity, total)
+        return convert
+
+    return {
+        "users": (("id", "username", "password", "role"), users),
+        "products": (("id", "name", "price", "quantity", "sold", "barcode"), products),
+        "invoices": (("id", "customer_name", "customer_phone", "barcode", "subtotal", "discount", "total",
+                      "user_id", "created_at", "invoice_number"), invoices),
+        "invoice_items": (("id", "invoice_id", "product_id", "name", "price", "quantity", "item_total"),
+                          invoice_items),
+    }
+
+
+class StoreMigrator:
+    """
+    نقل البيانات بين ملف mysqldump وقاعدة SQLite باتصال خاص بإعدادات كتابة سريعة
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.counts = {}
+
+        success, result = SchemaMigrations.migrate(db_path)
+        if not success:
+            raise RuntimeError(result)
+        ConnectionManager.close_all()
+
+        self.conn = sqlite3.connect(db_path, isolation_level=None)
+        self.conn.execute("PRAGMA synchronous = OFF")
+        self.conn.execute("PRAGMA cache_size = -200000")
+
+    @property
+    def rows(self):
+        return sum(self.counts.values())
+
+    def import_dump(self, stream, replace=False, progress=None):
+        """
+        إدخال بيانات ملف mysqldump في قاعدة SQLite (كلها أو لا شيء)
+
+        Args:
+            stream: ملف نصي مفتوح للقراءة
+            replace (bool): حذف البيانات الموجودة أولاً (وإلا يجب أن تكون القاعدة فارغة)
+            progress (callable): تستقبل (عدد الصفوف، البايتات المقروءة) بعد كل دفعة
+        """
+        conn = self.conn
+        if not replace:
+            for table in ("products", "invoices", "invoice_items"):
+                if conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone():
+                    raise ValueError(f"الجدول {table} به بيانات (استخدم --replace لاستبدالها)")
+
+        now = datetime.now().strftime(TIME_FORMAT)
+        # ملف بدون SET TIME_ZONE (mysqldump --skip-tz-utc) أوقاته بالتوقيت المحلي
+        converters = _converters(now)
+        columns_by_table = {}
+        reader = DumpReader(stream)
+
+        # الفهارس تبنى مرة واحدة بعد الإدخال بدلاً من تحديثها مع كل صف
+        indexes = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL "
+            f"AND tbl_name IN ({', '.join(repr(table) for table in TABLES)})"
+        ).fetchall()
+
+        conn.execute("BEGIN")
+        try:
+            if replace:
+                for table in ("invoice_items", "invoices", "products"):
+                    conn.execute(f"DELETE FROM {table}")
+            for (sql,) in indexes:
+                conn.execute("DROP INDEX " + sql.split(" ON ")[0].split()[-1])
+
+            # المستخدمون الافتراضيون في القاعدة الجديدة يستبدلون بمستخدمي الملف
+            replaced_users = False
+
+            for event in reader.events():
+                if event[0] == "table":
+                    columns_by_table[event[1]] = event[2]
+                    continue
+                if event[0] == "time_zone":
+                    converters = _converters(now, parse_time_zone(event[1]))
+                    continue
+
+                _, table, columns, rows = event
+                if table not in converters:
+                    self.counts.setdefault(f"({table})", 0)
+                    continue
+
+                columns = columns or columns_by_table.get(table)
+                if not columns:
+                    raise ValueError(f"أعمدة الجدول {table} غير معروفة (لا يوجد CREATE TABLE قبل البيانات)")
+
+                target_columns, make_converter = converters[table]
+                convert = make_converter({name: position for position, name in enumerate(columns)})
+
+                if table == "users" and not replaced_users:
+                    conn.execute("DELETE FROM users")
+                    replaced_users = True
+
+                conn.executemany(
+                    f"INSERT INTO {table} ({', '.join(target_columns)}) "
+                    f"VALUES ({', '.join('?' * len(target_columns))})",
+                    map(convert, rows)
+                )
+                self.counts[table] = self.counts.get(table, 0) + len(rows)
+                if progress is not None:
+                    progress(self.rows, reader.bytes_read)
+
+            # أسماء عناصر الفواتير من المنتجات (ليست في مخطط MySQL)
+            conn.execute("""
+                UPDATE invoice_items
+                SET name = COALESCE((SELECT name FROM products WHERE products.id = invoice_items.product_id), '')
+                WHERE name = ''
+            """)
+
+            for (sql,) in indexes:
+                conn.execute(sql)
+
+            # الفواتير أدخلت مباشرة بدون create_invoice فيعاد حساب ملخص المبيعات
+            SalesAggregates.rebuild(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def export_dump(self, stream, statement_size=STATEMENT_SIZE, progress=None):
+        """
+        كتابة بيانات SQLite كملف mysqldump بمخطط sql/sharp_db.sql
+
+        Args:
+            stream: ملف نصي مفتوح للكتابة
+            statement_size (int): أقصى حجم تقريبي لجملة INSERT الواحدة
+            progress (callable): تستقبل عدد الصفوف بعد كل جملة
+        """
+        stream.write(_EXPORT_HEADER)
+
+        # ترتيب mysqldump (أبجدي) مع تعطيل فحص المفاتيح الأجنبية في الترويسة
+        for table in sorted(EXPORT_TABLES):
+            create, query, formats = EXPORT_TABLES[table]
+            stream.write(f"\n--\n-- Table structure for table `{table}`\n--\n\n")
+            stream.write(f"DROP TABLE IF EXISTS `{table}`;\n{create};\n")
+            stream.write(f"\n--\n-- Dumping data for table `{table}`\n--\n\n")
+            stream.write(f"LOCK TABLES `{table}` WRITE;\n")
+            stream.write(f"/*!40000 ALTER TABLE `{table}` DISABLE KEYS */;\n")
+
+            prefix = f"INSERT INTO `{table}` VALUES "
+            statement = []
+            size = 0
+            cursor = self.conn.execute(query)
+            while True:
+                rows = cursor.fetchmany(BATCH_SIZE)
+                if not rows:
+                    break
+                for row in rows:
+                    values = "(" + ",".join(format_value(value) for format_value, value in zip(formats, row)) + ")"
+                    statement.append(values)
+                    size += len(values) + 1
+                    if size >= statement_size:
+                        stream.write(prefix + ",".join(statement) + ";\n")
+                        statement = []
+                        size = 0
+                self.counts[table] = self.counts.get(table, 0) + len(rows)
+                if progress is not None:
+                    progress(self.rows, None)
+            if statement:
+                stream.write(prefix + ",".join(statement) + ";\n")
+
+            stream.write(f"/*!40000 ALTER TABLE `{table}` ENABLE KEYS */;\nUNLOCK TABLES;\n")
+
+        stream.write(_EXPORT_FOOTER.format(date=datetime.now().strftime(TIME_FORMAT)))
+
+    def close(self):
+        self.conn.execute("ANALYZE")
+        self.conn.close()
+
+
+def _sql_text(value):
+    if value is None:
+        return "NULL"
+    return "'" + str(value).translate(_EXPORT_ESCAPES) + "'"
+
+
+def _sql_utc(value):
+    """وقت محلي من SQLite إلى UTC كما يتوقعه SET TIME_ZONE='+00:00' في رأس الملف"""
+    if value is None:
+        return "NULL"
+    try:
+        moment = datetime.fromisoformat(str(value)[:19])
+    except ValueError:
+        return _sql_text(value)
+    return "'" + moment.astimezone(timezone.utc).strftime(TIME_FORMAT) + "'"
+
+
+def _sql_int(value):
+    return "NULL" if value is None else str(int(value))
+
+
+def _sql_decimal(value):
+    return "NULL" if value is None else f"{value:.2f}"
+
+
+# مخطط sql/sharp_db.sql: الجدول -> (CREATE TABLE، الاستعلام من SQLite، تنسيق كل عمود)
+EXPORT_TABLES = {
+    "invoice_items": ("""CREATE TABLE `invoice_items` (
+  `id` int NOT NULL AUTO_INCREMENT,
+  `invoice_id` int NOT NULL,
+  `product_id` int NOT NULL,
+  `quantity` int NOT NULL,
+  `price` decimal(10,2) NOT NULL,
+  PRIMARY KEY (`id`),
+  KEY `invoice_id` (`invoice_id`),
+  KEY `product_id` (`product_id`),
+  CONSTRAINT `invoice_items_ibfk_1` FOREIGN KEY (`invoice_id`) REFERENCES `invoices` (`id`),
+  CONSTRAINT `invoice_items_ibfk_2` FOREIGN KEY (`product_id`) REFERENCES `products` (`id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci""",
+                      "SELECT id, invoice_id, product_id, quantity, price FROM invoice_items ORDER BY id",
+                      (_sql_int, _sql_int, _sql_int, _sql_int, _sql_decimal)),
+    "invoices": ("""CREATE TABLE `invoices` (
+  `id` int NOT NULL AUTO_INCREMENT,
+  `subtotal` decimal(10,2) NOT NULL,
+  `discount` decimal(10,2) DEFAULT '0.00',
+  `total` decimal(10,2) NOT NULL,
+  `created_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP,
+  `customer_name` varchar(100) DEFAULT '',
+  `customer_phone` varchar(20) DEFAULT '',
+  PRIMARY KEY (`id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci""",
+                 "SELECT id, subtotal, discount, total, created_at, customer_name, customer_phone "
+                 "FROM invoices ORDER BY id",
+                 (_sql_int, _sql_decimal, _sql_decimal, _sql_decimal, _sql_utc, _sql_text, _sql_text)),
+    "products": ("""CREATE TABLE `products` (
+  `id` int NOT NULL AUTO_INCREMENT,
+  `name` varchar(100) NOT NULL,
+  `price` decimal(10,2) NOT NULL,
+  `quantity` int NOT NULL DEFAULT '0',
+  `sold` int NOT NULL DEFAULT '0',
+  `created_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP,
+  `updated_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (`id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci""",
+                 "SELECT id, name, price, quantity, sold, NULL, NULL FROM products ORDER BY id",
+                 (_sql_int, _sql_text, _sql_decimal, _sql_int, _sql_int, _sql_text, _sql_text)),
+    "users": ("""CREATE TABLE `users` (
+  `id` int NOT NULL AUTO_INCREMENT,
+  `username` varchar(50) NOT NULL,
+  `password` varchar(255) NOT NULL,
+  `role` varchar(20) DEFAULT 'user',
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `username` (`username`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci""",
+              "SELECT id, username, password, role FROM users ORDER BY id",
+              (_sql_int, _sql_text, _sql_text, _sql_text)),
+}
+
+_EXPORT_HEADER = """-- MySQL dump (tools/migrate_store.py)
+--
+-- Database: sharp_db
+-- ------------------------------------------------------
+
+/*!40101 SET @OLD_CHARACTER_SET_CLIENT=@@CHARACTER_SET_CLIENT */;
+/*!40101 SET @OLD_CHARACTER_SET_RESULTS=@@CHARACTER_SET_RESULTS */;
+/*!40101 SET @OLD_COLLATION_CONNECTION=@@COLLATION_CONNECTION */;
+/*!50503 SET NAMES utf8mb4 */;
+/*!40103 SET @OLD_TIME_ZONE=@@TIME_ZONE */;
+/*!40103 SET TIME_ZONE='+00:00' */;
+/*!40014 SET @OLD_UNIQUE_CHECKS=@@UNIQUE_CHECKS, UNIQUE_CHECKS=0 */;
+/*!40014 SET @OLD_FOREIGN_KEY_CHECKS=@@FOREIGN_KEY_CHECKS, FOREIGN_KEY_CHECKS=0 */;
+/*!40101 SET @OLD_SQL_MODE=@@SQL_MODE, SQL_MODE='NO_AUTO_VALUE_ON_ZERO' */;
+/*!40111 SET @OLD_SQL_NOTES=@@SQL_NOTES, SQL_NOTES=0 */;
+"""
+
+_EXPORT_FOOTER = """/*!40103 SET TIME_ZONE=@OLD_TIME_ZONE */;
+
+/*!40101 SET SQL_MODE=@OLD_SQL_MODE */;
+/*!40014 SET FOREIGN_KEY_CHECKS=@OLD_FOREIGN_KEY_CHECKS */;
+/*!40014 SET UNIQUE_CHECKS=@OLD_UNIQUE_CHECKS */;
+/*!40101 SET CHARACTER_SET_CLIENT=@OLD_CHARACTER_SET_CLIENT */;
+/*!40101 SET CHARACTER_SET_RESULTS=@OLD_CHARACTER_SET_RESULTS */;
+/*!40101 SET COLLATION_CONNECTION=@OLD_COLLATION_CONNECTION */;
+/*!40111 SET SQL_NOTES=@OLD_SQL_NOTES */;
+
+-- Dump completed on {date}
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="نقل بيانات المتجر بين ملف mysqldump وقاعدة SQLite")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser("import", help="إدخال ملف mysqldump في قاعدة SQLite")
+    import_parser.add_argument("dump", help="ملف mysqldump (مثل sql/sharp_db.sql)")
+    import_parser.add_argument("--db", default="data/store.db", help="مسار قاعدة البيانات")
+    import_parser.add_argument("--replace", action="store_true", help="حذف المنتجات والفواتير الموجودة أولاً")
+
+    export_parser = commands.add_parser("export", help="كتابة قاعدة SQLite كملف mysqldump")
+    export_parser.add_argument("--db", default="data/store.db", help="مسار قاعدة البيانات")
+    export_parser.add_argument("--out", required=True, help="ملف mysqldump الناتج")
+    export_parser.add_argument("--statement-size", type=int, default=STATEMENT_SIZE,
+                               help="أقصى حجم لجملة INSERT الواحدة بالبايت")
+    args = parser.parse_args()
+
+    if args.command == "export" and not os.path.exists(args.db):
+        parser.error(f"قاعدة البيانات {args.db} غير موجودة")
+
+    directory = os.path.dirname(args.db)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+
+    started = time.perf_counter()
+    last_report = [started]
+
+    def progress(rows, bytes_read):
+        # سطر تقدم كل ثانيتين تقريباً
+        now = time.perf_counter()
+        if now - last_report[0] < 2:
+            return
+        last_report[0] = now
+        read = f" - {bytes_read / 1048576:,.0f} ميجابايت" if bytes_read is not None else ""
+        print(f"  {rows:,} صف ({rows / (now - started):,.0f} صف/ث){read}", file=sys.stderr, flush=True)
+
+    migrator = StoreMigrator(args.db)
+    try:
+        if args.command == "import":
+            with open(args.dump, encoding="utf-8", errors="surrogateescape") as stream:
+                migrator.import_dump(stream, args.replace, progress)
+        else:
+            temporary = f"{args.out}.tmp"
+            with open(temporary, "w", encoding="utf-8") as stream:
+                migrator.export_dump(stream, args.statement_size, progress)
+            os.replace(temporary, args.out)
+    except (sqlite3.Error, ValueError, OSError) as e:
+        print(f"خطأ في نقل البيانات: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        migrator.close()
+
+    elapsed = time.perf_counter() - started
+    for table, count in migrator.counts.items():
+        note = " (تم التخطي)" if table.startswith("(") else ""
+        print(f"  {table:<16} {count:>12,}{note}")
+    print(f"{migrator.rows:,} صف في {elapsed:.1f} ث ({migrator.rows / elapsed:,.0f} صف/ث)")
+
+
+if __name__ == "__main__":
+    main()
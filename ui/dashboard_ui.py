@@ -1,14 +1,32 @@
+import os
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog, filedialog
 from models.product_model import ProductModel
+from models.product_catalog import ProductCatalog
 from models.invoice_model import InvoiceModel
 from models.user_model import UserModel
-import time
+from services.cart_service import Cart
+from services.checkout_service import CheckoutService
+from services.parked_cart_service import ParkedCartService
+from services.report_service import ReportService
+from services.invoice_import_service import InvoiceImportService
+from services.print_spooler import PrintSpooler
+from ui.virtual_tree import VirtualTree, PAGE_SIZE
+from ui.task_runner import TaskRunner, BusySpinner
+from ui.invoice_viewer import InvoiceViewer
 from datetime import datetime
-import random
-import string
-import os
-import re
+
+# مهلة انتظار توقف الكتابة قبل تنفيذ البحث (بالمللي ثانية)
+SEARCH_DEBOUNCE_MS = 150
+
+# أقصى عدد لنتائج البحث المعروضة (الأكثر صلة أولاً)
+SEARCH_RESULTS_LIMIT = 500
+
+# مجلد نسخ الإيصالات المحفوظة بعد كل عملية بيع
+RECEIPTS_DIR = "receipts"
+
+# ملف جهاز الطابعة الحرارية (مثل /dev/usb/lp0)، بدونه تحفظ الإيصالات المطبوعة كملفات
+PRINTER_DEVICE = os.environ.get("STORE_PRINTER")
 
 class Dashboard:
     def __init__(self, root, user, login_window):
@@ -16,6 +34,21 @@ class Dashboard:
         self.user = user
         self.login_window = login_window
         
+        # أوامر البحث المؤجلة حسب المفتاح
+        self.debounce_jobs = {}
+        
+        # عمليات قاعدة البيانات تنفذ في الخلفية ونتائجها تعرض على خيط الواجهة
+        self.tasks = TaskRunner(self.root)
+        
+        # حفظ وطباعة الإيصالات في خيط الخلفية (الأخطاء النهائية تعرض على خيط الواجهة)
+        self.spooler = PrintSpooler(
+            RECEIPTS_DIR, PRINTER_DEVICE,
+            on_error=lambda job, error: self.tasks.call_in_ui(self.on_print_failed, job, error)
+        )
+        
+        # نافذة واحدة لعرض كل الفواتير مع حفظ آخر الفواتير المعروضة
+        self.invoice_viewer = InvoiceViewer(self.root, self.spooler, self.create_button)
+        
         # ضبط عنوان النافذة الرئيسية
         self.root.title(f"نظام المبيعات - محل البركة - {user['username']} ({user['role']})")
         
@@ -57,6 +90,8 @@ class Dashboard:
         manage_menu.add_command(label="التقارير", command=lambda: self.notebook.select(2))
         if user['role'] == 'admin':
             manage_menu.add_command(label="إدارة المستخدمين", command=lambda: self.notebook.select(3))
+            manage_menu.add_separator()
+            manage_menu.add_command(label="استيراد ملفات الفواتير القديمة", command=self.import_legacy_invoices)
         
         # قائمة المساعدة
         help_menu = tk.Menu(self.menu_bar, tearoff=0)
@@ -100,13 +135,29 @@ class Dashboard:
         user_label = ttk.Label(status_frame, text=f"المستخدم: {user['username']} | الصلاحية: {'مدير' if user['role'] == 'admin' else 'موظف'}")
         user_label.pack(side="left")
         
+        # مؤشر انتظار عمليات الخلفية
+        self.busy_label = ttk.Label(status_frame, text="")
+        self.busy_label.pack(side="left", padx=20)
+        BusySpinner(self.busy_label, self.tasks)
+        
+        # عدد الإيصالات المنتظرة في طابور الطباعة
+        self.print_label = ttk.Label(status_frame, text="")
+        self.print_label.pack(side="left", padx=20)
+        self.update_print_status()
+        
         # إضافة عرض للتاريخ والوقت في شريط الحالة
         self.datetime_label = ttk.Label(status_frame, text="")
         self.datetime_label.pack(side="right")
         self.update_datetime(self.datetime_label)
         
-        # قائمة المنتجات المضافة للفاتورة
-        self.cart_items = []
+        # سلة الفاتورة الحالية (كل تغيير يعدل صفه فقط في جدول السلة)
+        self.cart = Cart()
+        self.cart.subscribe(self.on_cart_changed)
+        
+        # تحديث صفوف المنتجات المتغيرة فقط بدلاً من إعادة تحميل الجداول
+        # (الأحداث تصل من خيوط العمل فتنقل لخيط الواجهة)
+        self.product_listener = lambda event, product: self.tasks.call_in_ui(self.on_product_changed, event, product)
+        ProductCatalog.subscribe(self.product_listener)
         
         # تطبيق ستايل موحد لكل النوافذ
         self.apply_style()
@@ -138,6 +189,15 @@ class Dashboard:
         label.config(text=f"التاريخ: {current_time}")
         self.root.after(1000, lambda: self.update_datetime(label))
 
+    def update_print_status(self):
+        # تحديث عدد الإيصالات المنتظرة كل نصف ثانية
+        depth = self.spooler.depth
+        self.print_label.config(text=f"في انتظار الطباعة: {depth}" if depth else "")
+        self.root.after(500, self.update_print_status)
+    
+    def on_print_failed(self, job, error):
+        messagebox.showerror("خطأ", f"فشل طباعة الفاتورة رقم {job.number}: {str(error)}")
+    
     def show_about(self):
         # عرض معلومات حول البرنامج
         about_text = """
@@ -150,6 +210,18 @@ class Dashboard:
         """
         messagebox.showinfo("حول البرنامج", about_text)
 
+    def debounce(self, key, callback, delay=SEARCH_DEBOUNCE_MS):
+        # تأجيل التنفيذ حتى يتوقف المستخدم عن الكتابة (يلغي الطلب السابق بنفس المفتاح)
+        job = self.debounce_jobs.pop(key, None)
+        if job is not None:
+            self.root.after_cancel(job)
+        
+        def run():
+            self.debounce_jobs.pop(key, None)
+            callback()
+        
+        self.debounce_jobs[key] = self.root.after(delay, run)
+    
     def create_button(self, parent, text, command, width=15):
         # إنشاء زر مع تأثيرات
         btn = ttk.Button(parent, text=text, command=command, width=width)
@@ -176,7 +248,7 @@ class Dashboard:
             self.create_button(buttons_frame, "تعديل منتج", self.edit_product).pack(side="right", padx=5)
             self.create_button(buttons_frame, "حذف منتج", self.delete_product).pack(side="right", padx=5)
         
-        self.create_button(buttons_frame, "تحديث", self.load_products).pack(side="left", padx=5)
+        self.create_button(buttons_frame, "تحديث", self.refresh_products).pack(side="left", padx=5)
         
         # إطار البحث
         search_frame = ttk.Frame(self.products_tab)
@@ -184,7 +256,7 @@ class Dashboard:
         
         ttk.Label(search_frame, text="بحث:").pack(side="right", padx=5)
         self.search_var = tk.StringVar()
-        self.search_var.trace("w", lambda name, index, mode: self.filter_products())
+        self.search_var.trace("w", lambda name, index, mode: self.debounce("products_search", self.filter_products))
         ttk.Entry(search_frame, textvariable=self.search_var, width=40).pack(side="right", padx=5)
         
         # إنشاء الجدول بالترتيب المطلوب (من اليمين لليسار)
@@ -209,7 +281,12 @@ class Dashboard:
         
         # إضافة شريط التمرير
         scrollbar = ttk.Scrollbar(self.products_tab, orient="vertical", command=self.products_tree.yview)
-        self.products_tree.configure(yscrollcommand=scrollbar.set)
+        
+        # إضافة الصفوف على دفعات عند التمرير بدلاً من كل المنتجات مرة واحدة
+        self.products_view = VirtualTree(self.products_tree, scrollbar, self.product_row)
+        
+        # معرفات المنتجات في نتائج البحث المعروضة (لمعرفة المنتج الذي دخل النتائج بعد تغيره)
+        self.products_result_ids = set()
         
         # وضع العناصر
         scrollbar.pack(side="left", fill="y")
@@ -218,54 +295,110 @@ class Dashboard:
         # تحميل المنتجات
         self.load_products()
     
-    def load_products(self):
-        # مسح البيانات القديمة
-        for item in self.products_tree.get_children():
-            self.products_tree.delete(item)
+    def product_row_values(self, product):
+        # حساب إجمالي السعر والربح
+        total_price = product["quantity"] * product["price"]
+        profit = product.get("sold", 0) * product["price"]
+        
+        return (
+            product["name"],
+            product["quantity"],
+            f"{product['price']:.2f}",
+            f"{total_price:.2f}",
+            product.get("sold", 0),
+            f"{profit:.2f}"
+        )
+    
+    def product_row(self, product):
+        # قراءة المنتج من الذاكرة المؤقتة وقت عرضه حتى تظهر آخر التعديلات
+        success, product = ProductCatalog.get_product(product["id"])
+        if not success:
+            return None
         
-        # تحميل المنتجات
-        success, products = ProductModel.get_all_products()
-        if success:
-            for product in products:
-                # حساب إجمالي السعر والربح
-                total_price = product["quantity"] * product["price"]
-                profit = product.get("sold", 0) * product["price"]
-                
-                self.products_tree.insert("", "end", values=(
-                    product["name"],
-                    product["quantity"],
-                    f"{product['price']:.2f}",
-                    f"{total_price:.2f}",
-                    product.get("sold", 0),
-                    f"{profit:.2f}"
-                ), tags=('product', str(product["id"])))  # نضيف معرف المنتج كوسم
-        else:
-            messagebox.showerror("خطأ", "فشل في تحميل المنتجات")
+        # معرف المنتج هو معرف الصف حتى يمكن تحديثه وحده لاحقاً
+        iid = str(product["id"])
+        return iid, self.product_row_values(product), ('product', iid)  # نضيف معرف المنتج كوسم
+    
+    def load_products(self):
+        self.render_products(self.search_var.get())
     
     def filter_products(self):
-        search_term = self.search_var.get().lower()
+        self.render_products(self.search_var.get())
+    
+    def render_products(self, search_term="", keep_position=False):
+        def show(result):
+            success, products = result
+            if success:
+                self.products_result_ids = {product["id"] for product in products}
+                if keep_position:
+                    self.products_view.refresh(products)
+                else:
+                    # تعرض الصفحة الأولى فقط والباقي عند التمرير
+                    self.products_view.set_source(products)
+            else:
+                messagebox.showerror("خطأ", "فشل في تحميل المنتجات")
         
-        # مسح البيانات القديمة
-        for item in self.products_tree.get_children():
-            self.products_tree.delete(item)
+        # البحث في فهرس الذاكرة المؤقتة (النتائج مرتبة حسب الصلة)، وأول مرة تحمل
+        # المنتجات من قاعدة البيانات، لذلك ينفذ في الخلفية وتتجاهل نتائج البحث الأقدم
+        self.tasks.submit("products_search", ProductCatalog.search, search_term,
+                          limit=SEARCH_RESULTS_LIMIT if search_term.strip() else None, on_done=show)
+    
+    def refresh_products(self):
+        def reloaded(result):
+            success, message = result
+            if not success:
+                messagebox.showerror("خطأ", f"فشل في تحميل المنتجات: {message}")
+                return
+            
+            self.load_products()
+            self.load_sales_products()
         
-        # تحميل المنتجات المفلترة
-        success, products = ProductModel.get_all_products()
-        if success:
-            for product in products:
-                if search_term in product["name"].lower():
-                    # حساب إجمالي السعر والربح
-                    total_price = product["quantity"] * product["price"]
-                    profit = product.get("sold", 0) * product["price"]
-                    
-                    self.products_tree.insert("", "end", values=(
-                        product["name"],
-                        product["quantity"],
-                        f"{product['price']:.2f}",
-                        f"{total_price:.2f}",
-                        product.get("sold", 0),
-                        f"{profit:.2f}"
-                    ), tags=('product', str(product["id"])))
+        # إعادة تحميل المنتجات من قاعدة البيانات (لتغييرات من أجهزة أخرى)
+        self.tasks.submit("products_reload", ProductCatalog.load, force=True, on_done=reloaded)
+    
+    def on_product_changed(self, event, product):
+        """تحديث صف المنتج المتغير فقط في جدولي المنتجات والمبيعات"""
+        # جدول المنتجات
+        visible = event != "removed" and ProductCatalog.matches(product, self.search_var.get())
+        if not self.patch_tree_row(self.products_tree, self.products_result_ids, product["id"], visible,
+                                   self.product_row_values(product) if visible else None):
+            self.debounce("products_refresh",
+                          lambda: self.render_products(self.search_var.get(), keep_position=True))
+        
+        # جدول المبيعات (المنتجات المتاحة فقط)
+        visible = (event != "removed" and product["quantity"] > 0
+                   and ProductCatalog.matches(product, self.sales_search_var.get()))
+        if not self.patch_tree_row(self.sales_products_tree, self.sales_result_ids, product["id"], visible,
+                                   self.sales_product_row_values(product) if visible else None):
+            self.debounce("sales_refresh",
+                          lambda: self.render_sales_products(self.sales_search_var.get(), keep_position=True))
+    
+    def patch_tree_row(self, tree, result_ids, product_id, visible, values):
+        """
+        تحديث صف منتج في جدول نتائج بحث بعد تغيره
+        
+        Args:
+            tree (ttk.Treeview): الجدول
+            result_ids (set): معرفات المنتجات في نتائج البحث المعروضة
+            product_id (int): معرف المنتج
+            visible (bool): هل يظهر المنتج في نتائج البحث الحالية بعد تغيره
+            values (tuple): قيم الصف
+        
+        Returns:
+            bool: False إذا دخل المنتج نتائج البحث ويجب إعادة البحث حتى يظهر في
+                مكانه من ترتيب النتائج والصفحات (لا يضاف في آخر الجدول)
+        """
+        iid = str(product_id)
+        if not visible:
+            result_ids.discard(product_id)
+            if tree.exists(iid):
+                tree.delete(iid)
+        elif product_id not in result_ids:
+            return False
+        elif tree.exists(iid):
+            tree.item(iid, values=values)
+        # منتج في النتائج لم يعرض صفه بعد يضاف عند التمرير إليه
+        return True
     
     def add_product(self):
         if self.user['role'] != 'admin':
@@ -278,7 +411,7 @@ class Dashboard:
         
         # حجم مناسب للنافذة
         window_width = 500
-        window_height = 300
+        window_height = 350
         
         # توسيط النافذة
         screen_width = self.root.winfo_screenwidth()
@@ -305,6 +438,10 @@ class Dashboard:
         quantity_var = tk.IntVar()
         ttk.Entry(add_window, textvariable=quantity_var, width=30).grid(row=2, column=1, padx=10, pady=10)
         
+        ttk.Label(add_window, text="الباركود:").grid(row=3, column=0, padx=10, pady=10, sticky="e")
+        barcode_var = tk.StringVar()
+        ttk.Entry(add_window, textvariable=barcode_var, width=30).grid(row=3, column=1, padx=10, pady=10)
+        
         # زر الإضافة
         def save_product():
             try:
@@ -324,18 +461,21 @@ class Dashboard:
                     messagebox.showerror("خطأ", "الكمية لا يمكن أن تكون سالبة")
                     return
                 
-                success, message = ProductModel.add_product(name, price, quantity)
-                if success:
-                    messagebox.showinfo("نجاح", "تمت إضافة المنتج بنجاح")
-                    add_window.destroy()
-                    self.load_products()
-                else:
-                    messagebox.showerror("خطأ", f"فشل إضافة المنتج: {message}")
+                def saved(result):
+                    success, message = result
+                    if success:
+                        messagebox.showinfo("نجاح", "تمت إضافة المنتج بنجاح")
+                        add_window.destroy()
+                    else:
+                        messagebox.showerror("خطأ", f"فشل إضافة المنتج: {message}")
+                
+                self.tasks.submit(None, ProductModel.add_product, name, price, quantity,
+                                  barcode_var.get(), on_done=saved)
             
             except ValueError:
                 messagebox.showerror("خطأ", "تأكد من إدخال قيم صحيحة للسعر والكمية")
         
-        self.create_button(add_window, "حفظ", save_product).grid(row=3, column=1, padx=10, pady=20)
+        self.create_button(add_window, "حفظ", save_product).grid(row=4, column=1, padx=10, pady=20)
     
     def edit_product(self):
         if self.user['role'] != 'admin':
@@ -355,8 +495,8 @@ class Dashboard:
             
         product_id = int(item_tags[1])
         
-        # الحصول على بيانات المنتج
-        success, product = ProductModel.get_product(product_id)
+        # الحصول على بيانات المنتج من الذاكرة المؤقتة
+        success, product = ProductCatalog.get_product(product_id)
         
         if not success or not product:
             messagebox.showerror("خطأ", "فشل في الحصول على بيانات المنتج")
@@ -368,7 +508,7 @@ class Dashboard:
         
         # حجم مناسب للنافذة
         window_width = 500
-        window_height = 300
+        window_height = 350
         
         # توسيط النافذة
         screen_width = self.root.winfo_screenwidth()
@@ -395,6 +535,10 @@ class Dashboard:
         quantity_var = tk.IntVar(value=product["quantity"])
         ttk.Entry(edit_window, textvariable=quantity_var, width=30).grid(row=2, column=1, padx=10, pady=10)
         
+        ttk.Label(edit_window, text="الباركود:").grid(row=3, column=0, padx=10, pady=10, sticky="e")
+        barcode_var = tk.StringVar(value=product.get("barcode") or "")
+        ttk.Entry(edit_window, textvariable=barcode_var, width=30).grid(row=3, column=1, padx=10, pady=10)
+        
         # زر الحفظ
         def save_changes():
             try:
@@ -414,18 +558,21 @@ class Dashboard:
                     messagebox.showerror("خطأ", "الكمية لا يمكن أن تكون سالبة")
                     return
                 
-                success, message = ProductModel.update_product(product_id, name, price, quantity)
-                if success:
-                    messagebox.showinfo("نجاح", "تم تحديث المنتج بنجاح")
-                    edit_window.destroy()
-                    self.load_products()
-                else:
-                    messagebox.showerror("خطأ", f"فشل تحديث المنتج: {message}")
+                def saved(result):
+                    success, message = result
+                    if success:
+                        messagebox.showinfo("نجاح", "تم تحديث المنتج بنجاح")
+                        edit_window.destroy()
+                    else:
+                        messagebox.showerror("خطأ", f"فشل تحديث المنتج: {message}")
+                
+                self.tasks.submit(None, ProductModel.update_product, product_id, name, price, quantity,
+                                  barcode_var.get(), on_done=saved)
             
             except ValueError:
                 messagebox.showerror("خطأ", "تأكد من إدخال قيم صحيحة للسعر والكمية")
         
-        self.create_button(edit_window, "حفظ التغييرات", save_changes).grid(row=3, column=1, padx=10, pady=20)
+        self.create_button(edit_window, "حفظ التغييرات", save_changes).grid(row=4, column=1, padx=10, pady=20)
     
     def delete_product(self):
         if self.user['role'] != 'admin':
@@ -448,12 +595,14 @@ class Dashboard:
         
         # تأكيد الحذف
         if messagebox.askyesno("تأكيد الحذف", f"هل أنت متأكد من حذف المنتج '{product_name}'؟"):
-            success, message = ProductModel.delete_product(product_id)
-            if success:
-                messagebox.showinfo("نجاح", "تم حذف المنتج بنجاح")
-                self.load_products()
-            else:
-                messagebox.showerror("خطأ", f"فشل حذف المنتج: {message}")
+            def deleted(result):
+                success, message = result
+                if success:
+                    messagebox.showinfo("نجاح", "تم حذف المنتج بنجاح")
+                else:
+                    messagebox.showerror("خطأ", f"فشل حذف المنتج: {message}")
+            
+            self.tasks.submit(None, ProductModel.delete_product, product_id, on_done=deleted)
     
     def setup_sales_tab(self):
         # قسم الصفحة إلى جزأين
@@ -464,13 +613,25 @@ class Dashboard:
         right_frame = ttk.LabelFrame(paned, text="المنتجات المتاحة")
         paned.add(right_frame, weight=60)
         
+        # إطار مسح الباركود (الماسح يكتب الرمز ثم Enter)
+        scan_frame = ttk.Frame(right_frame)
+        scan_frame.pack(fill="x", padx=5, pady=5)
+        
+        ttk.Label(scan_frame, text="الباركود:").pack(side="right", padx=5)
+        self.scan_var = tk.StringVar()
+        self.scan_entry = ttk.Entry(scan_frame, textvariable=self.scan_var, width=25)
+        self.scan_entry.pack(side="right", padx=5)
+        self.scan_entry.bind("<Return>", lambda event: self.scan_barcode())
+        self.scan_status = ttk.Label(scan_frame, text="")
+        self.scan_status.pack(side="right", padx=5)
+        
         # إطار البحث
         search_frame = ttk.Frame(right_frame)
         search_frame.pack(fill="x", padx=5, pady=5)
         
         ttk.Label(search_frame, text="بحث:").pack(side="right", padx=5)
         self.sales_search_var = tk.StringVar()
-        self.sales_search_var.trace("w", lambda name, index, mode: self.filter_sales_products())
+        self.sales_search_var.trace("w", lambda name, index, mode: self.debounce("sales_search", self.filter_sales_products))
         ttk.Entry(search_frame, textvariable=self.sales_search_var, width=25).pack(side="right", padx=5)
         
         # جدول المنتجات
@@ -489,7 +650,8 @@ class Dashboard:
         
         # شريط التمرير
         scrollbar = ttk.Scrollbar(right_frame, orient="vertical", command=self.sales_products_tree.yview)
-        self.sales_products_tree.configure(yscrollcommand=scrollbar.set)
+        self.sales_products_view = VirtualTree(self.sales_products_tree, scrollbar, self.sales_product_row)
+        self.sales_result_ids = set()
         
         scrollbar.pack(side="left", fill="y")
         self.sales_products_tree.pack(side="right", fill="both", expand=True, padx=5, pady=5)
@@ -537,6 +699,9 @@ class Dashboard:
         # حذف منتج من السلة
         self.create_button(actions_frame, "حذف من السلة", self.remove_from_cart).pack(side="right", padx=5)
         
+        # تعليق السلة لخدمة العميل التالي
+        self.create_button(actions_frame, "تعليق السلة", self.park_cart).pack(side="left", padx=5)
+        
         # إطار الخصم والإجمالي
         totals_frame = ttk.Frame(left_frame)
         totals_frame.pack(fill="x", padx=5, pady=5)
@@ -551,153 +716,329 @@ class Dashboard:
         self.total_var = tk.StringVar(value="0.00")
         ttk.Label(totals_frame, textvariable=self.total_var, font=("Arial", 12, "bold")).grid(row=1, column=0, padx=5, pady=5, sticky="e")
         
+        # السلال المعلقة من كل الأجهزة
+        parked_frame = ttk.LabelFrame(left_frame, text="السلال المعلقة")
+        parked_frame.pack(fill="x", padx=5, pady=5)
+        
+        self.parked_carts = []
+        self.parked_var = tk.StringVar()
+        self.parked_combo = ttk.Combobox(parked_frame, textvariable=self.parked_var, state="readonly",
+                                         postcommand=self.load_parked_carts)
+        self.parked_combo.pack(side="right", fill="x", expand=True, padx=5, pady=5)
+        self.create_button(parked_frame, "استئناف", self.resume_parked_cart).pack(side="left", padx=5)
+        self.create_button(parked_frame, "حذف", self.delete_parked_cart).pack(side="left", padx=5)
+        
         # زر إتمام البيع
         self.create_button(left_frame, "إتمام البيع وطباعة الفاتورة", self.complete_sale, width=30).pack(fill="x", padx=5, pady=10)
         
         # تحميل المنتجات
         self.load_sales_products()
+        self.load_parked_carts()
     
-    def load_sales_products(self):
-        # مسح البيانات القديمة
-        for item in self.sales_products_tree.get_children():
-            self.sales_products_tree.delete(item)
+    def sales_product_row_values(self, product):
+        return (
+            product["id"],
+            product["name"],
+            f"{product['price']:.2f}",
+            product["quantity"]
+        )
+    
+    def sales_product_row(self, product):
+        # المنتج قد يكون نفد أو حذف بعد البحث
+        success, product = ProductCatalog.get_product(product["id"])
+        if not success or product["quantity"] <= 0:
+            return None
         
-        # تحميل المنتجات المتاحة فقط (الكمية > 0)
-        success, products = ProductModel.get_available_products()
-        if success:
-            for product in products:
-                self.sales_products_tree.insert("", "end", values=(
-                    product["id"],
-                    product["name"],
-                    f"{product['price']:.2f}",
-                    product["quantity"]
-                ))
+        return str(product["id"]), self.sales_product_row_values(product), ()
+    
+    def load_sales_products(self):
+        self.render_sales_products(self.sales_search_var.get())
     
     def filter_sales_products(self):
-        search_term = self.sales_search_var.get().lower()
+        self.render_sales_products(self.sales_search_var.get())
+    
+    def render_sales_products(self, search_term="", keep_position=False):
+        def show(result):
+            success, products = result
+            if success:
+                self.sales_result_ids = {product["id"] for product in products}
+                if keep_position:
+                    self.sales_products_view.refresh(products)
+                else:
+                    self.sales_products_view.set_source(products)
         
-        # مسح البيانات القديمة
-        for item in self.sales_products_tree.get_children():
-            self.sales_products_tree.delete(item)
+        # المنتجات المتاحة فقط (الكمية > 0) من فهرس البحث
+        self.tasks.submit("sales_search", ProductCatalog.search, search_term, available_only=True,
+                          limit=SEARCH_RESULTS_LIMIT if search_term.strip() else None, on_done=show)
+    
+    def cart_locked(self):
+        """
+        رسالة المنع إذا كانت السلة مقفلة (إتمام البيع يعمل في الخلفية على نسخة
+        من السلة، فأي تعديل أو تعليق قبل انتهائه يضيع أو يباع مرتين)
         
-        # تحميل المنتجات المفلترة
-        success, products = ProductModel.get_available_products()
-        if success:
-            for product in products:
-                if search_term in product["name"].lower():
-                    self.sales_products_tree.insert("", "end", values=(
-                        product["id"],
-                        product["name"],
-                        f"{product['price']:.2f}",
-                        product["quantity"]
-                    ))
+        Returns:
+            str: سبب القفل أو None إذا كانت السلة قابلة للتعديل
+        """
+        if self.tasks.is_running("checkout"):
+            return "جاري إتمام عملية البيع، انتظر حتى تنتهي"
+        return None
     
     def add_to_cart(self):
+        locked = self.cart_locked()
+        if locked:
+            messagebox.showwarning("تحذير", locked)
+            return
+        
         selected = self.sales_products_tree.selection()
         if not selected:
             messagebox.showwarning("تحذير", "الرجاء تحديد منتج للإضافة")
             return
         
-        # الحصول على المنتج المحدد
+        # الحصول على المنتج المحدد (بياناته الحالية من الذاكرة المؤقتة)
         product_id = int(self.sales_products_tree.item(selected[0])["values"][0])
-        product_name = self.sales_products_tree.item(selected[0])["values"][1]
-        product_price = float(self.sales_products_tree.item(selected[0])["values"][2])
-        available_quantity = int(self.sales_products_tree.item(selected[0])["values"][3])
-        
-        # التحقق من الكمية
-        quantity = self.quantity_var.get()
-        if quantity <= 0:
-            messagebox.showerror("خطأ", "يجب أن تكون الكمية أكبر من صفر")
+        success, product = ProductCatalog.get_product(product_id)
+        if not success:
+            messagebox.showerror("خطأ", product)
             return
         
-        if quantity > available_quantity:
-            messagebox.showerror("خطأ", f"الكمية المتاحة هي {available_quantity} فقط")
+        # إضافة المنتج للسلة أو زيادة كميته مع التحقق من الكمية المتاحة
+        success, message = self.cart.add(product, self.quantity_var.get())
+        if not success:
+            messagebox.showerror("خطأ", message)
             return
         
-        # التحقق إذا كان المنتج موجود بالفعل في السلة
-        for item in self.cart_items:
-            if item["product_id"] == product_id:
-                new_quantity = item["quantity"] + quantity
-                if new_quantity > available_quantity:
-                    messagebox.showerror("خطأ", f"الكمية المتاحة هي {available_quantity} فقط")
-                    return
-                
-                item["quantity"] = new_quantity
-                item["total"] = round(new_quantity * item["price"], 2)  # تقريب لرقمين عشريين
-                self.refresh_cart()
-                self.update_total()
-                return
+        self.update_total()
+    
+    def scan_barcode(self):
+        barcode = self.scan_var.get().strip()
+        self.scan_var.set("")
+        if not barcode:
+            return
+        
+        locked = self.cart_locked()
+        if locked:
+            self.scan_status.configure(text=f"{barcode}: {locked}", foreground="red")
+            return
         
-        # إضافة المنتج للسلة
-        item = {
-            "product_id": product_id,
-            "name": product_name,
-            "price": product_price,
-            "quantity": quantity,
-            "total": round(quantity * product_price, 2)  # تقريب لرقمين عشريين
-        }
-        
-        self.cart_items.append(item)
-        self.refresh_cart()
+        # بحث واحد في قاموس الباركود بالذاكرة ثم إضافة قطعة واحدة للسلة
+        success, product = ProductCatalog.get_product_by_barcode(barcode)
+        if success:
+            success, message = self.cart.add(product, 1)
+        else:
+            message = product
+        
+        if not success:
+            # رسالة في نفس السطر بدلاً من نافذة حتى لا يتوقف المسح
+            self.scan_status.configure(text=f"{barcode}: {message}", foreground="red")
+            return
+        
+        self.scan_status.configure(text=product["name"], foreground="green")
         self.update_total()
     
     def remove_from_cart(self):
+        locked = self.cart_locked()
+        if locked:
+            messagebox.showwarning("تحذير", locked)
+            return
+        
         selected = self.cart_tree.selection()
         if not selected:
             messagebox.showwarning("تحذير", "الرجاء تحديد منتج للحذف من السلة")
             return
         
-        # الحصول على المنتج المحدد
-        item_id = int(self.cart_tree.item(selected[0])["values"][0])
+        # معرف صف السلة هو معرف المنتج
+        self.cart.remove(int(selected[0]))
+        self.update_total()
+    
+    def on_cart_changed(self, event, item):
+        # تعديل صف المنتج المتغير فقط بدلاً من إعادة بناء جدول السلة
+        if event == "clear":
+            self.cart_tree.delete(*self.cart_tree.get_children())
+            return
+        
+        row_id = str(item["product_id"])
+        if event == "remove":
+            if self.cart_tree.exists(row_id):
+                self.cart_tree.delete(row_id)
+            return
         
-        # حذف المنتج من السلة
-        self.cart_items = [item for item in self.cart_items if item["product_id"] != item_id]
-        self.refresh_cart()
+        values = (
+            item["product_id"],
+            item["name"],
+            f"{item['price']:.2f}",
+            item["quantity"],
+            f"{item['total']:.2f}"
+        )
+        if self.cart_tree.exists(row_id):
+            self.cart_tree.item(row_id, values=values)
+        else:
+            self.cart_tree.insert("", "end", iid=row_id, values=values)
+    
+    def park_cart(self):
+        if not self.cart:
+            messagebox.showwarning("تحذير", "السلة فارغة")
+            return
+        
+        locked = self.cart_locked()
+        if locked:
+            messagebox.showwarning("تحذير", locked)
+            return
+        
+        name = simpledialog.askstring("تعليق السلة", "اسم السلة:", parent=self.root,
+                                      initialvalue=f"سلة {datetime.now().strftime('%H:%M')}")
+        if name is None:  # إذا قام المستخدم بالإلغاء
+            return
+        
+        self.park_current(name)
+    
+    def park_current(self, name):
+        """
+        تعليق السلة الحالية باسم معين
+        
+        Returns:
+            bool: تم التعليق (False إذا كانت السلة مقفلة بعملية بيع جارية)
+        """
+        # السلة التي يجري بيعها لا تعلق وإلا بيعت عناصرها مرة أخرى عند استئنافها
+        locked = self.cart_locked()
+        if locked:
+            messagebox.showwarning("تحذير", locked)
+            return False
+        
+        # تفريغ السلة فوراً حتى يبدأ العميل التالي، والحفظ في الخلفية
+        self.update_total()
+        items = self.cart.items()
+        discount = self.cart.totals()["discount"]
+        self.cart.clear()
+        self.discount_var.set(0)
         self.update_total()
+        
+        def parked(result):
+            success, message = result
+            if success:
+                self.load_parked_carts()
+                return
+            
+            # إرجاع السلة إذا لم يبدأ الكاشير سلة جديدة بعد
+            if not self.cart:
+                self.cart.load(items, discount)
+                self.discount_var.set(discount)
+                self.update_total()
+            messagebox.showerror("خطأ", message)
+        
+        self.tasks.submit(None, ParkedCartService.park, self.user["id"], name, items, discount, on_done=parked)
+        return True
     
-    def refresh_cart(self):
-        # مسح البيانات القديمة
-        for item in self.cart_tree.get_children():
-            self.cart_tree.delete(item)
-        
-        # إضافة المنتجات للجدول
-        for item in self.cart_items:
-            self.cart_tree.insert("", "end", values=(
-                item["product_id"],
-                item["name"],
-                f"{item['price']:.2f}",
-                item["quantity"],
-                f"{item['total']:.2f}"
-            ))
+    def load_parked_carts(self):
+        def show(result):
+            success, carts = result
+            if not success:
+                return
+            
+            self.parked_carts = carts
+            self.parked_combo.configure(values=[
+                f"{cart['name']} - {cart['terminal']} - {cart['subtotal']:.2f} ({cart['items_count']} صنف)"
+                for cart in carts
+            ])
+            if self.parked_combo.current() < 0:
+                self.parked_var.set("")
+        
+        self.tasks.submit("parked_carts", ParkedCartService.get_parked_carts, on_done=show)
     
-    def update_total(self):
-        # حساب إجمالي الفاتورة بشكل صحيح
-        subtotal = sum(item["total"] for item in self.cart_items)
+    def selected_parked_cart(self):
+        index = self.parked_combo.current()
+        if index < 0 or index >= len(self.parked_carts):
+            messagebox.showwarning("تحذير", "الرجاء اختيار سلة معلقة")
+            return None
+        return self.parked_carts[index]
+    
+    def resume_parked_cart(self):
+        parked = self.selected_parked_cart()
+        if parked is None:
+            return
         
+        if self.tasks.is_running("resume_cart"):
+            return
+        
+        locked = self.cart_locked()
+        if locked:
+            messagebox.showwarning("تحذير", locked)
+            return
+        
+        def resumed(result):
+            success, cart = result
+            self.parked_var.set("")
+            self.load_parked_carts()
+            if not success:
+                messagebox.showerror("خطأ", cart)
+                return
+            
+            # السلة الحالية تعلق تلقائياً عند التبديل فلا يضيع شيء
+            if self.cart and not self.park_current(f"سلة {datetime.now().strftime('%H:%M')}"):
+                # السلة الحالية مقفلة فتعاد السلة المستأنفة للسلال المعلقة بدلاً من استبدالها
+                if cart["items"]:
+                    self.tasks.submit(None, ParkedCartService.park, self.user["id"], cart["name"],
+                                      cart["items"], cart["discount"],
+                                      on_done=lambda result: self.load_parked_carts())
+                return
+            
+            self.cart.load(cart["items"], cart["discount"])
+            self.discount_var.set(cart["discount"])
+            self.update_total()
+            
+            if not cart["items"]:
+                messagebox.showwarning("تحذير", f"لم يبق في السلة {cart['name']} أي منتج متاح")
+            elif cart["changes"]:
+                messagebox.showinfo("تعديلات السلة", "\n".join(cart["changes"]))
+        
+        # سحب السلة والتحقق من المخزون باستعلام واحد في الخلفية
+        self.tasks.submit("resume_cart", ParkedCartService.resume, parked["id"], on_done=resumed)
+    
+    def delete_parked_cart(self):
+        parked = self.selected_parked_cart()
+        if parked is None:
+            return
+        
+        if not messagebox.askyesno("تأكيد الحذف", f"هل تريد حذف السلة المعلقة {parked['name']}؟"):
+            return
+        
+        def deleted(result):
+            success, message = result
+            self.parked_var.set("")
+            self.load_parked_carts()
+            if not success:
+                messagebox.showerror("خطأ", message)
+        
+        self.tasks.submit(None, ParkedCartService.delete, parked["id"], on_done=deleted)
+    
+    def update_total(self):
         # الحصول على قيمة الخصم
         try:
-            discount = float(self.discount_var.get())
-            if discount < 0:
-                discount = 0
-                self.discount_var.set(0)
+            requested_discount = float(self.discount_var.get())
         except:
-            discount = 0
+            requested_discount = 0
             self.discount_var.set(0)
         
-        # التأكد من أن الخصم لا يتجاوز قيمة الفاتورة
-        if discount > subtotal:
-            discount = subtotal
-            self.discount_var.set(subtotal)
+        # حساب الإجمالي بعد الخصم (الخصم لا يقل عن صفر ولا يتجاوز قيمة الفاتورة)
+        totals = self.cart.set_discount(requested_discount)
+        if totals["discount"] != requested_discount:
+            self.discount_var.set(totals["discount"])
         
-        # حساب الإجمالي بعد الخصم
-        total = subtotal - discount
-        self.total_var.set(f"{total:.2f}")
+        self.total_var.set(f"{totals['total']:.2f}")
 
     def complete_sale(self):
-        if not self.cart_items:
+        if not self.cart:
             messagebox.showwarning("تحذير", "السلة فارغة")
             return
         
+        if self.tasks.is_running("checkout"):
+            messagebox.showwarning("تحذير", "جاري إتمام عملية البيع السابقة")
+            return
+        
+        # استئناف سلة معلقة يستبدل السلة عند انتهائه فلا يبدأ البيع قبله
+        if self.tasks.is_running("resume_cart"):
+            messagebox.showwarning("تحذير", "جاري استئناف سلة معلقة")
+            return
+        
         # بدلاً من نافذة بيانات المشتري، نستخدم نمط أبسط
         customer_name = simpledialog.askstring("بيانات المشتري", "اسم المشتري:", parent=self.root)
         if customer_name is None:  # إذا قام المستخدم بالإلغاء
@@ -708,281 +1049,52 @@ class Dashboard:
             return
         
         try:
-            # حساب المجموع
-            subtotal = sum(item["total"] for item in self.cart_items)
             discount = self.discount_var.get()
-            total = subtotal - discount
-            
-            # إنشاء رقم فاتورة ورمز باركود
-            invoice_id = int(time.time())
-            barcode = "#" + ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
-            invoice_date = datetime.now().strftime("%Y-%m-%d")
-            
-            # إنشاء نص الفاتورة بتنسيق أفضل
-            invoice_text = f"""        ████████ محل البركة ████████
-        العنوان: شارع النصر – القاهرة
-        الهاتف: 0100-123-4567
-+----------------------------------------+
-| الاسم: {customer_name:<30} |
-| رقم الهاتف: {customer_phone:<26} |
-| رقم الفاتورة: {invoice_id:<24} |
-| الباركود: {barcode:<28} |
-| التاريخ: {invoice_date:<29} |
-+----------------------------------------+
-| الصنف              | الكمية | السعر  | الإجمالي |
-+----------------------------------------+
-"""
-            # إضافة المنتجات
-            for item in self.cart_items:
-                # تنسيق النص مع مراعاة العرض المناسب
-                product_line = f"| {item['name']:<18} | {item['quantity']:^6} | {item['price']:>6.2f} | {item['total']:>8.2f} |\n"
-                invoice_text += product_line
-                
-                # تحديث كمية المنتج
-                try:
-                    success, message = ProductModel.update_product_quantity(item["product_id"], item["quantity"])
-                    if not success:
-                        messagebox.showwarning("تحذير", f"فشل تحديث كمية المنتج {item['name']}: {message}")
-                except Exception as e:
-                    messagebox.showwarning("تحذير", f"خطأ في تحديث كمية المنتج {item['name']}: {str(e)}")
-            
-            # إكمال الفاتورة مع تنسيق أفضل
-            invoice_text += f"""+----------------------------------------+
-| الإجمالي قبل الخصم:           {subtotal:>10.2f} |
-| الخصم:                       {discount:>10.2f} |
-| الإجمالي بعد الخصم:          {total:>10.2f} |
-+----------------------------------------+
-         شكراً لتعاملكم معنا!
-      للاتصال: 0100-123-4567
-"""
-            
-            # حفظ الفاتورة في ملف
-            filename = f"invoice_{invoice_id}.txt"
-            with open(filename, "w", encoding="utf-8") as f:
-                f.write(invoice_text)
-            
-            # عرض الفاتورة في نافذة محسنة
-            invoice_window = tk.Toplevel(self.root)
-            invoice_window.title(f"فاتورة رقم {invoice_id}")
-            
-            # حجم مناسب للنافذة
-            window_width = int(self.root.winfo_width() * 0.7)
-            window_height = int(self.root.winfo_height() * 0.9)
-            
-            # توسيط النافذة
-            screen_width = self.root.winfo_screenwidth()
-            screen_height = self.root.winfo_screenheight()
-            center_x = int(screen_width/2 - window_width/2)
-            center_y = int(screen_height/2 - window_height/2)
-            
-            invoice_window.geometry(f"{window_width}x{window_height}+{center_x}+{center_y}")
-            invoice_window.minsize(500, 650)
-            
-            # تخصيص مظهر النافذة
-            invoice_window.configure(bg="#f5f5f5")
-            
-            # إنشاء إطار للنص مع شريط تمرير
-            main_frame = ttk.Frame(invoice_window)
-            main_frame.pack(fill="both", expand=True, padx=10, pady=10)
-            
-            # استخدام Canvas لتوفير تجربة مستخدم أفضل وأكثر استجابة
-            canvas = tk.Canvas(main_frame, highlightthickness=0)
-            scrollbar = ttk.Scrollbar(main_frame, orient="vertical", command=canvas.yview)
-            
-            # ربط الـ Canvas بشريط التمرير
-            canvas.configure(yscrollcommand=scrollbar.set)
-            
-            # وضع عناصر التخطيط
-            scrollbar.pack(side="right", fill="y")
-            canvas.pack(side="left", fill="both", expand=True)
-            
-            # إطار داخل الـ Canvas للمحتوى
-            content_frame = ttk.Frame(canvas)
-            canvas.create_window((0, 0), window=content_frame, anchor="nw")
-            
-            # الشعار والترويسة
-            header_frame = ttk.Frame(content_frame)
-            header_frame.pack(fill="x", padx=10, pady=5)
-            
-            ttk.Label(header_frame, text="محل البركة", font=("Arial", 18, "bold")).pack(pady=5)
-            ttk.Label(header_frame, text="العنوان: شارع النصر – القاهرة", font=("Arial", 10)).pack()
-            ttk.Label(header_frame, text="الهاتف: 0100-123-4567", font=("Arial", 10)).pack(pady=2)
-            
-            ttk.Separator(content_frame).pack(fill="x", padx=10, pady=5)
-            
-            # معلومات الفاتورة
-            info_frame = ttk.Frame(content_frame)
-            info_frame.pack(fill="x", padx=10, pady=5)
-            
-            # استخدام شبكة للمعلومات
-            ttk.Label(info_frame, text="الاسم:", font=("Arial", 10, "bold")).grid(row=0, column=0, sticky="e", padx=5, pady=2)
-            ttk.Label(info_frame, text=customer_name).grid(row=0, column=1, sticky="w", padx=5, pady=2)
-            
-            ttk.Label(info_frame, text="رقم الهاتف:", font=("Arial", 10, "bold")).grid(row=1, column=0, sticky="e", padx=5, pady=2)
-            ttk.Label(info_frame, text=customer_phone).grid(row=1, column=1, sticky="w", padx=5, pady=2)
-            
-            ttk.Label(info_frame, text="رقم الفاتورة:", font=("Arial", 10, "bold")).grid(row=0, column=2, sticky="e", padx=5, pady=2)
-            ttk.Label(info_frame, text=str(invoice_id)).grid(row=0, column=3, sticky="w", padx=5, pady=2)
-            
-            ttk.Label(info_frame, text="التاريخ:", font=("Arial", 10, "bold")).grid(row=1, column=2, sticky="e", padx=5, pady=2)
-            ttk.Label(info_frame, text=invoice_date).grid(row=1, column=3, sticky="w", padx=5, pady=2)
-            
-            ttk.Label(info_frame, text="الباركود:", font=("Arial", 10, "bold")).grid(row=2, column=0, sticky="e", padx=5, pady=2)
-            ttk.Label(info_frame, text=barcode).grid(row=2, column=1, sticky="w", padx=5, pady=2)
-            
-            ttk.Separator(content_frame).pack(fill="x", padx=10, pady=5)
-            
-            # جدول المنتجات
-            items_frame = ttk.Frame(content_frame)
-            items_frame.pack(fill="x", padx=10, pady=5)
-            
-            # عناوين الجدول
-            ttk.Label(items_frame, text="الصنف", font=("Arial", 10, "bold")).grid(row=0, column=0, padx=5, pady=2, sticky="w")
-            ttk.Label(items_frame, text="الكمية", font=("Arial", 10, "bold")).grid(row=0, column=1, padx=5, pady=2)
-            ttk.Label(items_frame, text="السعر", font=("Arial", 10, "bold")).grid(row=0, column=2, padx=5, pady=2)
-            ttk.Label(items_frame, text="الإجمالي", font=("Arial", 10, "bold")).grid(row=0, column=3, padx=5, pady=2)
-            
-            ttk.Separator(items_frame, orient="horizontal").grid(row=1, columnspan=4, sticky="ew", padx=5, pady=2)
-            
-            # إضافة المنتجات للجدول
-            for i, item in enumerate(self.cart_items):
-                ttk.Label(items_frame, text=item['name']).grid(row=i+2, column=0, padx=5, pady=2, sticky="w")
-                ttk.Label(items_frame, text=str(item['quantity'])).grid(row=i+2, column=1, padx=5, pady=2)
-                ttk.Label(items_frame, text=f"{item['price']:.2f}").grid(row=i+2, column=2, padx=5, pady=2)
-                ttk.Label(items_frame, text=f"{item['total']:.2f}").grid(row=i+2, column=3, padx=5, pady=2)
-            
-            ttk.Separator(content_frame).pack(fill="x", padx=10, pady=5)
-            
-            # إجماليات
-            totals_frame = ttk.Frame(content_frame)
-            totals_frame.pack(fill="x", padx=10, pady=5)
-            
-            ttk.Label(totals_frame, text="الإجمالي قبل الخصم:", font=("Arial", 10, "bold")).grid(row=0, column=0, padx=5, pady=2, sticky="e")
-            ttk.Label(totals_frame, text=f"{subtotal:.2f}").grid(row=0, column=1, padx=5, pady=2, sticky="w")
-            
-            ttk.Label(totals_frame, text="الخصم:", font=("Arial", 10, "bold")).grid(row=1, column=0, padx=5, pady=2, sticky="e")
-            ttk.Label(totals_frame, text=f"{discount:.2f}").grid(row=1, column=1, padx=5, pady=2, sticky="w")
-            
-            ttk.Label(totals_frame, text="الإجمالي بعد الخصم:", font=("Arial", 10, "bold")).grid(row=2, column=0, padx=5, pady=2, sticky="e")
-            ttk.Label(totals_frame, text=f"{total:.2f}", font=("Arial", 12, "bold")).grid(row=2, column=1, padx=5, pady=2, sticky="w")
-            
-            ttk.Separator(content_frame).pack(fill="x", padx=10, pady=5)
-            
-            # تذييل
-            footer_frame = ttk.Frame(content_frame)
-            footer_frame.pack(fill="x", padx=10, pady=5)
-            
-            ttk.Label(footer_frame, text="شكراً لتعاملكم معنا!", font=("Arial", 12, "bold")).pack(pady=2)
-            ttk.Label(footer_frame, text="للاتصال: 0100-123-4567").pack()
-            
-            # تحديث حجم المنطقة القابلة للتمرير
-            content_frame.update_idletasks()
-            canvas.config(scrollregion=canvas.bbox("all"))
-            
-            # تفعيل التمرير باستخدام عجلة الماوس
-            def _on_mousewheel(event):
-                canvas.yview_scroll(int(-1*(event.delta/120)), "units")
-            
-            canvas.bind_all("<MouseWheel>", _on_mousewheel)
-            
-            # إطار الأزرار
-            button_frame = ttk.Frame(invoice_window)
-            button_frame.pack(fill="x", padx=10, pady=10)
-            
-            # زر لحفظ الفاتورة
-            def save_invoice():
-                save_path = filedialog.asksaveasfilename(
-                    defaultextension=".txt",
-                    initialfile=f"فاتورة_{invoice_id}.txt",
-                    filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
-                )
-                if save_path:
-                    try:
-                        with open(save_path, "w", encoding="utf-8") as f:
-                            f.write(invoice_text)
-                        messagebox.showinfo("حفظ الفاتورة", f"تم حفظ الفاتورة بنجاح في:\n{save_path}")
-                    except Exception as e:
-                        messagebox.showerror("خطأ", f"فشل حفظ الفاتورة: {str(e)}")
-            
-            # طباعة الفاتورة (محاكاة فقط)
-            def print_invoice():
-                messagebox.showinfo("طباعة الفاتورة", "تم إرسال الفاتورة للطباعة")
-            
-            # إلغاء الربط عند إغلاق النافذة
-            def on_closing():
-                canvas.unbind_all("<MouseWheel>")
-                invoice_window.destroy()
-            
-            self.create_button(button_frame, "حفظ الفاتورة", save_invoice).pack(side="left", padx=5)
-            self.create_button(button_frame, "طباعة", print_invoice).pack(side="left", padx=5)
-            self.create_button(button_frame, "إغلاق", on_closing).pack(side="right", padx=5)
-            
-            invoice_window.protocol("WM_DELETE_WINDOW", on_closing)
+        except Exception:
+            discount = 0
+        
+        def on_checkout(result):
+            success, invoice = result
+            if not success:
+                messagebox.showerror("خطأ", f"فشل إتمام عملية البيع: {invoice}")
+                return
             
             # مسح السلة
-            self.cart_items = []
-            self.refresh_cart()
-            self.update_total()
+            self.cart.clear()
             self.discount_var.set(0)
+            self.update_total()
             
-            # تحديث المنتجات
-            self.load_sales_products()
-            self.load_products()
+            # نسخة الإيصال تحفظ في الخلفية فلا تنتظر الواجهة الكتابة على القرص
+            self.spooler.submit(invoice)
             
-        except Exception as e:
-            messagebox.showerror("خطأ", f"حدث خطأ أثناء إتمام عملية البيع: {str(e)}")
-
-    def print_invoice(self, invoice_id):
-        # الحصول على تفاصيل الفاتورة
-        success, invoice = InvoiceModel.get_invoice(invoice_id)
+            self.show_sale_invoice(invoice)
         
-        if not success:
-            messagebox.showerror("خطأ", f"فشل في الحصول على تفاصيل الفاتورة: {invoice}")
-            return
+        def on_checkout_error(error):
+            messagebox.showerror("خطأ", f"حدث خطأ أثناء إتمام عملية البيع: {str(error)}")
         
-        # فقط قم بحفظ الفاتورة في ملف نصي بدون محاولة عرضها في نافذة جديدة
-        filename = f"invoice_{invoice_id}_{int(time.time())}.txt"
+        # التحقق من المخزون وخصم الكميات وتسجيل الفاتورة في معاملة واحدة (في الخلفية)
+        self.tasks.submit("checkout", CheckoutService.checkout,
+                          self.user["id"], customer_name, customer_phone, None,
+                          self.cart.items(), discount,
+                          on_done=on_checkout, on_error=on_checkout_error)
+    
+    def show_sale_invoice(self, invoice):
         try:
-            with open(filename, "w", encoding="utf-8") as f:
-                f.write("=" * 50 + "\n")
-                f.write("نظام المبيعات - فاتورة\n")
-                f.write("=" * 50 + "\n\n")
-                
-                # معلومات الفاتورة
-                f.write(f"رقم الفاتورة: {invoice_id}\n")
-                f.write(f"التاريخ: {invoice['created_at']}\n")
-                f.write(f"الموظف: {self.user['username']}\n\n")
-                
-                # معلومات المشتري
-                if invoice.get('customer_name') or invoice.get('customer_phone'):
-                    f.write("معلومات المشتري:\n")
-                    if invoice.get('customer_name'):
-                        f.write(f"الاسم: {invoice['customer_name']}\n")
-                    if invoice.get('customer_phone'):
-                        f.write(f"رقم الهاتف: {invoice['customer_phone']}\n")
-                    f.write("\n")
-                
-                # المنتجات
-                f.write("المنتجات:\n")
-                f.write("-" * 50 + "\n")
-                f.write(f"{'اسم المنتج':<25} {'السعر':>10} {'الكمية':>10} {'الإجمالي':>10}\n")
-                
-                for item in invoice["items"]:
-                    f.write(f"{item['name']:<25} {item['price']:>10.2f} {item['quantity']:>10} {item['item_total']:>10.2f}\n")
-                
-                f.write("=" * 50 + "\n")
-                f.write(f"إجمالي الفاتورة: {invoice['subtotal']:.2f}\n")
-                f.write(f"الخصم: {invoice['discount']:.2f}\n")
-                f.write(f"المبلغ المطلوب: {invoice['total']:.2f}\n")
-            
-            # عرض رسالة نجاح وإظهار رقم الفاتورة فقط
-            messagebox.showinfo("تمت العملية بنجاح", 
-                            f"تم إنشاء الفاتورة رقم {invoice_id} بنجاح\n"
-                            f"وتم حفظها في الملف: {filename}\n\n"
-                            f"الإجمالي: {invoice['total']:.2f}")
-            
+            self.invoice_viewer.show(invoice)
         except Exception as e:
-            messagebox.showerror("خطأ", f"فشل في حفظ الفاتورة: {str(e)}")
+            messagebox.showerror("خطأ", f"حدث خطأ أثناء عرض الفاتورة: {str(e)}")
+
+    def print_invoice(self, invoice_id):
+        def loaded(result):
+            success, invoice = result
+            if not success:
+                messagebox.showerror("خطأ", f"فشل في الحصول على تفاصيل الفاتورة: {invoice}")
+                return
+            
+            # الطباعة في خيط الطابور، وعدد المنتظر يظهر في شريط الحالة
+            self.spooler.submit(invoice, "printer")
+        
+        self.tasks.submit(None, InvoiceModel.get_invoice, invoice_id, on_done=loaded)
 
     def setup_reports_tab(self):
         reports_frame = ttk.Frame(self.reports_tab)
@@ -999,88 +1111,17 @@ class Dashboard:
         self.create_button(buttons_frame, "تقرير المخزون المنخفض", self.show_low_stock, width=25).pack(pady=15)
     
     def show_daily_sales(self):
+        # الحصول على إجمالي المبيعات لكل يوم من قاعدة البيانات في الخلفية ثم فتح التقرير
+        self.tasks.submit("daily_sales", ReportService.sales_by_day, on_done=self.open_daily_sales_report)
+    
+    def open_daily_sales_report(self, result):
         try:
-            # بدلاً من الاعتماد على InvoiceModel.get_daily_sales() سنقوم بقراءة ملفات الفواتير
-            import os
-            import re
-            from datetime import datetime
-            
-            # البحث عن ملفات الفواتير في المجلد الحالي
-            invoice_files = [f for f in os.listdir('.') if f.startswith('invoice_') and f.endswith('.txt')]
-            
-            # تنظيم البيانات حسب التاريخ
-            daily_sales = {}
-            invoice_contents = {}  # تخزين محتويات الفاتورة
-            
-            for filename in invoice_files:
-                try:
-                    with open(filename, 'r', encoding='utf-8') as file:
-                        content = file.read()
-                        
-                        # استخراج تاريخ الفاتورة
-                        date_match = re.search(r'التاريخ: (\d{4}-\d{2}-\d{2})', content)
-                        if date_match:
-                            invoice_date = date_match.group(1)
-                        else:
-                            # محاولة استخراج التاريخ من اسم الملف
-                            timestamp_match = re.search(r'invoice_(\d+)_?(\d+)?\.txt', filename)
-                            if timestamp_match:
-                                timestamp = int(timestamp_match.group(1))
-                                invoice_date = datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d')
-                            else:
-                                continue
-                        
-                        # استخراج رقم الفاتورة
-                        invoice_id_match = re.search(r'رقم الفاتورة: (\d+)', content)
-                        if invoice_id_match:
-                            invoice_id = invoice_id_match.group(1)
-                        else:
-                            # استخدام اسم الملف كمعرف
-                            invoice_id = os.path.splitext(filename)[0].replace('invoice_', '')
-                        
-                        # استخراج اسم المشتري
-                        customer_name_match = re.search(r'الاسم: (.*?)(?:\n|$)', content)
-                        customer_name = customer_name_match.group(1) if customer_name_match else "غير محدد"
-                        
-                        # استخراج المبلغ الإجمالي
-                        total_match = re.search(r'الإجمالي بعد الخصم:\s+(\d+\.\d+)', content)
-                        if not total_match:
-                            total_match = re.search(r'المبلغ المطلوب:\s+(\d+\.\d+)', content)
-                        
-                        if total_match:
-                            invoice_total = float(total_match.group(1))
-                        else:
-                            invoice_total = 0
-                        
-                        # تخزين محتوى الفاتورة
-                        invoice_contents[invoice_id] = content
-                        
-                        # إضافة البيانات إلى القاموس
-                        if invoice_date in daily_sales:
-                            daily_sales[invoice_date]["invoices"].append({
-                                "id": invoice_id,
-                                "customer": customer_name,
-                                "total": invoice_total,
-                                "filename": filename
-                            })
-                            daily_sales[invoice_date]["total"] += invoice_total
-                        else:
-                            daily_sales[invoice_date] = {
-                                "date": invoice_date,
-                                "invoices": [{
-                                    "id": invoice_id,
-                                    "customer": customer_name,
-                                    "total": invoice_total,
-                                    "filename": filename
-                                }],
-                                "total": invoice_total
-                            }
-                except Exception as e:
-                    print(f"خطأ في قراءة الملف {filename}: {str(e)}")
+            success, result = result
+            if not success:
+                messagebox.showerror("خطأ", f"فشل في الحصول على تقرير المبيعات: {result}")
+                return
             
-            # تحويل القاموس إلى قائمة
-            sales_list = list(daily_sales.values())
-            sales_list.sort(key=lambda x: x["date"], reverse=True)
+            sales_list = result["daily_sales"]
             
             # إنشاء نافذة للتقرير
             report_window = tk.Toplevel(self.root)
@@ -1124,21 +1165,16 @@ class Dashboard:
             date_tree.column("invoices_count", width=80, anchor="center")
             date_tree.column("total", width=100, anchor="center")
             
-            # إضافة البيانات
-            if sales_list:
-                for item in sales_list:
-                    date_tree.insert("", "end", values=(
-                        item["date"],
-                        len(item["invoices"]),
-                        f"{item['total']:.2f}"
-                    ), tags=(item["date"],))
-            else:
-                # إذا لم تكن هناك مبيعات
-                date_tree.insert("", "end", values=("لا توجد بيانات", "", ""))
-            
             # شريط التمرير
             date_scrollbar = ttk.Scrollbar(dates_frame, orient="vertical", command=date_tree.yview)
-            date_tree.configure(yscrollcommand=date_scrollbar.set)
+            
+            # إضافة البيانات على دفعات (صف "لا توجد بيانات" إذا لم تكن هناك مبيعات)
+            date_view = VirtualTree(date_tree, date_scrollbar, lambda item: (None, (
+                item["date"],
+                item["invoices_count"],
+                f"{item['total_sales']:.2f}"
+            ), (item["date"],)))
+            date_view.set_source(sales_list, empty_values=("لا توجد بيانات", "", ""))
             
             date_scrollbar.pack(side="right", fill="y")
             date_tree.pack(side="left", fill="both", expand=True)
@@ -1160,7 +1196,11 @@ class Dashboard:
             
             # شريط التمرير
             inv_scrollbar = ttk.Scrollbar(invoices_frame, orient="vertical", command=inv_tree.yview)
-            inv_tree.configure(yscrollcommand=inv_scrollbar.set)
+            inv_view = VirtualTree(inv_tree, inv_scrollbar, lambda invoice: (None, (
+                invoice["id"],
+                invoice["customer_name"] or "غير محدد",
+                f"{invoice['total']:.2f}"
+            ), (invoice["id"],)))
             
             inv_scrollbar.pack(side="right", fill="y")
             inv_tree.pack(side="left", fill="both", expand=True)
@@ -1171,258 +1211,60 @@ class Dashboard:
                 if not selected:
                     return
                 
-                # مسح الفواتير السابقة
-                for item in inv_tree.get_children():
-                    inv_tree.delete(item)
-                
                 # الحصول على التاريخ المحدد
                 selected_date = date_tree.item(selected[0], "values")[0]
                 
-                # البحث عن الفواتير لهذا التاريخ
-                for date_data in sales_list:
-                    if date_data["date"] == selected_date:
-                        for invoice in date_data["invoices"]:
-                            inv_tree.insert("", "end", values=(
-                                invoice["id"],
-                                invoice["customer"],
-                                f"{invoice['total']:.2f}"
-                            ), tags=(invoice["id"], invoice["filename"]))
-                        break
-            
-            # عند تحديد فاتورة، يتم عرض محتواها
+                def show_invoices(result):
+                    if not report_window.winfo_exists():
+                        return
+                    
+                    success, invoices = result
+                    if not success:
+                        inv_view.clear()
+                        return
+                    
+                    # عرض الفواتير السابقة يستبدل بفواتير هذا التاريخ على دفعات
+                    inv_view.set_source(invoices)
+                
+                # الحصول على فواتير هذا التاريخ من قاعدة البيانات في الخلفية
+                # (عند التنقل السريع بين التواريخ تتجاهل نتائج التواريخ السابقة)
+                self.tasks.submit("daily_sales_invoices", ReportService.day_invoices, selected_date,
+                                  on_done=show_invoices)
+            
+            # عند تحديد فاتورة، يتم عرض محتواها في نافذة الفواتير المشتركة
             def on_invoice_select(event):
                 selected = inv_tree.selection()
                 if not selected:
                     return
                 
-                # الحصول على معرف الفاتورة وملفها
+                # الحصول على معرف الفاتورة
                 item_tags = inv_tree.item(selected[0], "tags")
-                if len(item_tags) >= 2:
+                if item_tags:
                     invoice_id = item_tags[0]
-                    filename = item_tags[1]
                     
-                    try:
-                        # فتح الملف وقراءة المحتوى
-                        with open(filename, 'r', encoding='utf-8') as file:
-                            content = file.read()
-                        
-                        # استخراج معلومات الفاتورة من المحتوى
-                        customer_name = ""
-                        customer_phone = ""
-                        invoice_date = ""
-                        barcode = ""
-                        total = 0.0
-                        subtotal = 0.0
-                        discount = 0.0
-                        
-                        # استخراج معلومات الفاتورة
-                        name_match = re.search(r'الاسم: (.*?)(?:\n|$)', content)
-                        if name_match:
-                            customer_name = name_match.group(1).strip()
-                            
-                        phone_match = re.search(r'رقم الهاتف: (.*?)(?:\n|$)', content)
-                        if phone_match:
-                            customer_phone = phone_match.group(1).strip()
-                            
-                        date_match = re.search(r'التاريخ: (\d{4}-\d{2}-\d{2})', content)
-                        if date_match:
-                            invoice_date = date_match.group(1)
-                            
-                        barcode_match = re.search(r'الباركود: (#[A-Z0-9]+)', content)
-                        if barcode_match:
-                            barcode = barcode_match.group(1)
-                            
-                        total_match = re.search(r'الإجمالي بعد الخصم:\s+(\d+\.\d+)', content)
-                        if total_match:
-                            total = float(total_match.group(1))
-                            
-                        subtotal_match = re.search(r'الإجمالي قبل الخصم:\s+(\d+\.\d+)', content)
-                        if subtotal_match:
-                            subtotal = float(subtotal_match.group(1))
-                            
-                        discount_match = re.search(r'الخصم:\s+(\d+\.\d+)', content)
-                        if discount_match:
-                            discount = float(discount_match.group(1))
-                        
-                        # استخراج المنتجات
-                        items = []
-                        # نمط استخراج المنتجات من النص
-                        items_pattern = r'\| (.*?) \| (\d+) \| (\d+\.\d+) \| (\d+\.\d+) \|'
-                        items_matches = re.findall(items_pattern, content)
-                        
-                        for match in items_matches:
-                            product_name = match[0].strip()
-                            quantity = int(match[1])
-                            price = float(match[2])
-                            item_total = float(match[3])
-                            items.append({
-                                'name': product_name,
-                                'quantity': quantity,
-                                'price': price,
-                                'total': item_total
-                            })
-                        
-                        # عرض محتوى الفاتورة في نافذة جديدة بنفس التنسيق الجميل
-                        invoice_window = tk.Toplevel(report_window)
-                        invoice_window.title(f"فاتورة رقم {invoice_id}")
-                        
-                        # حجم مناسب للنافذة
-                        window_width = int(report_window.winfo_width() * 0.8)
-                        window_height = int(report_window.winfo_height() * 0.9)
-                        
-                        # توسيط النافذة
-                        screen_width = self.root.winfo_screenwidth()
-                        screen_height = self.root.winfo_screenheight()
-                        center_x = int(screen_width/2 - window_width/2)
-                        center_y = int(screen_height/2 - window_height/2)
-                        
-                        invoice_window.geometry(f"{window_width}x{window_height}+{center_x}+{center_y}")
-                        invoice_window.minsize(500, 650)
-                        
-                        # تخصيص مظهر النافذة
-                        invoice_window.configure(bg="#f5f5f5")
-                        
-                        # إنشاء إطار للنص مع شريط تمرير
-                        main_frame = ttk.Frame(invoice_window)
-                        main_frame.pack(fill="both", expand=True, padx=10, pady=10)
-                        
-                        # استخدام Canvas لتوفير تجربة مستخدم أفضل وأكثر استجابة
-                        canvas = tk.Canvas(main_frame, highlightthickness=0)
-                        scrollbar = ttk.Scrollbar(main_frame, orient="vertical", command=canvas.yview)
-                        
-                        # ربط الـ Canvas بشريط التمرير
-                        canvas.configure(yscrollcommand=scrollbar.set)
-                        
-                        # وضع عناصر التخطيط
-                        scrollbar.pack(side="right", fill="y")
-                        canvas.pack(side="left", fill="both", expand=True)
-                        
-                        # إطار داخل الـ Canvas للمحتوى
-                        content_frame = ttk.Frame(canvas)
-                        canvas.create_window((0, 0), window=content_frame, anchor="nw")
-                        
-                        # الشعار والترويسة
-                        header_frame = ttk.Frame(content_frame)
-                        header_frame.pack(fill="x", padx=10, pady=5)
-                        
-                        ttk.Label(header_frame, text="محل البركة", font=("Arial", 18, "bold")).pack(pady=5)
-                        ttk.Label(header_frame, text="العنوان: شارع النصر – القاهرة", font=("Arial", 10)).pack()
-                        ttk.Label(header_frame, text="الهاتف: 0100-123-4567", font=("Arial", 10)).pack(pady=2)
-                        
-                        ttk.Separator(content_frame).pack(fill="x", padx=10, pady=5)
-                        
-                        # معلومات الفاتورة
-                        info_frame = ttk.Frame(content_frame)
-                        info_frame.pack(fill="x", padx=10, pady=5)
-                        
-                        # استخدام شبكة للمعلومات
-                        ttk.Label(info_frame, text="الاسم:", font=("Arial", 10, "bold")).grid(row=0, column=0, sticky="e", padx=5, pady=2)
-                        ttk.Label(info_frame, text=customer_name).grid(row=0, column=1, sticky="w", padx=5, pady=2)
-                        
-                        ttk.Label(info_frame, text="رقم الهاتف:", font=("Arial", 10, "bold")).grid(row=1, column=0, sticky="e", padx=5, pady=2)
-                        ttk.Label(info_frame, text=customer_phone).grid(row=1, column=1, sticky="w", padx=5, pady=2)
-                        
-                        ttk.Label(info_frame, text="رقم الفاتورة:", font=("Arial", 10, "bold")).grid(row=0, column=2, sticky="e", padx=5, pady=2)
-                        ttk.Label(info_frame, text=str(invoice_id)).grid(row=0, column=3, sticky="w", padx=5, pady=2)
-                        
-                        ttk.Label(info_frame, text="التاريخ:", font=("Arial", 10, "bold")).grid(row=1, column=2, sticky="e", padx=5, pady=2)
-                        ttk.Label(info_frame, text=invoice_date).grid(row=1, column=3, sticky="w", padx=5, pady=2)
-                        
-                        if barcode:
-                            ttk.Label(info_frame, text="الباركود:", font=("Arial", 10, "bold")).grid(row=2, column=0, sticky="e", padx=5, pady=2)
-                            ttk.Label(info_frame, text=barcode).grid(row=2, column=1, sticky="w", padx=5, pady=2)
-                        
-                        ttk.Separator(content_frame).pack(fill="x", padx=10, pady=5)
-                        
-                        # جدول المنتجات
-                        items_frame = ttk.Frame(content_frame)
-                        items_frame.pack(fill="x", padx=10, pady=5)
-                        
-                        # عناوين الجدول
-                        ttk.Label(items_frame, text="الصنف", font=("Arial", 10, "bold")).grid(row=0, column=0, padx=5, pady=2, sticky="w")
-                        ttk.Label(items_frame, text="الكمية", font=("Arial", 10, "bold")).grid(row=0, column=1, padx=5, pady=2)
-                        ttk.Label(items_frame, text="السعر", font=("Arial", 10, "bold")).grid(row=0, column=2, padx=5, pady=2)
-                        ttk.Label(items_frame, text="الإجمالي", font=("Arial", 10, "bold")).grid(row=0, column=3, padx=5, pady=2)
-                        
-                        ttk.Separator(items_frame, orient="horizontal").grid(row=1, columnspan=4, sticky="ew", padx=5, pady=2)
-                        
-                        # إضافة المنتجات للجدول
-                        for i, item in enumerate(items):
-                            ttk.Label(items_frame, text=item['name']).grid(row=i+2, column=0, padx=5, pady=2, sticky="w")
-                            ttk.Label(items_frame, text=str(item['quantity'])).grid(row=i+2, column=1, padx=5, pady=2)
-                            ttk.Label(items_frame, text=f"{item['price']:.2f}").grid(row=i+2, column=2, padx=5, pady=2)
-                            ttk.Label(items_frame, text=f"{item['total']:.2f}").grid(row=i+2, column=3, padx=5, pady=2)
-                        
-                        ttk.Separator(content_frame).pack(fill="x", padx=10, pady=5)
-                        
-                        # إجماليات
-                        totals_frame = ttk.Frame(content_frame)
-                        totals_frame.pack(fill="x", padx=10, pady=5)
-                        
-                        ttk.Label(totals_frame, text="الإجمالي قبل الخصم:", font=("Arial", 10, "bold")).grid(row=0, column=0, padx=5, pady=2, sticky="e")
-                        ttk.Label(totals_frame, text=f"{subtotal:.2f}").grid(row=0, column=1, padx=5, pady=2, sticky="w")
-                        
-                        ttk.Label(totals_frame, text="الخصم:", font=("Arial", 10, "bold")).grid(row=1, column=0, padx=5, pady=2, sticky="e")
-                        ttk.Label(totals_frame, text=f"{discount:.2f}").grid(row=1, column=1, padx=5, pady=2, sticky="w")
-                        
-                        ttk.Label(totals_frame, text="الإجمالي بعد الخصم:", font=("Arial", 10, "bold")).grid(row=2, column=0, padx=5, pady=2, sticky="e")
-                        ttk.Label(totals_frame, text=f"{total:.2f}", font=("Arial", 12, "bold")).grid(row=2, column=1, padx=5, pady=2, sticky="w")
-                        
-                        ttk.Separator(content_frame).pack(fill="x", padx=10, pady=5)
-                        
-                        # تذييل
-                        footer_frame = ttk.Frame(content_frame)
-                        footer_frame.pack(fill="x", padx=10, pady=5)
-                        
-                        ttk.Label(footer_frame, text="شكراً لتعاملكم معنا!", font=("Arial", 12, "bold")).pack(pady=2)
-                        ttk.Label(footer_frame, text="للاتصال: 0100-123-4567").pack()
-                        
-                        # تحديث حجم المنطقة القابلة للتمرير
-                        content_frame.update_idletasks()
-                        canvas.config(scrollregion=canvas.bbox("all"))
-                        
-                        # تفعيل التمرير باستخدام عجلة الماوس
-                        def _on_mousewheel(event):
-                            canvas.yview_scroll(int(-1*(event.delta/120)), "units")
-                        
-                        canvas.bind_all("<MouseWheel>", _on_mousewheel)
-                        
-                        # إطار الأزرار
-                        button_frame = ttk.Frame(invoice_window)
-                        button_frame.pack(fill="x", padx=10, pady=10)
-                        
-                        # زر لحفظ الفاتورة
-                        def save_invoice():
-                            save_path = filedialog.asksaveasfilename(
-                                defaultextension=".txt",
-                                initialfile=f"فاتورة_{invoice_id}.txt",
-                                filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
-                            )
-                            if save_path:
-                                try:
-                                    with open(save_path, "w", encoding="utf-8") as f:
-                                        f.write(content)
-                                    messagebox.showinfo("حفظ الفاتورة", f"تم حفظ الفاتورة بنجاح في:\n{save_path}")
-                                except Exception as e:
-                                    messagebox.showerror("خطأ", f"فشل حفظ الفاتورة: {str(e)}")
-                        
-                        # طباعة الفاتورة (محاكاة فقط)
-                        def print_invoice():
-                            messagebox.showinfo("طباعة الفاتورة", "تم إرسال الفاتورة للطباعة")
-                        
-                        # إلغاء الربط عند إغلاق النافذة
-                        def on_closing():
-                            canvas.unbind_all("<MouseWheel>")
-                            invoice_window.destroy()
-                        
-                        self.create_button(button_frame, "حفظ الفاتورة", save_invoice).pack(side="left", padx=5)
-                        self.create_button(button_frame, "طباعة", print_invoice).pack(side="left", padx=5)
-                        self.create_button(button_frame, "إغلاق", on_closing).pack(side="right", padx=5)
-                        
-                        invoice_window.protocol("WM_DELETE_WINDOW", on_closing)
-                        
-                    except Exception as e:
-                        messagebox.showerror("خطأ", f"فشل في فتح الفاتورة: {str(e)}")
+                    # الفواتير المعروضة سابقاً تفتح من الذاكرة مباشرة
+                    invoice = self.invoice_viewer.cached(invoice_id)
+                    if invoice is not None:
+                        self.invoice_viewer.show(invoice)
+                        return
+                    
+                    # الحصول على الفاتورة وعناصرها من قاعدة البيانات في الخلفية
+                    self.tasks.submit("invoice_details", ReportService.invoice_details, invoice_id,
+                                      on_done=show_invoice)
+            
+            def show_invoice(result):
+                if not report_window.winfo_exists():
+                    return
+                
+                success, invoice = result
+                if not success:
+                    messagebox.showerror("خطأ", f"فشل في فتح الفاتورة: {invoice}")
+                    return
+                
+                try:
+                    self.invoice_viewer.show(invoice)
+                except Exception as e:
+                    messagebox.showerror("خطأ", f"فشل في فتح الفاتورة: {str(e)}")
             
             # إضافة الأحداث
             date_tree.bind("<<TreeviewSelect>>", on_date_select)
@@ -1438,8 +1280,32 @@ class Dashboard:
         except Exception as e:
             messagebox.showerror("خطأ", f"فشل في الحصول على تقرير المبيعات: {str(e)}")
 
+    def import_legacy_invoices(self):
+        # اختيار المجلد الذي يحتوي على ملفات invoice_*.txt القديمة
+        directory = filedialog.askdirectory(title="اختر مجلد ملفات الفواتير", initialdir=".")
+        if not directory:
+            return
+        
+        def imported(outcome):
+            success, result = outcome
+            if not success:
+                messagebox.showerror("خطأ", result)
+                return
+            
+            message = (f"تم استيراد {result['imported']} فاتورة\n"
+                       f"فواتير مستوردة سابقاً: {result['skipped']}")
+            if result["failed"]:
+                message += "\n\nفشل استيراد:\n" + "\n".join(result["failed"][:10])
+            messagebox.showinfo("استيراد الفواتير", message)
+        
+        self.tasks.submit("import_invoices", InvoiceImportService.import_directory, directory, on_done=imported)
+
     def show_top_products(self):
-        success, products = ProductModel.get_top_products()
+        self.tasks.submit("top_products", ReportService.top_products, PAGE_SIZE,
+                          on_done=self.open_top_products_report)
+    
+    def open_top_products_report(self, result):
+        success, products = result
         if success:
             # إنشاء نافذة للتقرير
             report_window = tk.Toplevel(self.root)
@@ -1476,17 +1342,22 @@ class Dashboard:
             tree.column("sold", width=100, anchor="center")
             tree.column("revenue", width=150, anchor="center")
             
-            # إضافة البيانات
-            for product in products:
-                tree.insert("", "end", values=(
-                    product["name"],
-                    product["sold"],
-                    f"{product['revenue']:.2f}"
-                ))
-            
             # شريط التمرير
             scrollbar = ttk.Scrollbar(report_window, orient="vertical", command=tree.yview)
-            tree.configure(yscrollcommand=scrollbar.set)
+            
+            # الصفحة الأولى محملة بالفعل والصفحات التالية تقرأ من قاعدة البيانات عند التمرير
+            def fetch_page(offset, limit):
+                if offset == 0:
+                    return products
+                success, page = ReportService.top_products(limit, offset)
+                return page if success else []
+            
+            view = VirtualTree(tree, scrollbar, lambda product: (None, (
+                product["name"],
+                product["sold"],
+                f"{product['revenue']:.2f}"
+            ), ()), runner=self.tasks)
+            view.set_source(fetch_page)
             
             scrollbar.pack(side="left", fill="y")
             tree.pack(side="right", fill="both", expand=True, padx=10, pady=10)
@@ -1494,7 +1365,10 @@ class Dashboard:
             messagebox.showerror("خطأ", f"فشل في الحصول على تقرير المنتجات: {products}")
 
     def show_low_stock(self):
-        success, products = ProductModel.get_low_stock()
+        self.tasks.submit("low_stock", ReportService.low_stock, on_done=self.open_low_stock_report)
+    
+    def open_low_stock_report(self, result):
+        success, products = result
         if success:
             # إنشاء نافذة للتقرير
             report_window = tk.Toplevel(self.root)
@@ -1582,12 +1456,15 @@ class Dashboard:
         self.load_users()
 
     def load_users(self):
+        # تحميل المستخدمين في الخلفية
+        self.tasks.submit("users", UserModel.get_all_users, on_done=self.show_users)
+    
+    def show_users(self, result):
         # مسح البيانات القديمة
         for item in self.users_tree.get_children():
             self.users_tree.delete(item)
         
-        # تحميل المستخدمين
-        success, users = UserModel.get_all_users()
+        success, users = result
         if success:
             for user in users:
                 role_text = "مدير" if user["role"] == "admin" else "عامل"
@@ -1647,13 +1524,16 @@ class Dashboard:
                 messagebox.showerror("خطأ", "الرجاء إدخال اسم المستخدم وكلمة المرور")
                 return
             
-            success, message = UserModel.add_user(username, password, role)
-            if success:
-                messagebox.showinfo("نجاح", "تمت إضافة المستخدم بنجاح")
-                add_window.destroy()
-                self.load_users()
-            else:
-                messagebox.showerror("خطأ", f"فشل إضافة المستخدم: {message}")
+            def saved(result):
+                success, message = result
+                if success:
+                    messagebox.showinfo("نجاح", "تمت إضافة المستخدم بنجاح")
+                    add_window.destroy()
+                    self.load_users()
+                else:
+                    messagebox.showerror("خطأ", f"فشل إضافة المستخدم: {message}")
+            
+            self.tasks.submit(None, UserModel.add_user, username, password, role, on_done=saved)
         
         self.create_button(add_window, "حفظ", save_user).grid(row=3, column=1, padx=10, pady=20)
 
@@ -1666,8 +1546,12 @@ class Dashboard:
         # الحصول على معرف المستخدم
         user_id = int(self.users_tree.item(selected[0])["values"][0])
         
-        # الحصول على بيانات المستخدم
-        success, user = UserModel.get_user(user_id)
+        # الحصول على بيانات المستخدم في الخلفية ثم فتح نافذة التعديل
+        self.tasks.submit("user_details", UserModel.get_user, user_id,
+                          on_done=lambda result: self.open_user_editor(user_id, result))
+    
+    def open_user_editor(self, user_id, result):
+        success, user = result
         
         if not success or not user:
             messagebox.showerror("خطأ", "فشل في الحصول على بيانات المستخدم")
@@ -1721,15 +1605,18 @@ class Dashboard:
                 messagebox.showerror("خطأ", "الرجاء إدخال اسم المستخدم")
                 return
             
-            success, message = UserModel.update_user(user_id, username, password, role)
-            if success:
-                messagebox.showinfo("نجاح", "تم تحديث المستخدم بنجاح")
-                edit_window.destroy()
-                self.load_users()
-            else:
-                messagebox.showerror("خطأ", f"فشل تحديث المستخدم: {message}")
+            def saved(result):
+                success, message = result
+                if success:
+                    messagebox.showinfo("نجاح", "تم تحديث المستخدم بنجاح")
+                    edit_window.destroy()
+                    self.load_users()
+                else:
+                    messagebox.showerror("خطأ", f"فشل تحديث المستخدم: {message}")
+            
+            self.tasks.submit(None, UserModel.update_user, user_id, username, password, role, on_done=saved)
         
-        self.create_button(edit_window, "حفظ التغييرات", save_changes).grid(row=3, column=1, padx=10, pady=20)
+        self.create_button(edit_window, "حفظ التغييرات", save_changes).grid(row=4, column=1, padx=10, pady=20)
 
     def delete_user(self):
         selected = self.users_tree.selection()
@@ -1748,13 +1635,20 @@ class Dashboard:
         
         # تأكيد الحذف
         if messagebox.askyesno("تأكيد الحذف", f"هل أنت متأكد من حذف المستخدم '{username}'؟"):
-            success, message = UserModel.delete_user(user_id)
-            if success:
-                messagebox.showinfo("نجاح", "تم حذف المستخدم بنجاح")
-                self.load_users()
-            else:
-                messagebox.showerror("خطأ", f"فشل حذف المستخدم: {message}")
+            def deleted(result):
+                success, message = result
+                if success:
+                    messagebox.showinfo("نجاح", "تم حذف المستخدم بنجاح")
+                    self.load_users()
+                else:
+                    messagebox.showerror("خطأ", f"فشل حذف المستخدم: {message}")
+            
+            self.tasks.submit(None, UserModel.delete_user, user_id, on_done=deleted)
 
     def on_close(self):
         if messagebox.askyesno("تأكيد الخروج", "هل تريد تسجيل الخروج وإغلاق البرنامج؟"):
+            ProductCatalog.unsubscribe(self.product_listener)
+            self.tasks.shutdown()
+            # انتظار حفظ الإيصالات الموجودة في الطابور قبل الخروج
+            self.spooler.close(timeout=5)
             self.login_window.destroy()
\ No newline at end of file
@@ -0,0 +1,179 @@
+"""
+نافذة عرض الفواتير - نافذة واحدة تعاد لكل الفواتير بدلاً من إنشاء نافذة
+جديدة وعنصر Label لكل خلية في كل مرة
+
+الفاتورة تعرض كنص الإيصال في عنصر Text واحد، والنص المنشأ يحفظ لآخر
+الفواتير المعروضة فلا يعاد إنشاؤه (ولا تعاد قراءتها من قاعدة البيانات)
+عند فتحها مرة أخرى
+"""
+import tkinter as tk
+from collections import OrderedDict
+from tkinter import ttk, messagebox, filedialog
+from services.receipt_service import ReceiptService
+
+# عدد الفواتير المحفوظة في الذاكرة
+CACHE_SIZE = 64
+
+# عدد أسطر ترويسة الإيصال (اسم المتجر والعنوان والهاتف)
+HEADER_LINES = 3
+
+
+class InvoiceViewer:
+    """
+    عارض الفواتير
+
+    - show(invoice) يعرض الفاتورة في النافذة المشتركة (تنشأ عند أول استخدام)
+    - cached(invoice_id) الفاتورة المحفوظة إن وجدت لتجنب قراءتها من قاعدة البيانات
+    - الإغلاق يخفي النافذة فقط حتى تفتح الفاتورة التالية فوراً
+    """
+
+    def __init__(self, root, spooler, create_button, cache_size=CACHE_SIZE):
+        """
+        Args:
+            root (tk.Tk): النافذة الرئيسية
+            spooler (PrintSpooler): طابور الطباعة لزر الطباعة
+            create_button (callable): دالة إنشاء الأزرار بنفس ستايل البرنامج
+            cache_size (int): عدد الفواتير المحفوظة في الذاكرة
+        """
+        self.root = root
+        self.spooler = spooler
+        self.create_button = create_button
+        self.cache_size = cache_size
+
+        # معرف الفاتورة -> (الفاتورة، نص الإيصال) بترتيب آخر استخدام
+        self.cache = OrderedDict()
+
+        self.window = None
+        self.text = None
+
+        # الفاتورة المعروضة حالياً ونص إيصالها
+        self.invoice = None
+        self.receipt = None
+
+    def cached(self, invoice_id):
+        """
+        الفاتورة المحفوظة في الذاكرة
+
+        Args:
+            invoice_id (int/str): معرف الفاتورة
+
+        Returns:
+            dict: بيانات الفاتورة أو None إذا لم تكن محفوظة
+        """
+        entry = self.cache.get(str(invoice_id))
+        return entry[0] if entry is not None else None
+
+    def show(self, invoice):
+        """
+        عرض فاتورة في النافذة المشتركة
+
+        Args:
+            invoice (dict): بيانات الفاتورة مع عناصرها (items)
+        """
+        key = str(invoice["id"])
+        entry = self.cache.get(key)
+        if entry is None:
+            entry = (invoice, ReceiptService.render_text(invoice))
+            self.cache[key] = entry
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        else:
+            self.cache.move_to_end(key)
+
+        invoice, receipt = entry
+        self.invoice = invoice
+        self.receipt = receipt
+
+        if self.window is None or not self.window.winfo_exists():
+            self._build()
+
+        self.window.title(f"فاتورة رقم {invoice.get('invoice_number') or invoice['id']}")
+
+        # استبدال النص كاملاً في عنصر واحد (بدون إنشاء عناصر جديدة)
+        text = self.text
+        text.configure(state="normal")
+        text.delete("1.0", "end")
+        text.insert("1.0", receipt)
+        text.tag_add("header", "1.0", f"{HEADER_LINES + 1}.0")
+        total_line = text.search("الإجمالي بعد الخصم", "end", backwards=True)
+        if total_line:
+            text.tag_add("total", f"{total_line} linestart", f"{total_line} lineend")
+        text.configure(state="disabled")
+        text.yview_moveto(0)
+
+        self.window.deiconify()
+        self.window.lift()
+        self.window.focus_set()
+
+    def hide(self):
+        """إخفاء النافذة (تبقى جاهزة للفاتورة التالية)"""
+        if self.window is not None and self.window.winfo_exists():
+            self.window.withdraw()
+
+    def _build(self):
+        """إنشاء النافذة مرة واحدة"""
+        window = tk.Toplevel(self.root)
+        window.withdraw()
+
+        # حجم مناسب للنافذة في منتصف الشاشة
+        window_width = max(int(self.root.winfo_width() * 0.5), 520)
+        window_height = int(self.root.winfo_height() * 0.85) or 650
+        center_x = int(self.root.winfo_screenwidth() / 2 - window_width / 2)
+        center_y = int(self.root.winfo_screenheight() / 2 - window_height / 2)
+        window.geometry(f"{window_width}x{window_height}+{center_x}+{center_y}")
+        window.minsize(500, 500)
+        window.configure(bg="#f5f5f5")
+
+        # نص الإيصال بخط ثابت العرض حتى تتطابق الأعمدة
+        main_frame = ttk.Frame(window)
+        main_frame.pack(fill="both", expand=True, padx=10, pady=10)
+
+        text = tk.Text(main_frame, wrap="none", font=("Courier New", 11), bg="white",
+                       relief="flat", padx=10, pady=10)
+        y_scrollbar = ttk.Scrollbar(main_frame, orient="vertical", command=text.yview)
+        x_scrollbar = ttk.Scrollbar(main_frame, orient="horizontal", command=text.xview)
+        text.configure(yscrollcommand=y_scrollbar.set, xscrollcommand=x_scrollbar.set)
+
+        y_scrollbar.pack(side="right", fill="y")
+        x_scrollbar.pack(side="bottom", fill="x")
+        text.pack(side="left", fill="both", expand=True)
+
+        text.tag_configure("header", font=("Courier New", 12, "bold"))
+        text.tag_configure("total", font=("Courier New", 11, "bold"), foreground="#1b5e20")
+
+        # إطار الأزرار
+        button_frame = ttk.Frame(window)
+        button_frame.pack(fill="x", padx=10, pady=10)
+
+        self.create_button(button_frame, "حفظ الفاتورة", self._save).pack(side="left", padx=5)
+        self.create_button(button_frame, "طباعة", self._print).pack(side="left", padx=5)
+        self.create_button(button_frame, "إغلاق", self.hide).pack(side="right", padx=5)
+
+        window.protocol("WM_DELETE_WINDOW", self.hide)
+        window.bind("<Escape>", lambda event: self.hide())
+
+        self.window = window
+        self.text = text
+
+    def _save(self):
+        """حفظ نص الفاتورة المعروضة في ملف يختاره المستخدم"""
+        invoice = self.invoice
+        save_path = filedialog.asksaveasfilename(
+            parent=self.window,
+            defaultextension=".txt",
+            initialfile=f"فاتورة_{invoice.get('invoice_number') or invoice['id']}.txt",
+            filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
+        )
+        if not save_path:
+            return
+
+        try:
+            with open(save_path, "w", encoding="utf-8") as f:
+                f.write(self.receipt)
+            messagebox.showinfo("حفظ الفاتورة", f"تم حفظ الفاتورة بنجاح في:\n{save_path}", parent=self.window)
+        except Exception as e:
+            messagebox.showerror("خطأ", f"فشل حفظ الفاتورة: {str(e)}", parent=self.window)
+
+    def _print(self):
+        """إرسال الفاتورة المعروضة لطابور الطباعة"""
+        self.spooler.submit(self.invoice, "printer")
@@ -0,0 +1,165 @@
+"""
+تنفيذ عمليات قاعدة البيانات في الخلفية حتى لا تتجمد الواجهة
+
+الدوال تنفذ في مجموعة خيوط (thread pool)، ونتائجها توضع في طابور يفرغه
+الخيط الرئيسي عبر root.after، فكل دوال الاستجابة تعمل على خيط Tk فقط
+"""
+import itertools
+import queue
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+# عدد خيوط العمل
+MAX_WORKERS = 4
+
+# الفترة بين كل تفريغ لطابور النتائج (بالمللي ثانية)
+POLL_INTERVAL_MS = 30
+
+
+class TaskRunner:
+    """
+    منفذ المهام في الخلفية
+
+    - كل مهمة يمكن أن تحمل مفتاحاً (key)؛ المهمة الأحدث بنفس المفتاح تلغي
+      السابقة وتتجاهل نتيجتها إذا وصلت متأخرة (مثل البحث أثناء الكتابة)
+    - cancel(key) يلغي المهمة ولا تستدعى دالة الاستجابة الخاصة بها
+    - pending عدد المهام التي لم تصل نتائجها بعد (لمؤشر الانتظار)
+    """
+
+    def __init__(self, root, max_workers=MAX_WORKERS, poll_interval=POLL_INTERVAL_MS):
+        self.root = root
+        self.poll_interval = poll_interval
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db-worker")
+        self.results = queue.Queue()
+
+        # آخر مهمة لكل مفتاح: key -> (token, future)
+        self.latest = {}
+        self.tokens = itertools.count(1)
+        self.pending = 0
+
+        self.closed = False
+        self.poll_job = self.root.after(self.poll_interval, self._drain)
+
+    def submit(self, key, fn, *args, on_done=None, on_error=None, **kwargs):
+        """
+        تنفيذ دالة في الخلفية
+
+        Args:
+            key (str): مفتاح المهمة (None لمهمة مستقلة لا تلغى بمهمة أحدث)
+            fn (callable): الدالة المنفذة في الخلفية
+            *args, **kwargs: معاملات الدالة
+            on_done (callable): تستقبل نتيجة الدالة على الخيط الرئيسي
+            on_error (callable): تستقبل الاستثناء إذا فشلت الدالة
+
+        Returns:
+            int: رقم المهمة
+        """
+        token = next(self.tokens)
+        if key is not None:
+            self.cancel(key)
+
+        self.pending += 1
+        future = self.executor.submit(self._run, key, token, fn, args, kwargs, on_done, on_error)
+        if key is not None:
+            self.latest[key] = (token, future)
+        return token
+
+    def call_in_ui(self, fn, *args):
+        """تنفيذ دالة على الخيط الرئيسي (آمنة للاستدعاء من أي خيط)"""
+        self.results.put((None, None, fn, args))
+
+    def is_running(self, key):
+        """هل توجد مهمة بهذا المفتاح لم تصل نتيجتها بعد"""
+        return key in self.latest
+
+    def cancel(self, key):
+        """
+        إلغاء مهمة: تحذف من الطابور إن لم تبدأ، وتتجاهل نتيجتها إن كانت تعمل
+
+        Args:
+            key (str): مفتاح المهمة
+        """
+        entry = self.latest.pop(key, None)
+        if entry is None:
+            return
+
+        token, future = entry
+        if future.cancel():
+            # لم تبدأ أبداً فلن تصل لها نتيجة
+            self.pending -= 1
+
+    def _run(self, key, token, fn, args, kwargs, on_done, on_error):
+        """تنفيذ الدالة في خيط العمل ووضع النتيجة في الطابور"""
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self.results.put((key, token, on_error or self._report_error, (e,)))
+        else:
+            self.results.put((key, token, on_done, (result,)))
+
+    @staticmethod
+    def _report_error(error):
+        traceback.print_exception(type(error), error, error.__traceback__)
+
+    def _drain(self):
+        """تفريغ طابور النتائج على الخيط الرئيسي"""
+        while True:
+            try:
+                key, token, callback, args = self.results.get_nowait()
+            except queue.Empty:
+                break
+
+            if token is not None:
+                self.pending -= 1
+
+                # نتيجة مهمة ألغيت أو حلت محلها مهمة أحدث بنفس المفتاح
+                if key is not None:
+                    entry = self.latest.get(key)
+                    if entry is None or entry[0] != token:
+                        continue
+                    del self.latest[key]
+
+            if callback is None:
+                continue
+
+            try:
+                callback(*args)
+            except Exception:
+                traceback.print_exc()
+
+        if not self.closed:
+            self.poll_job = self.root.after(self.poll_interval, self._drain)
+
+    def shutdown(self):
+        """إيقاف المنفذ وإلغاء المهام التي لم تبدأ (عند إغلاق البرنامج)"""
+        self.closed = True
+        try:
+            self.root.after_cancel(self.poll_job)
+        except Exception:
+            pass
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class BusySpinner:
+    """مؤشر انتظار في شريط الحالة يظهر ما دامت هناك مهام في الخلفية"""
+
+    FRAMES = "◐◓◑◒"
+
+    def __init__(self, label, runner, interval=120):
+        self.label = label
+        self.runner = runner
+        self.interval = interval
+        self.frame = 0
+        self._tick()
+
+    def _tick(self):
+        if self.runner.closed:
+            return
+
+        if self.runner.pending > 0:
+            self.frame = (self.frame + 1) % len(self.FRAMES)
+            self.label.configure(text=f"{self.FRAMES[self.frame]} جاري التحميل...")
+        else:
+            self.label.configure(text="")
+
+        self.label.after(self.interval, self._tick)
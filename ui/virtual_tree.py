@@ -0,0 +1,164 @@
+"""
+عرض الجداول الكبيرة على دفعات - يضاف للجدول (Treeview) ما يكفي لملء الشاشة فقط،
+وتضاف الصفحة التالية من مصدر البيانات عند اقتراب التمرير من آخر الصفوف المعروضة
+"""
+
+# عدد الصفوف في كل صفحة
+PAGE_SIZE = 200
+
+# تحميل الصفحة التالية عند الوصول لهذه النسبة من الصفوف المعروضة
+PREFETCH_AT = 0.8
+
+
+class VirtualTree:
+    """
+    طبقة عرض فوق ttk.Treeview تضيف الصفوف صفحة بصفحة عند التمرير
+
+    مصدر البيانات إما قائمة (تعرض أجزاء منها) أو دالة fetch(offset, limit)
+    تعيد الصفحة المطلوبة من قاعدة البيانات. الجدول نفسه يبقى Treeview عادي
+    فيعمل التحديد والوسوم وتحديث الصفوف بالمعرف كما هي
+    """
+
+    def __init__(self, tree, scrollbar, make_row, page_size=PAGE_SIZE, runner=None):
+        """
+        Args:
+            tree (ttk.Treeview): الجدول
+            scrollbar (ttk.Scrollbar): شريط التمرير الرأسي للجدول
+            make_row (callable): تحول السجل إلى (iid, values, tags) أو None لتجاهله،
+                و iid يمكن أن يكون None ليولده الجدول
+            page_size (int): عدد الصفوف في كل صفحة
+            runner (TaskRunner): لجلب صفحات الدالة fetch في الخلفية (None للجلب المباشر)
+        """
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.make_row = make_row
+        self.page_size = page_size
+        self.runner = runner
+        self.task_key = f"virtual_tree_{id(self)}"
+
+        self.source = None
+        self.offset = 0
+        self.exhausted = True
+        self.pending = None
+        self.fetching = False
+        self.empty_values = None
+
+        tree.configure(yscrollcommand=self._on_yscroll)
+
+    def set_source(self, source, empty_values=None):
+        """
+        عرض مصدر بيانات جديد بدلاً من الحالي (تعرض الصفحة الأولى فقط)
+
+        Args:
+            source (list/callable): قائمة السجلات أو دالة fetch(offset, limit)
+            empty_values (tuple): صف يعرض إذا لم توجد بيانات (None لعدم عرض شيء)
+        """
+        if self.pending is not None:
+            self.tree.after_cancel(self.pending)
+            self.pending = None
+        if self.runner is not None:
+            # صفحة قيد الجلب من المصدر القديم تتجاهل نتيجتها
+            self.runner.cancel(self.task_key)
+        self.fetching = False
+
+        self.tree.delete(*self.tree.get_children())
+        self.source = source
+        self.offset = 0
+        self.exhausted = False
+        self.empty_values = empty_values
+
+        self.load_more()
+
+    def refresh(self, source):
+        """
+        استبدال مصدر البيانات بنتيجة استعلام أحدث مع الإبقاء على عدد الصفوف
+        المعروضة وموضع التمرير والتحديد (الصفوف الجديدة تظهر في مكانها من
+        النتائج بدلاً من آخر الجدول)
+
+        Args:
+            source (list/callable): قائمة السجلات أو دالة fetch(offset, limit)
+        """
+        tree = self.tree
+        shown = self.offset
+        first = tree.yview()[0]
+        selection = tree.selection()
+        focus = tree.focus()
+
+        self.set_source(source, self.empty_values)
+        # الدالة fetch مع runner تجلب في الخلفية فتعرض صفحتها الأولى فقط
+        while not self.exhausted and not self.fetching and self.offset < shown:
+            if self.pending is not None:
+                tree.after_cancel(self.pending)
+            self.load_more()
+
+        tree.yview_moveto(first)
+        selection = [iid for iid in selection if tree.exists(iid)]
+        if selection:
+            tree.selection_set(selection)
+        if focus and tree.exists(focus):
+            tree.focus(focus)
+
+    def clear(self):
+        """إفراغ الجدول وفصل مصدر البيانات"""
+        self.set_source([])
+
+    def _fetch(self):
+        if callable(self.source):
+            return self.source(self.offset, self.page_size)
+        return self.source[self.offset:self.offset + self.page_size]
+
+    def load_more(self):
+        """إضافة الصفحة التالية من مصدر البيانات إن وجدت"""
+        self.pending = None
+        if self.exhausted or self.fetching:
+            return
+
+        if callable(self.source) and self.runner is not None:
+            self.fetching = True
+            self.runner.submit(self.task_key, self.source, self.offset, self.page_size,
+                               on_done=self._add_page)
+            return
+
+        self._add_page(self._fetch())
+
+    def _add_page(self, page):
+        """إضافة صفوف صفحة للجدول"""
+        self.fetching = False
+        if not self.tree.winfo_exists():
+            return
+
+        self.offset += len(page)
+        if len(page) < self.page_size:
+            self.exhausted = True
+
+        tree = self.tree
+        inserted = 0
+        for record in page:
+            row = self.make_row(record)
+            if row is None:
+                continue
+
+            iid, values, tags = row
+            # صف أضيف مسبقاً (مثلاً عبر تحديث مباشر) لا يضاف مرة أخرى
+            if iid is not None and tree.exists(iid):
+                continue
+
+            if iid is None:
+                tree.insert("", "end", values=values, tags=tags)
+            else:
+                tree.insert("", "end", iid=iid, values=values, tags=tags)
+            inserted += 1
+
+        # صفحة تم تجاهل كل سجلاتها لا تغير التمرير: ننتقل للتي بعدها مباشرة
+        if not inserted and not self.exhausted:
+            self.pending = tree.after_idle(self.load_more)
+
+        if self.exhausted and self.empty_values is not None and not tree.get_children():
+            tree.insert("", "end", values=self.empty_values)
+
+    def _on_yscroll(self, first, last):
+        self.scrollbar.set(first, last)
+
+        # الاقتراب من نهاية الصفوف المعروضة: جدولة الصفحة التالية بعد انتهاء الرسم
+        if not self.exhausted and self.pending is None and not self.fetching and float(last) >= PREFETCH_AT:
+            self.pending = self.tree.after_idle(self.load_more)